@@ -1,9 +1,20 @@
-import sqlite3
-from typing import Dict, List, Literal, Optional, Tuple
+import bisect
+import heapq
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Tuple, Union
 
 import numpy as np
 import pysam
 
+from app.algorithms.annotation_index import AnnotationIndex
+from app.algorithms.genome_index import GenomeKmerIndex
+from app.algorithms.genome_store import GenomeStore
+from app.algorithms.multi_pattern import UPPER_BASE_CODES, MultiPatternScanner
+from app.algorithms.specificity_cache import SpecificityCache
+
 ############################################
 # Thermodynamics & Alignment Utilities
 ############################################
@@ -47,31 +58,451 @@ def calc_tm_nn(seq: str, dna_nM=50.0, salt_mM=50.0) -> float:
 
 
 def needleman_wunsch_mismatch(seq1: str, seq2: str) -> int:
+    """전역 정렬(일치 +1, 불일치/갭 -1) 점수 기반 미스매치 수 = max(n, m) - score
+
+    같은 길이에서 치환이 1개 이하면 갭이 있는 정렬(갭 2개 이상 → 점수 n-3 이하)보다 항상 좋으므로
+    DP 없이 2 * 치환 수를 반환하고, 그 외에는 정수 1행 DP로 계산합니다.
+    """
     n, m = len(seq1), len(seq2)
-    score_matrix = np.zeros((n + 1, m + 1))
-    for i in range(n + 1):
-        score_matrix[i][0] = -i
-    for j in range(m + 1):
-        score_matrix[0][j] = -j
+    if n == m:
+        diff = sum(a != b for a, b in zip(seq1, seq2))
+        if diff <= 1:
+            return 2 * diff
+
+    prev = list(range(0, -m - 1, -1))
     for i in range(1, n + 1):
+        a = seq1[i - 1]
+        left = -i
+        cur = [left]
         for j in range(1, m + 1):
-            match = 1 if seq1[i - 1] == seq2[j - 1] else -1
-            score_matrix[i][j] = max(
-                score_matrix[i - 1][j - 1] + match,
-                score_matrix[i - 1][j] - 1,
-                score_matrix[i][j - 1] - 1,
+            best = prev[j - 1] + (1 if a == seq2[j - 1] else -1)
+            if prev[j] - 1 > best:
+                best = prev[j] - 1
+            if left - 1 > best:
+                best = left - 1
+            cur.append(best)
+            left = best
+        prev = cur
+    return max(n, m) - prev[m]
+
+
+def needleman_wunsch_mismatch_many(seqs1: List[str], seqs2: List[str]) -> np.ndarray:
+    """needleman_wunsch_mismatch(seqs1[i], seqs2[i])의 배치 버전 (길이 조합별로 모든 쌍을 한 번에 DP)"""
+    result = np.zeros(len(seqs1), dtype=np.int64)
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for idx, (s1, s2) in enumerate(zip(seqs1, seqs2)):
+        groups.setdefault((len(s1), len(s2)), []).append(idx)
+
+    for (n, m), rows in groups.items():
+        rows = np.asarray(rows)
+        a = np.frombuffer("".join(seqs1[r] for r in rows).encode("latin-1"), dtype=np.uint8).reshape(len(rows), n)
+        b = np.frombuffer("".join(seqs2[r] for r in rows).encode("latin-1"), dtype=np.uint8).reshape(len(rows), m)
+        prev = np.broadcast_to(-np.arange(m + 1, dtype=np.int64), (len(rows), m + 1)).copy()
+        for i in range(1, n + 1):
+            match = np.where(a[:, i - 1 : i] == b, 1, -1)
+            cur = np.empty_like(prev)
+            cur[:, 0] = -i
+            diag_up = np.maximum(prev[:, :-1] + match, prev[:, 1:] - 1)
+            for j in range(1, m + 1):
+                cur[:, j] = np.maximum(diag_up[:, j - 1], cur[:, j - 1] - 1)
+            prev = cur
+        result[rows] = max(n, m) - prev[:, m]
+    return result
+
+
+############################################
+# Vectorized Candidate Engine
+############################################
+# 대문자 A/C/G/T -> 0~3 (그 외 문자는 NN 파라미터 조회 실패와 동일하게 0 기여)
+_PAIR_INVALID = 16
+_NN_DH = np.zeros(_PAIR_INVALID + 1)
+_NN_DS = np.zeros(_PAIR_INVALID + 1)
+_NN_DH_RC = np.zeros(_PAIR_INVALID + 1)
+_NN_DS_RC = np.zeros(_PAIR_INVALID + 1)
+for _a, _b in itertools.product(range(4), repeat=2):
+    _pair = "ACGT"[_a] + "ACGT"[_b]
+    _NN_DH[_a * 4 + _b], _NN_DS[_a * 4 + _b] = NN_PARAMS[_pair]
+    _NN_DH_RC[_a * 4 + _b], _NN_DS_RC[_a * 4 + _b] = NN_PARAMS[reverse_complement(_pair)]
+
+
+def _homopolymer_runs(codes: np.ndarray) -> np.ndarray:
+    """각 위치에서 끝나는 동일 염기(대문자 A/C/G/T) 연속 길이"""
+    n = len(codes)
+    valid = codes < 4
+    pos = np.arange(n)
+    is_start = valid.copy()
+    is_start[1:] &= codes[1:] != codes[:-1]
+    last_start = np.maximum.accumulate(np.where(is_start, pos, 0))
+    return np.where(valid, pos - last_start + 1, 0)
+
+
+def generate_candidates_batched(
+    template: str,
+    k_min=18,
+    k_max=25,
+    tm_range=(57, 63),
+    gc_range=(0.4, 0.6),
+    max_poly_x=4,
+    gc_clamp=True,
+    dna_nM=50.0,
+    salt_mM=50.0,
+) -> List[Dict]:
+    """Stage 2.1 배치 엔진: 템플릿을 한 번 정수 배열로 인코딩해 모든 윈도우를 마스크로 필터링
+
+    GC/말단 GC/Poly-X는 누적합으로, ΔH/ΔS는 `calc_tm_nn`과 같은 덧셈 순서로 전 윈도우에 대해
+    한꺼번에 누적하므로 결과(값/순서)가 윈도우별 스칼라 계산과 비트 단위로 동일합니다.
+    """
+    n = len(template)
+    codes = UPPER_BASE_CODES[np.frombuffer(template.encode("ascii", errors="replace"), dtype=np.uint8)]
+    if max_poly_x <= 0:  # 빈 문자열은 항상 포함되므로 기존 규칙상 모든 윈도우 탈락
+        return []
+
+    # 인접 염기쌍 인덱스 (둘 중 하나라도 비 ACGT면 0 기여)
+    pair_idx = np.where((codes[:-1] < 4) & (codes[1:] < 4), codes[:-1] * 4 + codes[1:], _PAIR_INVALID)
+    is_gc = (codes == 1) | (codes == 2)
+    gc_prefix = np.concatenate(([0], np.cumsum(is_gc)))
+    poly_prefix = np.concatenate(([0], np.cumsum(_homopolymer_runs(codes) >= max_poly_x)))
+
+    log_salt = np.log(salt_mM / 1000.0)
+    log_conc = 1.987 * np.log(dna_nM * 1e-9 / 4)
+
+    candidates = []
+    for k in range(k_min, k_max + 1):
+        m = n - k + 1
+        if m <= 0:
+            continue
+        i = np.arange(m)
+
+        # 1. Tm (정방향은 앞에서부터, 역상보는 템플릿 뒤쪽 염기쌍부터 누적 = 역상보 서열의 앞에서부터)
+        dh_f, ds_f, dh_r, ds_r = np.zeros(m), np.zeros(m), np.zeros(m), np.zeros(m)
+        for j in range(k - 1):
+            fwd_pairs = pair_idx[j : j + m]
+            rev_pairs = pair_idx[k - 2 - j : k - 2 - j + m]
+            dh_f += _NN_DH[fwd_pairs]
+            ds_f += _NN_DS[fwd_pairs]
+            dh_r += _NN_DH_RC[rev_pairs]
+            ds_r += _NN_DS_RC[rev_pairs]
+
+        ds_corr = 0.368 * (k - 1) * log_salt
+        strand_tm = []
+        for dh, ds in ((dh_f, ds_f), (dh_r, ds_r)):
+            denominator = (ds + ds_corr) + log_conc
+            with np.errstate(divide="ignore", invalid="ignore"):
+                tm = np.where(denominator == 0, 0.0, ((dh * 1000) / denominator) - 273.15)
+            strand_tm.append(tm)
+
+        # 2. Poly-X / GC Content (가닥 무관)
+        if max_poly_x <= k:
+            has_poly = (poly_prefix[i + k] - poly_prefix[i + max_poly_x - 1]) > 0
+        else:
+            has_poly = np.zeros(m, dtype=bool)
+        gc_content = (gc_prefix[i + k] - gc_prefix[i]) / k
+        common = ~has_poly & (gc_range[0] <= gc_content) & (gc_content <= gc_range[1])
+
+        # 3. 3' 말단 (정방향: 윈도우 끝 5nt, 역상보: 윈도우 앞 5nt)
+        tail = min(5, k)
+        tail_pairs = range(min(4, tail - 1))
+        strand_dg3, strand_mask = [], []
+        for strand, tm in zip("+-", strand_tm):
+            dh3, ds3 = np.zeros(m), np.zeros(m)
+            for j in tail_pairs:
+                if strand == "+":
+                    pairs = pair_idx[k - tail + j : k - tail + j + m]
+                    dh3 += _NN_DH[pairs]
+                    ds3 += _NN_DS[pairs]
+                else:
+                    pairs = pair_idx[tail - 2 - j : tail - 2 - j + m]
+                    dh3 += _NN_DH_RC[pairs]
+                    ds3 += _NN_DS_RC[pairs]
+            dg3 = dh3 - (310.15 * (ds3 / 1000.0))  # 37°C(310.15K) 기준 dG 계산
+
+            end_base = codes[i + k - 1] if strand == "+" else codes[i]
+            tail_start = i + k - tail if strand == "+" else i
+            tail_gc = gc_prefix[tail_start + tail] - gc_prefix[tail_start]
+            mask = common & (tm_range[0] <= tm) & (tm <= tm_range[1]) & (dg3 > -10.0) & (tail_gc <= 4)
+            if gc_clamp:
+                mask &= (end_base == 1) | (end_base == 2)
+            strand_dg3.append(dg3)
+            strand_mask.append(mask)
+
+        for idx in np.nonzero(strand_mask[0] | strand_mask[1])[0].tolist():
+            seq = template[idx : idx + k]
+            for s_i, (strand, s) in enumerate((("+", seq), ("-", None))):
+                if not strand_mask[s_i][idx]:
+                    continue
+                candidates.append(
+                    {
+                        "seq": s if s is not None else reverse_complement(seq),
+                        "start": idx + 1,  # 1-based 시작점
+                        "end": idx + k,  # 1-based 종료점 (inclusive)
+                        "strand": strand,
+                        "tm": float(strand_tm[s_i][idx]),
+                        "dg3": float(strand_dg3[s_i][idx]),
+                    }
+                )
+    return candidates
+
+
+############################################
+# Chunk Scan (순차 / 병렬 워커 공용)
+############################################
+CHUNK_SIZE = 5_000_000
+
+# 청크 스캔 입력: FASTA에서 읽은 문자열 또는 GenomeStore mmap 구간(복사 없음)
+ChunkSeq = Union[str, memoryview]
+
+
+def fetch_chunk(genome, reference: str, start: int, end: int) -> ChunkSeq:
+    """청크 스캔용 서열 조회. GenomeStore면 mmap 구간을 문자열로 바꾸지 않고 그대로 돌려줌"""
+    if isinstance(genome, GenomeStore):
+        return genome.view(reference, start, end)
+    return genome.fetch(reference, start, end)
+
+
+def chunk_text(chunk_seq: ChunkSeq) -> str:
+    """str.find처럼 문자열이 꼭 필요한 경우에만 변환"""
+    return chunk_seq if isinstance(chunk_seq, str) else str(chunk_seq, "ascii")
+
+
+class _ChunkScanPlan:
+    """청크 스캔용 검색 서열 구성 (프라이머/역상보 서열 -> 그 서열을 가진 프라이머)"""
+
+    def __init__(self, primer_seqs: Iterable[str]):
+        # 검색 서열 -> 해당 서열을 가진 프라이머 목록 (팰린드롬/상호 역상보 프라이머 대비)
+        self.owners: Dict[str, List[str]] = {}
+        for p_seq in primer_seqs:
+            for search_seq in (p_seq, reverse_complement(p_seq)):
+                self.owners.setdefault(search_seq, []).append(p_seq)
+        # A/C/G/T 외 문자가 섞인 서열은 스캐너 대상이 아니므로 str.find로 개별 검색
+        self.find_seqs = [s for s in self.owners if s.strip("ACGT")]
+        scan_seqs = [s for s in self.owners if not s.strip("ACGT")]
+        self.scanner = MultiPatternScanner(scan_seqs) if scan_seqs else None
+        self.pattern_owners = [self.owners[p] for p in self.scanner.patterns] if self.scanner else []
+        self.overlap = max(len(s) for s in self.owners)  # 오버랩은 프라이머 최대 길이
+
+    @staticmethod
+    def overlap_for(primer_seqs: Iterable[str]) -> int:
+        return max(len(s) for s in primer_seqs)
+
+    @staticmethod
+    def chunk_ranges(ref_len: int, overlap: int) -> List[Tuple[int, int, int]]:
+        """(시작, 끝, limit) 목록. 오버랩 구간에서 시작하는 일치는 다음 청크에서 집계 (중복 방지)
+
+        염색체 끝에 닿은 청크가 마지막이므로, 그 뒤로 같은 꼬리를 다시 읽는 청크는 만들지 않습니다.
+        """
+        ranges = []
+        for start_idx in range(0, ref_len, CHUNK_SIZE - overlap):
+            end_idx = min(start_idx + CHUNK_SIZE, ref_len)
+            if end_idx == ref_len:
+                ranges.append((start_idx, end_idx, end_idx - start_idx))
+                break
+            ranges.append((start_idx, end_idx, CHUNK_SIZE - overlap))
+        return ranges
+
+    def chunks(self, ref_len: int) -> List[Tuple[int, int, int]]:
+        return self.chunk_ranges(ref_len, self.overlap)
+
+    def chunk_hits(self, chunk_seq: ChunkSeq, limit: int, alive) -> List[Tuple[int, int, str, int]]:
+        """청크 안 `alive` 프라이머의 모든 일치 (청크 내 위치, 길이, 프라이머, 3' 말단 10nt 미스매치 수)"""
+        found = []
+        if self.find_seqs:
+            text = chunk_text(chunk_seq)
+            for search_seq in self.find_seqs:
+                pos = text.find(search_seq)
+                while pos != -1 and pos < limit:
+                    found.append((pos, search_seq, self.owners[search_seq]))
+                    pos = text.find(search_seq, pos + 1)
+        if self.scanner:
+            scanned = (
+                (pos, self.scanner.patterns[pid], self.pattern_owners[pid])
+                for pos, pid in self.scanner.scan(chunk_seq, limit)
             )
-    return max(len(seq1), len(seq2)) - int(score_matrix[n][m])
+            found = itertools.chain(scanned, found)
+
+        hits = [
+            (pos, search_seq, p_seq)
+            for pos, search_seq, seq_owners in found
+            for p_seq in seq_owners
+            if p_seq in alive
+        ]
+        if not hits:
+            return []
+        # 청크의 모든 히트를 3' 말단 미스매치 배치 DP로 한 번에 채점
+        mms = needleman_wunsch_mismatch_many(
+            [p_seq[-10:] for _, _, p_seq in hits],
+            [chunk_text(chunk_seq[pos : pos + len(p_seq)][-10:]) for pos, _, p_seq in hits],
+        )
+        return [(pos, len(search_seq), p_seq, mm) for (pos, search_seq, p_seq), mm in zip(hits, mms.tolist())]
+
+
+# 병렬 스캔 워커 프로세스 상태 (프로세스마다 게놈 핸들 1개, 직전 스캔 계획 재사용)
+_scan_worker_genome = None
+_scan_worker_plan: Optional[Tuple[Tuple[str, ...], _ChunkScanPlan]] = None
+
+
+def init_scan_worker(genome_fasta: str, genome_store: Optional[str] = None) -> None:
+    """병렬 스캔 프로세스 풀 initializer"""
+    global _scan_worker_genome
+    _scan_worker_genome = GenomeStore(genome_store) if GenomeStore.exists(genome_store) else pysam.FastaFile(genome_fasta)
+
+
+def scan_chunk_task(
+    ref: str, start_idx: int, end_idx: int, limit: int, primer_seqs: Tuple[str, ...]
+) -> Tuple[List[Tuple], float]:
+    """워커에서 청크 1개를 읽어 (`primer_seqs`의 일치 목록, 소요 시간(초))을 반환"""
+    global _scan_worker_plan
+    if _scan_worker_genome is None:
+        raise RuntimeError("스캔 워커가 초기화되지 않았습니다.")
+    if _scan_worker_plan is None or _scan_worker_plan[0] != primer_seqs:
+        _scan_worker_plan = (primer_seqs, _ChunkScanPlan(primer_seqs))
+    started = time.perf_counter()
+    chunk_seq = fetch_chunk(_scan_worker_genome, ref, start_idx, end_idx)
+    hits = _scan_worker_plan[1].chunk_hits(chunk_seq, limit, set(primer_seqs))
+    return hits, time.perf_counter() - started
 
 
 ############################################
 # Main Designer
 ############################################
+# 진행 상황 콜백 (단계 이름, 내용)과 중단 여부 콜백
+ProgressCallback = Callable[[str, Dict], None]
+StopCallback = Callable[[], bool]
+
+
+class DesignCancelled(Exception):
+    """should_stop 콜백으로 설계가 중단됨 (클라이언트 연결 종료 등)"""
+
+class _SpecificityCheck:
+    """템플릿 1개의 특이성 판정 상태 (남은 프라이머, 오프타겟 집계, 제외 규칙)"""
+
+    def __init__(
+        self,
+        designer: "PrimerDesigner",
+        primers: List[Dict],
+        target_chrom: str,
+        target_start: int,
+        target_end: int,
+        mispriming_library: bool = False,
+        snp_exclusion: bool = False,
+        splice_variant_handling: bool = False,
+        max_hits=50,
+        mismatch_cutoff=2,
+    ):
+        self.designer = designer
+        self.target = (target_chrom, target_start, target_end)
+        self.snp_exclusion = snp_exclusion
+        self.splice_variant_handling = splice_variant_handling
+        self.max_hits = max_hits
+        self.mismatch_cutoff = mismatch_cutoff
+
+        self.primer_pool = designer.specificity_pool(primers, mispriming_library)
+        self.hit_counts = dict.fromkeys(self.primer_pool, 0)
+
+    def rejects(self, p_seq: str, hit) -> bool:
+        """히트 1건을 반영하고, 프라이머가 탈락하면 True (타겟 구간 등 제외 규칙은 여기서 적용)"""
+        ref, pos_1based, end_1based, mm = hit
+        if self.designer._is_excluded_hit(
+            ref, pos_1based, end_1based, *self.target, self.snp_exclusion, self.splice_variant_handling
+        ):
+            return False
+
+        # 3' 말단 미스매치 정밀 검사
+        if mm < self.mismatch_cutoff:
+            return True
+
+        self.hit_counts[p_seq] += 1
+        return self.hit_counts[p_seq] > self.max_hits
+
+
 class PrimerDesigner:
-    def __init__(self, genome_fasta: str, annotation_db: str):
+    def __init__(
+        self,
+        genome_fasta: str,
+        annotation_db: str,
+        genome_index: Optional[str] = None,
+        annotations: Optional[AnnotationIndex] = None,
+        specificity_cache: Optional[SpecificityCache] = None,
+        genome_store: Optional[str] = None,
+        scan_executor: Optional[Executor] = None,
+        scan_workers: int = 1,
+        annotation_snapshot: Optional[str] = None,
+    ):
         self.genome = pysam.FastaFile(genome_fasta)
-        self.db = sqlite3.connect(annotation_db)
-        self.cur = self.db.cursor()
+        if GenomeStore.exists(genome_store):
+            # 비압축 mmap 저장소가 있으면 BGZF 압축 해제 없이 조회 (FASTA와 구성이 같은지 확인 후 교체)
+            store = GenomeStore(genome_store)
+            try:
+                store.check_genome(self.genome.references, self.genome.get_reference_length)
+            except ValueError:
+                store.close()
+                self.genome.close()
+                raise
+            self.genome.close()
+            self.genome = store
+        # annotations.db 조회는 모두 메모리 인덱스가 맡음 (풀에서는 인스턴스 간 공유, 자체 읽기 전용 연결 사용)
+        if annotations is None:
+            # 스냅샷이 있으면 여기서 mmap/검증 (DB와 다르면 ValueError)
+            annotations = AnnotationIndex(annotation_db, snapshot=annotation_snapshot)
+            try:
+                annotations.open_snapshot()
+            except ValueError:
+                self.genome.close()
+                raise
+        self.annotations = annotations
+        # 프라이머 서열별 게놈 히트 목록 (같은 게놈을 쓰는 인스턴스 간 공유 가능)
+        self.specificity_cache = specificity_cache if specificity_cache is not None else SpecificityCache()
+
+        self.stats = self._new_stats()
+
+        # 청크 스캔을 나눠 실행할 프로세스 풀 (init_scan_worker로 초기화된 풀, 인스턴스 간 공유)
+        self.scan_executor = scan_executor
+        self.scan_workers = max(1, scan_workers)
+        # 스캔 중 깨진 풀 (소유자가 반납 시 새 풀로 교체할 때까지 순차 스캔)
+        self.broken_scan_executor: Optional[Executor] = None
+
+        # 사전 빌드된 k-mer 인덱스가 있으면 게놈 전수 스캔 대신 시드 조회를 사용
+        self.genome_index: Optional[GenomeKmerIndex] = None
+        if GenomeKmerIndex.exists(genome_index):
+            self.genome_index = GenomeKmerIndex(genome_index)
+            self.genome_index.check_genome(self.genome.references, self.genome.get_reference_length)
+
+    @staticmethod
+    def _new_stats() -> Dict:
+        return {
+            "fasta_bytes": 0,
+            "specificity_cache_hits": 0,
+            "specificity_cache_misses": 0,
+            "specificity_chrom_seconds": {},
+        }
+
+    def reset_stats(self) -> Dict:
+        """누적 지표(게놈 조회 바이트, 특이성 캐시 적중, 염색체별 스캔 시간)를 반환하고 초기화"""
+        stats, self.stats = self.stats, self._new_stats()
+        return stats
+
+    def fetch(self, reference: str, start: Optional[int] = None, end: Optional[int] = None) -> str:
+        """게놈 서열 조회 (읽은 바이트 수를 stats에 집계)"""
+        seq = self.genome.fetch(reference, start, end)
+        self.stats["fasta_bytes"] += len(seq)
+        return seq
+
+    def fetch_chunk(self, reference: str, start: int, end: int) -> ChunkSeq:
+        """청크 스캔용 게놈 조회 (GenomeStore면 복사 없는 memoryview, 읽은 바이트 수를 stats에 집계)"""
+        chunk_seq = fetch_chunk(self.genome, reference, start, end)
+        self.stats["fasta_bytes"] += len(chunk_seq)
+        return chunk_seq
+
+    def _add_scan_time(self, ref: str, seconds: float) -> None:
+        chroms = self.stats["specificity_chrom_seconds"]
+        chroms[ref] = chroms.get(ref, 0.0) + seconds
+
+    def close(self) -> None:
+        """FASTA 핸들을 정리"""
+        try:
+            self.genome.close()
+        except Exception:
+            pass
+
     def generate_candidates(
         self,
         template: str,
@@ -82,88 +513,133 @@ class PrimerDesigner:
         max_poly_x=4,
         gc_clamp=True,
     ) -> List[Dict]:
-        """Stage 2.1: 물성 기반 후보군 생성 (1-based 반영)"""
-        candidates = []
-        for k in range(k_min, k_max + 1):
-            for i in range(len(template) - k + 1):
-                seq = template[i : i + k]
-                for strand, s in [("+", seq), ("-", reverse_complement(seq))]:
-                    tm = calc_tm_nn(s)
-                    if not (tm_range[0] <= tm <= tm_range[1]):
-                        continue
-                    
-                    # 1. Poly-X 필터
-                    if any(base * max_poly_x in s for base in "ATCG"):
-                        continue
-
-                    # 2. GC Content 필터
-                    gc_content = (s.count("G") + s.count("C")) / len(s)
-                    if not (gc_range[0] <= gc_content <= gc_range[1]):
-                        continue
-                        
-                    # 3. 3' 말단 안정성 및 GC Clamp (올바른 깁스 자유에너지 계산으로 수정)
-                    dh3 = sum(NN_PARAMS.get(s[-5:][j : j + 2], (0, 0))[0] for j in range(4))
-                    ds3 = sum(NN_PARAMS.get(s[-5:][j : j + 2], (0, 0))[1] for j in range(4))
-                    dg3 = dh3 - (310.15 * (ds3 / 1000.0)) # 37°C(310.15K) 기준 dG 계산
-                    
-                    if dg3 <= -10.0:
-                        continue
-                    if gc_clamp and s[-1] not in "GC":
-                        continue
-                    if s[-5:].count("G") + s[-5:].count("C") > 4:
-                        continue
-                        
-                    candidates.append(
-                        {
-                            "seq": s,
-                            "start": i + 1,  # [수정] 1-based 시작점
-                            "end": i + k,    # [수정] 1-based 종료점 (inclusive)
-                            "strand": strand,
-                            "tm": tm,
-                            "dg3": dg3,
-                        }
-                    )
-        return candidates
+        """Stage 2.1: 물성 기반 후보군 생성 (1-based 반영, 배치 엔진 사용)"""
+        return generate_candidates_batched(
+            template,
+            k_min=k_min,
+            k_max=k_max,
+            tm_range=tm_range,
+            gc_range=gc_range,
+            max_poly_x=max_poly_x,
+            gc_clamp=gc_clamp,
+        )
 
     # ==========================================
     # 좌표 변환 및 매핑 유틸리티 추가
     # ==========================================
+    def find_template_placements(self, template_seq: str) -> Optional[List[Dict]]:
+        """Stage 1: 템플릿 서열의 모든 게놈 위치(1-based, 양 가닥)를 인덱스로 조회
+
+        인덱스를 쓸 수 없으면(미빌드, 템플릿이 시드 간격보다 짧음, 고반복 시드로 누락 가능) None을 반환합니다.
+        """
+        index = self.genome_index
+        if index is None or not index.covers(len(template_seq)):
+            return None
+        strands = (("+", template_seq), ("-", reverse_complement(template_seq)))
+        if index.repetitive(seq for _, seq in strands):
+            return None
+
+        placements = []
+        for strand, seq in strands:
+            for ref, start, _, _ in index.search(seq, self.fetch):
+                placements.append(
+                    {
+                        "chrom": ref,
+                        "genomic_start": start + 1,
+                        "strand": strand,
+                        "template_length": len(template_seq),
+                    }
+                )
+        # 기존 청크 스캔과 같은 우선순위: 염색체 순서 -> 좌표 -> 정방향 우선
+        ref_order = {ref: i for i, ref in enumerate(index.references)}
+        placements.sort(key=lambda p: (ref_order[p["chrom"]], p["genomic_start"], p["strand"] != "+"))
+        return placements
+
     def locate_template_in_genome(self, template_seq: str) -> Optional[Dict]:
-        """Stage 1: 입력된 템플릿 서열의 1-based 게놈 좌표 탐색 (메모리 최적화 - 청크 스캔)"""
+        """Stage 1: 입력된 템플릿 서열의 1-based 게놈 좌표 탐색
+
+        인덱스가 있으면 모든 위치를 조회해 `placements`에 담고 첫 위치를 대표값으로 반환합니다.
+        인덱스가 없으면 첫 일치 위치에서 멈추는 청크 스캔(메모리 최적화)으로 대체합니다.
+        """
+        return self.locate_templates_in_genome([template_seq])[0]
+
+    def locate_templates_in_genome(self, templates: List[str]) -> List[Optional[Dict]]:
+        """Stage 1 배치: 여러 템플릿의 게놈 위치를 한 번에 탐색 (입력 순서대로 반환)
+
+        인덱스로 조회할 수 없는 템플릿은 모아서 청크마다 단일 패스 다중 패턴 스캔으로 함께 찾고,
+        모든 템플릿의 첫 위치(염색체 순서 -> 좌표 -> 정방향 우선)를 찾으면 스캔을 멈춥니다.
+        """
+        results: List[Optional[Dict]] = [None] * len(templates)
+        pending: Dict[str, List[int]] = {}
+        for i, template_seq in enumerate(templates):
+            placements = self.find_template_placements(template_seq)
+            if placements is None:
+                pending.setdefault(template_seq, []).append(i)
+            elif placements:
+                results[i] = {**placements[0], "placements": placements}
+
+        found = self._scan_templates_chunked([t for t in pending if t])
+        for template_seq, indices in pending.items():
+            placement = found.get(template_seq)
+            if placement is not None:
+                for i in indices:
+                    results[i] = {**placement, "placements": [dict(placement)]}
+        return results
+
+    def _scan_templates_chunked(self, templates: List[str]) -> Dict[str, Dict]:
+        """5MB 청크 스캔으로 템플릿별 첫 게놈 위치를 찾음 (템플릿 -> placement)"""
+        found: Dict[str, Dict] = {}
+        if not templates:
+            return found
+
+        # 검색 서열 -> (템플릿, 가닥) 목록 (팰린드롬 템플릿은 정방향이 먼저)
+        owners: Dict[str, List[Tuple[str, str]]] = {}
+        for template_seq in templates:
+            for strand, seq in (("+", template_seq), ("-", reverse_complement(template_seq))):
+                owners.setdefault(seq, []).append((template_seq, strand))
+        find_seqs = [s for s in owners if s.strip("ACGT")]
+        scan_seqs = [s for s in owners if not s.strip("ACGT")]
+        scanner = MultiPatternScanner(scan_seqs) if scan_seqs else None
+
         chunk_size = 5_000_000  # 5MB 단위로 쪼개서 로드 (OOM 방지)
-        overlap = len(template_seq) # 청크 경계선에 걸친 서열을 찾기 위한 오버랩
-        
+        overlap = max(len(t) for t in templates)  # 청크 경계선에 걸친 서열을 찾기 위한 오버랩
+        chunk_size = max(chunk_size, overlap * 2)
+
         for ref in self.genome.references:
             ref_len = self.genome.get_reference_length(ref)
-            
+
             for start_idx in range(0, ref_len, chunk_size - overlap):
                 end_idx = min(start_idx + chunk_size, ref_len)
-                
+
                 try:
                     # 염색체 전체가 아닌 5MB 구간만 읽어옵니다.
-                    chunk_seq = self.genome.fetch(ref, start_idx, end_idx)
+                    chunk_seq = self.fetch_chunk(ref, start_idx, end_idx)
                 except Exception:
                     continue
-                    
-                pos = chunk_seq.find(template_seq)
-                if pos != -1:
-                    return {
-                        "chrom": ref,
-                        "genomic_start": start_idx + pos + 1,
-                        "strand": "+",
-                        "template_length": len(template_seq)
-                    }
-                
-                rev_seq = reverse_complement(template_seq)
-                pos = chunk_seq.find(rev_seq)
-                if pos != -1:
-                    return {
-                        "chrom": ref,
-                        "genomic_start": start_idx + pos + 1,
-                        "strand": "-",
-                        "template_length": len(template_seq)
-                    }
-        return None
+
+                limit = len(chunk_seq) if end_idx == ref_len else chunk_size - overlap
+                hits = []
+                if find_seqs:
+                    text = chunk_text(chunk_seq)
+                    for seq in find_seqs:
+                        pos = text.find(seq)
+                        if pos != -1 and pos < limit:
+                            hits.append((pos, seq))
+                if scanner:
+                    hits.extend((pos, scanner.patterns[pid]) for pos, pid in scanner.scan(chunk_seq, limit))
+
+                for pos, seq in sorted(hits, key=lambda hit: (hit[0], owners[hit[1]][0][1] != "+")):
+                    for template_seq, strand in owners[seq]:
+                        if template_seq not in found:
+                            found[template_seq] = {
+                                "chrom": ref,
+                                "genomic_start": start_idx + pos + 1,
+                                "strand": strand,
+                                "template_length": len(template_seq),
+                            }
+                if len(found) == len(templates):
+                    return found
+        return found
 
     def map_to_genomic_coords(self, primer: Dict, template_info: Dict) -> Dict:
         """Stage 1.5: 1-based 로컬 좌표를 1-based 게놈 절대 좌표로 변환"""
@@ -193,57 +669,86 @@ class PrimerDesigner:
         intron_size_range: Optional[Tuple[int, int]] = None,
     ) -> bool:
         """Stage 2.2: 위치 및 구조 기반 필터링 (게놈 절대 좌표 사용)"""
-        g_start = primer["genomic_start"]
-        g_end = primer["genomic_end"]
-        g_strand = primer["genomic_strand"]
+        mask = self.local_db_filter_many(
+            chrom, [primer], junction_mode, restriction_enzymes, intron_inclusion, intron_size_range
+        )
+        return bool(mask[0])
+
+    def local_db_filter_many(
+        self,
+        chrom: str,
+        primers: List[Dict],
+        junction_mode: Literal["none", "flanking", "spanning"] = "none",
+        restriction_enzymes: List[str] = [],
+        intron_inclusion: bool = True,
+        intron_size_range: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """local_db_filter의 배치 버전: 후보 전체의 통과 여부를 boolean 마스크로 반환"""
+        g_start = np.fromiter((p["genomic_start"] for p in primers), dtype=np.int64, count=len(primers))
+        g_end = np.fromiter((p["genomic_end"] for p in primers), dtype=np.int64, count=len(primers))
+        plus = np.fromiter((p["genomic_strand"] == "+" for p in primers), dtype=bool, count=len(primers))
+        keep = np.ones(len(primers), dtype=bool)
+        if not len(primers):
+            return keep
 
         # 1. SNP 필터링 (3' end strictness, inclusive search 적용)
-        s_pos, e_pos = (g_end - 4, g_end) if g_strand == "+" else (g_start, g_start + 4)
-        self.cur.execute(
-            "SELECT COUNT(*) FROM snp WHERE chrom=? AND pos BETWEEN ? AND ?",
-            (chrom, s_pos, e_pos),
-        )
-        if self.cur.fetchone()[0] > 0:
-            return False
+        s_pos = np.where(plus, g_end - 4, g_start)
+        e_pos = np.where(plus, g_end, g_start + 4)
+        keep &= self.annotations.snps(chrom).count_many(s_pos, e_pos) == 0
 
         # 2. 제한효소 필터링
         if restriction_enzymes:
-            placeholders = ",".join(["?"] * len(restriction_enzymes))
-            query = f"SELECT COUNT(*) FROM restriction_site WHERE chrom=? AND name IN ({placeholders}) AND NOT (end < ? OR start > ?)"
-            self.cur.execute(query, (chrom, *restriction_enzymes, g_start, g_end))
-            if self.cur.fetchone()[0] > 0:
-                return False
+            keep &= ~self.annotations.has_restriction_site_many(chrom, restriction_enzymes, g_start, g_end)
 
         # 3. Exon/Intron 구조 필터링
-        self.cur.execute("SELECT start, end FROM exon WHERE chrom=? ORDER BY start", (chrom,))
-        exons = self.cur.fetchall()
-        
+        exons = self.annotations.exons(chrom)
+
         # Intron Inclusion 로직
-        is_in_intron = any(
-            g_start > exons[i][1] and g_end < exons[i + 1][0]
-            for i in range(len(exons) - 1)
-        )
-        if not intron_inclusion and is_in_intron:
-            return False
+        is_in_intron, intron_size = exons.intron_size_many(g_start, g_end)
+        if not intron_inclusion:
+            keep &= ~is_in_intron
 
         # Intron Size 제한 확인
-        if is_in_intron and intron_size_range:
-            for i in range(len(exons) - 1):
-                if g_start > exons[i][1] and g_end < exons[i + 1][0]:
-                    i_size = exons[i + 1][0] - exons[i][1]
-                    if not (intron_size_range[0] <= i_size <= intron_size_range[1]):
-                        return False
-                        
+        if intron_size_range:
+            size_ok = (intron_size_range[0] <= intron_size) & (intron_size <= intron_size_range[1])
+            keep &= ~is_in_intron | size_ok
+
         # Exon Junction Spanning 로직
         if junction_mode == "spanning":
-            is_on_junction = any(
-                g_start < e[1] and g_end > exons[idx + 1][0]
-                for idx, e in enumerate(exons[:-1])
-            )
-            if not is_on_junction:
-                return False
+            keep &= exons.spans_junction_many(g_start, g_end)
+
+        return keep
+
+    def _is_excluded_hit(
+        self,
+        ref: str,
+        pos_1based: int,
+        end_1based: int,
+        target_chrom: str,
+        target_start: int,
+        target_end: int,
+        snp_exclusion: bool,
+        splice_variant_handling: bool,
+    ) -> bool:
+        """오프타겟 후보가 타겟 구간/스플라이스 변이/SNP 위치라서 집계에서 제외되는지 여부"""
+        if ref == target_chrom and target_start <= pos_1based <= target_end:
+            return True
+
+        if splice_variant_handling and self.annotations.exons(ref).contains(pos_1based, end_1based):
+            return True
+
+        if snp_exclusion and self.annotations.snps(ref).count(pos_1based, end_1based) > 0:
+            return True
+
+        return False
 
-        return True
+    def specificity_pool(self, primers: List[Dict], mispriming_library: bool = False) -> Dict[str, Dict]:
+        """특이성 검사 대상 (서열 -> 프라이머). 같은 서열은 한 번만 검사하며 처음 나온 위치에 마지막 항목을 둠"""
+        # 1. Mispriming Library (반복 서열) 필터링
+        if mispriming_library:
+            repeats = self.annotations.repeats
+            primers = [p for p in primers if not repeats(p["chrom"]).overlaps(p["genomic_start"], p["genomic_end"])]
+        return {p["seq"]: p for p in primers}
 
     def filter_specific_primers(
         self,
@@ -256,96 +761,263 @@ class PrimerDesigner:
         splice_variant_handling: bool = False,
         max_hits=50,
         mismatch_cutoff=2,
+        seed_mismatches: int = 0,
+        progress: Optional[ProgressCallback] = None,
+        should_stop: Optional[StopCallback] = None,
     ) -> List[Dict]:
-        """Stage 2.3: 게놈 전체 특이성 일괄 검사 (메모리 최적화 - 청크 스캔)"""
-        valid_primers = []
+        """Stage 2.3: 게놈 전체 특이성 일괄 검사
 
-        # 1. Mispriming Library (반복 서열) 필터링
-        if mispriming_library:
-            for p in primers:
-                self.cur.execute(
-                    "SELECT COUNT(*) FROM repeats WHERE chrom=? AND NOT (end < ? OR start > ?)",
-                    (p["chrom"], p["genomic_start"], p["genomic_end"]),
-                )
-                if self.cur.fetchone()[0] == 0:
-                    valid_primers.append(p)
-        else:
-            valid_primers = primers.copy()
+        genome index가 있으면 배치 전체를 seed-and-extend로 조회하고(`seed_mismatches`개 이하 근사 일치 포함),
+        없으면 청크마다 단일 패스 다중 패턴 스캔(정확 일치)으로 대체합니다. 인덱스로 근사 일치를 보장할 수 없는데
+        `seed_mismatches > 0`이면 ValueError를 발생시킵니다. 오프타겟 판정 규칙은 두 경로가 동일합니다.
+        스캔 중 `progress("specificity", {...})`로 진행 상황을 알리고, `should_stop()`이 True면 DesignCancelled를 발생시킵니다.
+        """
+        check = {
+            "primers": primers,
+            "target_chrom": target_chrom,
+            "target_start": target_start,
+            "target_end": target_end,
+            "mispriming_library": mispriming_library,
+            "snp_exclusion": snp_exclusion,
+            "splice_variant_handling": splice_variant_handling,
+            "max_hits": max_hits,
+            "mismatch_cutoff": mismatch_cutoff,
+        }
+        return self.filter_specific_primers_many([check], seed_mismatches, progress, should_stop)[0]
 
-        primer_pool = {p["seq"]: p for p in valid_primers}
-        hit_counts = {p["seq"]: 0 for p in valid_primers}
+    def filter_specific_primers_many(
+        self,
+        checks: List[Dict],
+        seed_mismatches: int = 0,
+        progress: Optional[ProgressCallback] = None,
+        should_stop: Optional[StopCallback] = None,
+    ) -> List[List[Dict]]:
+        """여러 템플릿의 특이성 검사를 게놈 1회 패스로 처리
 
-        # 5MB 청크 세팅 (오버랩은 프라이머 최대 길이)
-        chunk_size = 5_000_000
-        overlap = max(len(p["seq"]) for p in valid_primers) if valid_primers else 30
+        `checks`의 각 항목은 filter_specific_primers의 키워드 인자(primers, target_chrom, ...)이며,
+        템플릿마다 타겟 구간/플래그/임계값이 달라도 됩니다. 모든 템플릿의 프라이머 서열을 합쳐 한 번만 스캔하고,
+        히트마다 그 서열을 가진 템플릿별 규칙으로 판정합니다. 서열은 모든 템플릿에서 탈락하면 스캔에서 빠집니다.
+        """
+        runs = [_SpecificityCheck(self, **check) for check in checks]
+        primer_seqs = {p_seq for run in runs for p_seq in run.primer_pool}
 
-        for ref in self.genome.references:
+        index = self.genome_index
+        use_index = index is not None and all(index.covers(len(s), seed_mismatches) for s in primer_seqs)
+        if seed_mismatches > 0 and not use_index:
+            # 청크 스캔은 정확 일치만 찾으므로 근사 오프타겟을 확인하지 않은 채 통과시키지 않음
+            raise ValueError(
+                f"seed_mismatches={seed_mismatches}: genome index가 없거나 이 프라이머 길이의 근사 일치를 "
+                "누락 없이 찾을 수 없습니다. (k/step이 더 작은 인덱스 필요)"
+            )
+        mode = seed_mismatches if use_index else 0
+        if index is not None and use_index:
+            # 염색체당 수만 번 나오는 고반복 시드를 가진 프라이머는 조회하지 않고 비특이적으로 탈락
+            repetitive = index.repetitive(
+                (s for p_seq in primer_seqs for s in (p_seq, reverse_complement(p_seq))), seed_mismatches
+            )
+            for run in runs:
+                for p_seq in list(run.primer_pool):
+                    if p_seq in repetitive or reverse_complement(p_seq) in repetitive:
+                        del run.primer_pool[p_seq]
+
+        # 2. 캐시된 히트 목록으로 판정 가능한 프라이머는 스캔 대상에서 제외
+        owners: Dict[str, List[_SpecificityCheck]] = {}
+        for run in runs:
+            for p_seq in list(run.primer_pool):
+                entry = self.specificity_cache.get(mode, p_seq)
+                self.stats["specificity_cache_hits" if entry is not None else "specificity_cache_misses"] += 1
+                if entry is None:
+                    owners.setdefault(p_seq, []).append(run)
+                    continue
+                cached_hits, complete = entry
+                if any(run.rejects(p_seq, hit) for hit in cached_hits):
+                    del run.primer_pool[p_seq]
+                elif not complete:
+                    run.hit_counts[p_seq] = 0
+                    owners.setdefault(p_seq, []).append(run)
+
+        # 3. 나머지는 게놈 스캔 (히트는 제외 규칙 적용 전 원본으로 기록)
+        scan_pool = dict.fromkeys(owners, True)  # 아직 탈락하지 않은 프라이머 (삽입 순서 유지 집합)
+        recorded = {p_seq: [] for p_seq in scan_pool}
+
+        def record_hit(p_seq: str, ref: str, pos_1based: int, end_1based: int, mm: int) -> bool:
+            """오프타겟 1건(mm: 3' 말단 10nt 미스매치 수)을 반영하고, 모든 템플릿에서 탈락하면 True"""
+            hit = (ref, pos_1based, end_1based, mm)
+            recorded[p_seq].append(hit)
+            alive = []
+            for run in owners[p_seq]:
+                if run.rejects(p_seq, hit):
+                    del run.primer_pool[p_seq]
+                else:
+                    alive.append(run)
+            owners[p_seq] = alive
+            if not alive:
+                del scan_pool[p_seq]
+                return True
+            return False
+
+        def report(payload: Dict) -> None:
+            if should_stop is not None and should_stop():
+                raise DesignCancelled()
+            if progress is not None:
+                progress("specificity", {**payload, "remaining": sum(len(run.primer_pool) for run in runs)})
+
+        if scan_pool:
+            if index is not None and use_index:
+                self._scan_specificity_indexed(index, scan_pool, record_hit, seed_mismatches, report)
+            else:
+                self._scan_specificity_chunked(scan_pool, record_hit, report)
+
+        # 탈락하지 않고 끝까지 스캔된 프라이머의 목록만 완전한 목록
+        for p_seq, hits in recorded.items():
+            self.specificity_cache.put(mode, p_seq, hits, complete=p_seq in scan_pool)
+
+        return [list(run.primer_pool.values()) for run in runs]
+
+    def _scan_specificity_indexed(
+        self, index: GenomeKmerIndex, primer_pool: Dict[str, bool], record_hit, seed_mismatches: int, report=None
+    ) -> None:
+        """배치 seed-and-extend 조회 (프라이머 정방향/역상보 서열을 한 번에 시드 조회)
+
+        서로 역상보인 프라이머는 검색 서열을 공유하므로, 검색 서열마다 히트를 한 번 순회하며
+        그 서열을 가진 모든 프라이머에 반영합니다. (`_ChunkScanPlan.owners`와 같은 규칙)
+        """
+        owners: Dict[str, List[str]] = {}
+        for p_seq in primer_pool:
+            for search_seq in (p_seq, reverse_complement(p_seq)):
+                owners.setdefault(search_seq, []).append(p_seq)
+        hits = index.search_many(owners, self.fetch, seed_mismatches)
+        total = len(primer_pool)
+        for checked, (search_seq, seq_owners) in enumerate(owners.items()):
+            if report is not None and checked % 100 == 0:
+                report({"primers_checked": checked * total // len(owners), "primers_total": total})
+            if not any(p_seq in primer_pool for p_seq in seq_owners):
+                continue
+            for ref, start, _, off_target in hits[search_seq]:
+                for p_seq in seq_owners:
+                    if p_seq in primer_pool:
+                        mm = needleman_wunsch_mismatch(p_seq[-10:], off_target[-10:])
+                        record_hit(p_seq, ref, start + 1, start + len(search_seq), mm)
+                if not any(p_seq in primer_pool for p_seq in seq_owners):
+                    break
+
+    def _scan_specificity_chunked(self, primer_pool: Dict[str, bool], record_hit, report=None) -> None:
+        """5MB 청크 슬라이딩 스캔: 청크마다 모든 프라이머/역상보 서열을 한 번의 패스로 탐색"""
+        if not primer_pool:
+            return
+        if self.scan_executor is not None:
+            self._scan_specificity_parallel(self.scan_executor, primer_pool, record_hit, report)
+            return
+
+        plan = _ChunkScanPlan(primer_pool)
+        references = self.genome.references
+        for ref_no, ref in enumerate(references):
             if not primer_pool:
                 break
-            
-            ref_len = self.genome.get_reference_length(ref)
+            started = time.perf_counter()
 
             # 5MB씩 슬라이딩 스캔
-            for start_idx in range(0, ref_len, chunk_size - overlap):
+            for start_idx, end_idx, limit in plan.chunks(self.genome.get_reference_length(ref)):
                 if not primer_pool:
                     break
-                    
-                try:
-                    end_idx = min(start_idx + chunk_size, ref_len)
-                    chunk_seq = self.genome.fetch(ref, start_idx, end_idx)
-                except Exception:
-                    continue
+                if report is not None:
+                    report(
+                        {
+                            "chrom": ref,
+                            "chrom_index": ref_no + 1,
+                            "chrom_total": len(references),
+                            "chrom_progress": round(start_idx / self.genome.get_reference_length(ref), 4),
+                        }
+                    )
+
+                self._scan_chunk(plan, ref, start_idx, end_idx, limit, primer_pool, record_hit)
+            self._add_scan_time(ref, time.perf_counter() - started)
+
+    def _scan_chunk(
+        self, plan: _ChunkScanPlan, ref: str, start_idx: int, end_idx: int, limit: int, primer_pool, record_hit
+    ) -> None:
+        """청크 1개를 현재 프로세스에서 스캔 (읽지 못한 청크는 건너뜀)"""
+        try:
+            chunk_seq = self.fetch_chunk(ref, start_idx, end_idx)
+        except Exception:
+            return
 
-                for p_seq in list(primer_pool.keys()):
-                    for search_seq in [p_seq, reverse_complement(p_seq)]:
-                        pos = chunk_seq.find(search_seq)
-                        
-                        while pos != -1:
-                            # 로컬 chunk 안에서의 pos를 게놈 절대 좌표(1-based)로 변환
-                            pos_1based = start_idx + pos + 1
-                            end_1based = start_idx + pos + len(search_seq)
-
-                            if ref == target_chrom and target_start <= pos_1based <= target_end:
-                                pos = chunk_seq.find(search_seq, pos + 1)
-                                continue
-
-                            if splice_variant_handling:
-                                self.cur.execute(
-                                    "SELECT transcript_id FROM exon WHERE chrom=? AND start <= ? AND end >= ?",
-                                    (ref, pos_1based, end_1based),
-                                )
-                                if self.cur.fetchone():
-                                    pos = chunk_seq.find(search_seq, pos + 1)
-                                    continue
-
-                            if snp_exclusion:
-                                self.cur.execute(
-                                    "SELECT COUNT(*) FROM snp WHERE chrom=? AND pos BETWEEN ? AND ?",
-                                    (ref, pos_1based, end_1based),
-                                )
-                                if self.cur.fetchone()[0] > 0:
-                                    pos = chunk_seq.find(search_seq, pos + 1)
-                                    continue
-
-                            # 3' 말단 미스매치 정밀 검사
-                            off_target = chunk_seq[pos : pos + len(p_seq)]
-                            mm = needleman_wunsch_mismatch(p_seq[-10:], off_target[-10:])
-                            
-                            if mm < mismatch_cutoff:
-                                del primer_pool[p_seq]
-                                break 
-                                
-                            hit_counts[p_seq] += 1
-                            if hit_counts[p_seq] > max_hits:
-                                del primer_pool[p_seq]
-                                break
-
-                            pos = chunk_seq.find(search_seq, pos + 1)
-
-                    if p_seq not in primer_pool:
-                        break
-
-        return list(primer_pool.values())
+        for pos, length, p_seq, mm in plan.chunk_hits(chunk_seq, limit, primer_pool):
+            if p_seq not in primer_pool:
+                continue
+            # 로컬 chunk 안에서의 pos를 게놈 절대 좌표(1-based)로 변환
+            record_hit(p_seq, ref, start_idx + pos + 1, start_idx + pos + length, mm)
+
+    def _scan_specificity_parallel(
+        self, executor: Executor, primer_pool: Dict[str, bool], record_hit, report=None
+    ) -> None:
+        """청크 스캔을 프로세스 풀에 나눠 실행 (워커마다 자체 게놈 핸들)
+
+        청크 작업은 제출 시점에 남아 있는 프라이머만 검색하므로, 어느 청크에서든 탈락한 프라이머는
+        이후 작업에서 빠지고 모든 프라이머가 탈락하면 남은 작업을 취소합니다.
+        히트 판정은 부모 프로세스의 record_hit에서만 하므로 결과는 순차 스캔과 같습니다.
+        워커에서 실패한 청크는 순차 스캔처럼 건너뛰고, 풀이 깨지면(BrokenProcessPool) 풀을 내려놓고
+        남은 청크를 이 프로세스에서 이어서 스캔합니다.
+        """
+        overlap = _ChunkScanPlan.overlap_for(primer_pool)
+        tasks = [
+            (ref, start_idx, end_idx, limit)
+            for ref in self.genome.references
+            for start_idx, end_idx, limit in _ChunkScanPlan.chunk_ranges(self.genome.get_reference_length(ref), overlap)
+        ]
+        in_flight: Dict[Future, Tuple] = {}
+        submitted = done = 0
+        max_in_flight = 2 * self.scan_workers
+        remaining: List[Tuple] = []
+        try:
+            while submitted < len(tasks) or in_flight:
+                while primer_pool and submitted < len(tasks) and len(in_flight) < max_in_flight:
+                    task = tasks[submitted]
+                    in_flight[executor.submit(scan_chunk_task, *task, tuple(primer_pool))] = task
+                    submitted += 1
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    try:
+                        hits, seconds = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception:
+                        hits, seconds = None, 0.0
+                    ref, start_idx, end_idx, _ = in_flight.pop(future)
+                    done += 1
+                    if hits is None:
+                        continue
+                    # 워커에서 쓴 시간과 읽은 바이트 (염색체별 시간은 워커 시간의 합)
+                    self._add_scan_time(ref, seconds)
+                    self.stats["fasta_bytes"] += end_idx - start_idx
+                    for pos, length, p_seq, mm in hits:
+                        if p_seq in primer_pool:
+                            record_hit(p_seq, ref, start_idx + pos + 1, start_idx + pos + length, mm)
+                if report is not None:
+                    report({"chrom": ref, "chunks_done": done, "chunks_total": len(tasks)})
+        except BrokenProcessPool:
+            # 워커가 죽은 풀은 다시 쓸 수 없으므로 소유자(DesignerPool)가 새 풀로 바꾸도록 넘기고,
+            # 결과를 받지 못한 청크는 아래에서 순차 스캔
+            self.broken_scan_executor, self.scan_executor = executor, None
+            remaining = sorted(in_flight.values(), key=tasks.index) + tasks[submitted:]
+            in_flight.clear()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        plan = _ChunkScanPlan(primer_pool) if remaining else None
+        for ref, start_idx, end_idx, limit in remaining:
+            if plan is None or not primer_pool:
+                break
+            started = time.perf_counter()
+            self._scan_chunk(plan, ref, start_idx, end_idx, limit, primer_pool, record_hit)
+            self._add_scan_time(ref, time.perf_counter() - started)
+            done += 1
+            if report is not None:
+                report({"chrom": ref, "chunks_done": done, "chunks_total": len(tasks)})
 
     def pair_primers(
         self,
@@ -353,17 +1025,29 @@ class PrimerDesigner:
         product_range=(100, 300),
         max_tm_diff=3.0,
         opt_tm=60.0,
+        top_k: Optional[int] = None,
     ) -> List[Dict]:
-        """Stage 2.4: 최종 페어링 및 Penalty 스코어링"""
+        """Stage 2.4: 최종 페어링 및 Penalty 스코어링
+
+        reverse 프라이머를 end 기준으로 정렬해 두고, forward마다 product_range를 만족하는 end 구간만
+        이분 탐색으로 잘라 방문합니다. `top_k`가 있으면 크기 k의 힙으로 상위 페어만 유지합니다.
+        정렬 순서는 (penalty, forward 입력 순서, reverse 입력 순서)로 전체 쌍을 안정 정렬한 결과와 같습니다.
+        """
+        if top_k is not None and top_k <= 0:
+            return []
         fwd = [p for p in primers if p["strand"] == "+"]
         rev = [p for p in primers if p["strand"] == "-"]
+        rev_order = sorted(range(len(rev)), key=lambda ri: rev[ri]["end"])
+        rev_ends = [rev[ri]["end"] for ri in rev_order]
+
+        heap: List[Tuple] = []  # (-penalty, -fi, -ri, pair): 루트가 현재 최악의 페어
         pairs = []
-        for f in fwd:
-            for r in rev:
-                # [수정] 생물학적으로 올바른 Product Size 계산 (1-based 기준)
-                size = r["end"] - f["start"] + 1
-                if not (product_range[0] <= size <= product_range[1]):
-                    continue
+        for fi, f in enumerate(fwd):
+            # [수정] 생물학적으로 올바른 Product Size 계산 (1-based 기준): size = r.end - f.start + 1
+            lo = bisect.bisect_left(rev_ends, f["start"] + product_range[0] - 1)
+            hi = bisect.bisect_right(rev_ends, f["start"] + product_range[1] - 1)
+            for ri in sorted(rev_order[lo:hi]):
+                r = rev[ri]
 
                 # Tm 차이 및 페널티 계산 (UI 설정값 opt_tm 반영)
                 tm_diff = abs(f["tm"] - r["tm"])
@@ -376,12 +1060,23 @@ class PrimerDesigner:
                     + abs(r["dg3"] + 8.0)
                     + (tm_diff * 2)
                 )
-                pairs.append(
-                    {
-                        "fwd": f,
-                        "rev": r,
-                        "product_size": size,
-                        "penalty": penalty,
-                    }
-                )
-        return sorted(pairs, key=lambda x: x["penalty"])
\ No newline at end of file
+                key = (-penalty, -fi, -ri)
+                if top_k is not None and len(heap) >= top_k and key <= heap[0][:3]:
+                    continue
+                pair = {
+                    "fwd": f,
+                    "rev": r,
+                    "product_size": r["end"] - f["start"] + 1,
+                    "tm_diff": tm_diff,
+                    "penalty": penalty,
+                }
+                if top_k is None:
+                    pairs.append(pair)
+                elif len(heap) < top_k:
+                    heapq.heappush(heap, (*key, pair))
+                else:
+                    heapq.heapreplace(heap, (*key, pair))
+
+        if top_k is not None:
+            return [item[3] for item in sorted(heap, reverse=True)]
+        return sorted(pairs, key=lambda x: x["penalty"])
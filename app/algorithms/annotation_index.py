@@ -0,0 +1,431 @@
+import json
+import mmap
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeGuard,
+    Union,
+    cast,
+)
+
+import numpy as np
+
+
+############################################
+# 정렬 배열 기반 구간 트랙
+############################################
+class PointTrack:
+    """정렬된 좌표 배열 (SNP 위치 등)"""
+
+    def __init__(self, positions: np.ndarray):
+        self.positions = np.sort(positions)
+
+    @classmethod
+    def from_sorted(cls, positions: np.ndarray) -> "PointTrack":
+        """이미 정렬된 배열을 복사 없이 사용 (스냅샷 mmap 뷰 등)"""
+        track = cls.__new__(cls)
+        track.positions = positions
+        return track
+
+    def count(self, lo: int, hi: int) -> int:
+        """lo <= pos <= hi 인 좌표 수"""
+        return int(
+            np.searchsorted(self.positions, hi, side="right")
+            - np.searchsorted(self.positions, lo, side="left")
+        )
+
+    def count_many(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """구간 배열 [lo_i, hi_i] 각각에 들어가는 좌표 수"""
+        return np.searchsorted(self.positions, hi, side="right") - np.searchsorted(self.positions, lo, side="left")
+
+
+class IntervalTrack:
+    """(start, end) 오름차순 정렬 구간 + 누적 최대 end 배열
+
+    start <= x 인 구간들 중 가장 큰 end를 O(log n)으로 구할 수 있어, 겹침/포함 질의를
+    구간 전체 스캔 없이 bisect 한 번으로 처리합니다.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        order = np.lexsort((ends, starts))
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    @classmethod
+    def from_sorted(cls, starts: np.ndarray, ends: np.ndarray, max_end: np.ndarray) -> "IntervalTrack":
+        """정렬/누적 최대가 끝난 배열을 복사 없이 사용 (스냅샷 mmap 뷰 등)"""
+        track = cls.__new__(cls)
+        track.starts, track.ends, track.max_end = starts, ends, max_end
+        return track
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, lo: int, hi: int) -> bool:
+        """NOT (end < lo OR start > hi) 인 구간 존재 여부"""
+        idx = int(np.searchsorted(self.starts, hi, side="right"))
+        return idx > 0 and int(self.max_end[idx - 1]) >= lo
+
+    def contains(self, lo: int, hi: int) -> bool:
+        """start <= lo AND end >= hi 인 구간 존재 여부"""
+        idx = int(np.searchsorted(self.starts, lo, side="right"))
+        return idx > 0 and int(self.max_end[idx - 1]) >= hi
+
+    def intron_size(self, lo: int, hi: int) -> Optional[int]:
+        """start 순으로 인접한 구간 i, i+1 사이(end_i < lo, hi < start_(i+1))에 들어가면 그 간격 크기
+
+        start_(i+1) > hi 인 첫 i 이후의 구간은 end >= start > hi 이므로 조건을 만족하는 i는 최대 하나입니다.
+        """
+        n = len(self.starts)
+        i = int(np.searchsorted(self.starts[1:], hi, side="right"))
+        if i <= n - 2 and self.ends[i] < lo:
+            return int(self.starts[i + 1] - self.ends[i])
+        return None
+
+    def spans_junction(self, lo: int, hi: int) -> bool:
+        """인접 구간 i, i+1에 대해 lo < end_i AND hi > start_(i+1) 인 i 존재 여부"""
+        j = int(np.searchsorted(self.starts, hi, side="left"))
+        return j >= 2 and int(self.max_end[j - 2]) > lo
+
+    # 배열 질의: 위 메서드들과 같은 판정을 (lo, hi) 배열 전체에 대해 한 번에 계산
+    def overlaps_many(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        if not len(self.starts):
+            return np.zeros(len(lo), dtype=bool)
+        idx = np.searchsorted(self.starts, hi, side="right")
+        return (idx > 0) & (self.max_end[np.maximum(idx - 1, 0)] >= lo)
+
+    def intron_size_many(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(인트론 포함 여부 마스크, 해당 인트론 크기 배열 — 마스크가 False인 위치는 의미 없음)"""
+        n = len(self.starts)
+        if n < 2:
+            return np.zeros(len(lo), dtype=bool), np.zeros(len(lo), dtype=np.int64)
+        i = np.searchsorted(self.starts[1:], hi, side="right")
+        ic = np.minimum(i, n - 2)
+        inside = (i <= n - 2) & (self.ends[ic] < lo)
+        return inside, self.starts[ic + 1] - self.ends[ic]
+
+    def spans_junction_many(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        if len(self.starts) < 2:
+            return np.zeros(len(lo), dtype=bool)
+        j = np.searchsorted(self.starts, hi, side="left")
+        return (j >= 2) & (self.max_end[np.maximum(j - 2, 0)] > lo)
+
+
+# 트랙 키 (테이블, 염색체[, 효소 이름]) → 트랙 좌표를 읽는 SQL. snp만 점 트랙
+TRACK_QUERIES = {
+    "snp": "SELECT pos FROM snp WHERE chrom=? AND pos IS NOT NULL",
+    "exon": "SELECT start, end FROM exon WHERE chrom=? AND start IS NOT NULL AND end IS NOT NULL",
+    "repeats": "SELECT start, end FROM repeats WHERE chrom=? AND start IS NOT NULL AND end IS NOT NULL",
+    "restriction_site": (
+        "SELECT start, end FROM restriction_site WHERE chrom=? AND name=? AND start IS NOT NULL AND end IS NOT NULL"
+    ),
+}
+
+
+def _track_from_rows(rows: np.ndarray, point: bool):
+    if point:
+        return PointTrack(rows.reshape(-1))
+    rows = rows.reshape(-1, 2)
+    return IntervalTrack(rows[:, 0], rows[:, 1])
+
+
+def annotation_db_fingerprint(conn: sqlite3.Connection, annotation_db: str) -> Dict:
+    """스냅샷이 어떤 DB 내용으로 만들어졌는지 식별
+
+    build_db.py가 남긴 build_manifest(테이블별 원천 체크섬/행 수)가 있으면 내용 기준이라 DB 파일을
+    복사해도 유지되고, 없으면 파일 크기/수정 시각을 사용합니다.
+    """
+    has_manifest = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='build_manifest'"
+    ).fetchone()
+    if has_manifest:
+        rows = conn.execute("SELECT table_name, checksum, row_count FROM build_manifest ORDER BY table_name")
+        return {"manifest": [list(row) for row in rows]}
+    stat = os.stat(annotation_db)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+############################################
+# 열 지향 어노테이션 스냅샷 (mmap)
+############################################
+SNAPSHOT_META_SUFFIX = ".annot.json"
+SNAPSHOT_DATA_SUFFIX = ".annot.i64"
+
+SNAPSHOT_VERSION = 1
+
+
+class AnnotationSnapshot:
+    """트랙별 정렬 좌표 배열을 이어 붙인 int64 파일 + 트랙 오프셋 테이블
+
+    점 트랙은 positions, 구간 트랙은 starts/ends/max_end를 정렬·누적이 끝난 상태로 저장하므로
+    로드 시 SQLite 조회/파싱/정렬 없이 mmap 뷰를 그대로 트랙으로 씁니다. 같은 파일을 여는
+    워커 프로세스끼리 OS 페이지 캐시를 공유합니다.
+    """
+
+    def __init__(self, prefix: str):
+        with open(prefix + SNAPSHOT_META_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"지원하지 않는 어노테이션 스냅샷 버전입니다: {meta.get('version')}")
+
+        self.prefix = prefix
+        self.db: Dict = meta["db"]
+        self._entries: Dict[str, List[int]] = meta["tracks"]
+        self._file = open(prefix + SNAPSHOT_DATA_SUFFIX, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # 빈 파일은 mmap할 수 없음
+            self._mmap = None
+
+    @staticmethod
+    def exists(prefix: Optional[str]) -> TypeGuard[str]:
+        if not prefix:
+            return False
+        return all(os.path.exists(prefix + s) for s in (SNAPSHOT_META_SUFFIX, SNAPSHOT_DATA_SUFFIX))
+
+    @staticmethod
+    def entry_key(key: Tuple) -> str:
+        return "\t".join(key)
+
+    def check_db(self, fingerprint: Dict) -> None:
+        if fingerprint != self.db:
+            raise ValueError("어노테이션 스냅샷이 annotations.db와 일치하지 않습니다. 스냅샷을 다시 만드세요.")
+
+    def track(self, key: Tuple, point: bool):
+        """키에 해당하는 트랙 (DB에 행이 없던 키는 빈 트랙)"""
+        entry = self._entries.get(self.entry_key(key))
+        if entry is None or self._mmap is None:
+            return _track_from_rows(np.zeros(0, dtype=np.int64), point)
+        offset, count = entry
+        width = 1 if point else 3
+        arrays = np.frombuffer(self._mmap, dtype=np.int64, count=width * count, offset=offset).reshape(width, count)
+        if point:
+            return PointTrack.from_sorted(arrays[0])
+        return IntervalTrack.from_sorted(arrays[0], arrays[1], arrays[2])
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 트랙 뷰가 아직 살아 있으면 매핑은 GC 때 해제
+                pass
+            self._mmap = None
+        self._file.close()
+
+
+def invalidate_annotation_snapshot(prefix: str) -> None:
+    """메타 파일을 지워 새로 여는 프로세스가 스냅샷 대신 SQLite를 쓰게 함 (DB 갱신 전에 호출)"""
+    if os.path.exists(prefix + SNAPSHOT_META_SUFFIX):
+        os.remove(prefix + SNAPSHOT_META_SUFFIX)
+
+
+def build_annotation_snapshot(
+    annotation_db: str,
+    prefix: str,
+    log: Callable[[str], None] = lambda msg: None,
+) -> Dict:
+    """annotations.db의 모든 트랙을 `prefix.annot.i64` + `prefix.annot.json`으로 저장
+
+    실행 중인 프로세스가 이전 파일을 mmap하고 있을 수 있으므로 새 파일을 만든 뒤 교체합니다.
+    """
+    out_dir = os.path.dirname(prefix)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    # 메타 파일을 마지막에 써서, 중간에 실패한 스냅샷은 exists()가 False
+    invalidate_annotation_snapshot(prefix)
+
+    conn = sqlite3.connect(f"{pathlib.Path(annotation_db).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        fingerprint = annotation_db_fingerprint(conn, annotation_db)
+        keys: List[Tuple] = []
+        for table in ("snp", "exon", "repeats"):
+            rows = conn.execute(f"SELECT DISTINCT chrom FROM {table} WHERE chrom IS NOT NULL ORDER BY chrom")
+            keys += [(table, chrom) for (chrom,) in rows]
+        rows = conn.execute(
+            "SELECT DISTINCT chrom, name FROM restriction_site "
+            "WHERE chrom IS NOT NULL AND name IS NOT NULL ORDER BY chrom, name"
+        )
+        keys += [("restriction_site", chrom, name) for chrom, name in rows]
+
+        entries: Dict[str, List[int]] = {}
+        offset = 0
+        data_path = prefix + SNAPSHOT_DATA_SUFFIX
+        with open(data_path + ".part", "wb") as out:
+            for key in keys:
+                point = key[0] == "snp"
+                rows = np.array(conn.execute(TRACK_QUERIES[key[0]], key[1:]).fetchall(), dtype=np.int64)
+                track = _track_from_rows(rows, point)
+                if isinstance(track, PointTrack):
+                    arrays = [track.positions]
+                else:
+                    arrays = [track.starts, track.ends, track.max_end]
+                for array in arrays:
+                    out.write(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+                entries[AnnotationSnapshot.entry_key(key)] = [offset, len(arrays[0])]
+                offset += 8 * len(arrays) * len(arrays[0])
+            log(f"   -> 트랙 {len(keys):,}개 저장 완료 ({offset / 1024 / 1024:.1f} MB)")
+        os.replace(data_path + ".part", data_path)
+    finally:
+        conn.close()
+
+    meta = {"version": SNAPSHOT_VERSION, "db": fingerprint, "tracks": entries}
+    with open(prefix + SNAPSHOT_META_SUFFIX + ".part", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(prefix + SNAPSHOT_META_SUFFIX + ".part", prefix + SNAPSHOT_META_SUFFIX)
+    return meta
+
+
+############################################
+# Annotation Index
+############################################
+class AnnotationIndex:
+    """annotations.db의 exon/SNP/제한효소/반복서열을 염색체별로 한 번만 읽어 메모리에 두는 인덱스
+
+    트랙은 처음 조회될 때 로드되며, 스레드 간(풀의 여러 PrimerDesigner 간) 공유해도 안전합니다.
+    `snapshot` prefix에 어노테이션 스냅샷이 있으면 SQLite 대신 mmap 뷰를 트랙으로 사용합니다.
+    캐시한 트랙은 모두 같은 DB 내용(`fingerprint`)에서 읽은 것이며, `db_fingerprint()`나 트랙 로드 중
+    DB가 바뀐 것(빌드/`--refresh`)을 발견하면 트랙과 스냅샷을 버리고 새 내용으로 다시 읽습니다.
+    """
+
+    # DB 파일 상태가 그대로여도 지문을 다시 읽는 주기 (초). 수정 시각 해상도 안에서 생긴 변경 대비
+    FINGERPRINT_TTL = 5.0
+
+    def __init__(self, annotation_db: str, snapshot: Optional[str] = None):
+        self.annotation_db = annotation_db
+        self.snapshot_prefix = snapshot
+        self._snapshot: Optional[AnnotationSnapshot] = None
+        self._snapshot_checked = False
+        self._tracks: Dict[Tuple, Union[PointTrack, IntervalTrack]] = {}
+        self._lock = threading.Lock()
+        self.fingerprint: Optional[Dict] = None  # 캐시한 트랙을 읽은 DB의 지문
+        # 마지막으로 확인한 (DB 파일 상태, 확인 시각, 지문). 요청마다 SQLite를 열지 않도록 재사용
+        self._checked: Optional[Tuple[Tuple, float, Dict]] = None
+        self.queries = 0  # 실행한 SQLite 조회 수 (지표용)
+
+    def _connect(self) -> sqlite3.Connection:
+        db_uri = f"{pathlib.Path(self.annotation_db).resolve().as_uri()}?mode=ro"
+        return sqlite3.connect(db_uri, uri=True)
+
+    def _use_fingerprint(self, fingerprint: Dict) -> None:
+        """(lock 안에서) 다른 DB 내용에서 읽은 트랙/스냅샷을 버리고 지문을 기록"""
+        if self.fingerprint is not None and fingerprint != self.fingerprint:
+            self._tracks = {}
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = None
+            self._snapshot_checked = False
+        self.fingerprint = fingerprint
+
+    def _db_stat(self) -> Tuple:
+        """DB 파일(과 WAL 파일)의 inode/크기/수정 시각. 커밋이나 파일 교체가 있으면 바뀜"""
+        stats = []
+        for path in (self.annotation_db, self.annotation_db + "-wal"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stats.append(None)
+                continue
+            stats.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        return tuple(stats)
+
+    def db_fingerprint(self) -> Dict:
+        """현재 DB 지문 (결과 캐시 키용). 캐시한 트랙과 다르면 트랙/스냅샷을 버림
+
+        DB 파일 상태가 마지막 확인 때와 같고 `FINGERPRINT_TTL` 안이면 SQLite를 열지 않고 그 지문을 돌려줍니다.
+        """
+        # 파일 상태를 지문보다 먼저 읽어, 그 사이 바뀌었으면 다음 호출에서 다시 확인
+        stat = self._db_stat()
+        checked = self._checked
+        if checked is not None and checked[0] == stat and time.monotonic() - checked[1] < self.FINGERPRINT_TTL:
+            return checked[2]
+
+        conn = self._connect()
+        try:
+            fingerprint = annotation_db_fingerprint(conn, self.annotation_db)
+        finally:
+            conn.close()
+        self._checked = (stat, time.monotonic(), fingerprint)
+        if fingerprint != self.fingerprint:
+            with self._lock:
+                self._use_fingerprint(fingerprint)
+        return fingerprint
+
+    def open_snapshot(self) -> Optional[AnnotationSnapshot]:
+        """스냅샷이 있으면 mmap하고 DB와 일치하는지 확인 (DB가 바뀔 때마다 한 번). 일치하지 않으면 ValueError"""
+        if self._snapshot_checked:
+            return self._snapshot
+        with self._lock:
+            if not self._snapshot_checked:
+                if AnnotationSnapshot.exists(self.snapshot_prefix):
+                    snapshot = AnnotationSnapshot(self.snapshot_prefix)
+                    conn = self._connect()
+                    try:
+                        fingerprint = annotation_db_fingerprint(conn, self.annotation_db)
+                        snapshot.check_db(fingerprint)
+                    except ValueError:
+                        snapshot.close()
+                        raise
+                    finally:
+                        conn.close()
+                    self._use_fingerprint(fingerprint)
+                    self._snapshot = snapshot
+                self._snapshot_checked = True
+        return self._snapshot
+
+    def _load(self, key: Tuple, point: bool = False) -> Union[PointTrack, IntervalTrack]:
+        track = self._tracks.get(key)
+        if track is not None:
+            return track
+        self.open_snapshot()
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is None:
+                # 확인 뒤 DB가 바뀌어 스냅샷을 버렸으면 SQLite에서 읽음
+                if self._snapshot is not None:
+                    track = self._snapshot.track(key, point)
+                else:
+                    conn = self._connect()
+                    self.queries += 1
+                    try:
+                        # 지문과 트랙을 한 읽기 트랜잭션에서 읽어, 갱신 중에도 한 가지 DB 내용만 캐시
+                        conn.execute("BEGIN")
+                        self._use_fingerprint(annotation_db_fingerprint(conn, self.annotation_db))
+                        rows = np.array(conn.execute(TRACK_QUERIES[key[0]], key[1:]).fetchall(), dtype=np.int64)
+                    finally:
+                        conn.close()
+                    track = _track_from_rows(rows, point)
+                self._tracks[key] = track
+        return track
+
+    def snps(self, chrom: str) -> PointTrack:
+        return cast(PointTrack, self._load(("snp", chrom), point=True))
+
+    def exons(self, chrom: str) -> IntervalTrack:
+        return cast(IntervalTrack, self._load(("exon", chrom)))
+
+    def repeats(self, chrom: str) -> IntervalTrack:
+        return cast(IntervalTrack, self._load(("repeats", chrom)))
+
+    def restriction_sites(self, chrom: str, name: str) -> IntervalTrack:
+        return cast(IntervalTrack, self._load(("restriction_site", chrom, name)))
+
+    def has_restriction_site(self, chrom: str, names: Iterable[str], lo: int, hi: int) -> bool:
+        return any(self.restriction_sites(chrom, name).overlaps(lo, hi) for name in set(names))
+
+    def has_restriction_site_many(self, chrom: str, names: Iterable[str], lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(lo), dtype=bool)
+        for name in set(names):
+            mask |= self.restriction_sites(chrom, name).overlaps_many(lo, hi)
+        return mask
@@ -0,0 +1,335 @@
+import json
+import os
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeGuard,
+)
+
+import numpy as np
+
+############################################
+# 2-bit 염기 인코딩 유틸리티
+############################################
+# A/C/G/T(대소문자 무관) -> 0~3, 그 외(N 등) -> 4
+INVALID_CODE = 4
+BASE_CODES = np.full(256, INVALID_CODE, dtype=np.uint8)
+for _code, _base in enumerate(b"ACGT"):
+    BASE_CODES[_base] = _code
+    BASE_CODES[_base + 32] = _code
+
+META_SUFFIX = ".meta.json"
+KEYS_SUFFIX = ".keys.u64"
+POS_SUFFIX = ".pos.u32"
+
+DEFAULT_K = 16
+DEFAULT_STEP = 3
+INDEX_VERSION = 1
+# 염색체당 이보다 많이 나오는 시드(고반복 k-mer)는 후보 확장에서 제외 (np.repeat 메모리 폭증 방지)
+MAX_SEED_HITS = 20_000
+
+
+def encode_bases(seq) -> np.ndarray:
+    """str/bytes/memoryview 서열을 0~4 코드 배열로 변환"""
+    if isinstance(seq, str):
+        seq = seq.encode("ascii", errors="replace")
+    return BASE_CODES[np.frombuffer(seq, dtype=np.uint8)]
+
+
+def kmer_codes(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """모든 윈도우의 k-mer 정수 키(uint64)와 유효 여부(N 미포함) 마스크를 반환"""
+    m = len(codes) - k + 1
+    if m <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+
+    c64 = (codes & 3).astype(np.uint64)
+    keys = np.zeros(m, dtype=np.uint64)
+    for j in range(k):
+        keys = (keys << np.uint64(2)) | c64[j : j + m]
+
+    invalid = np.concatenate(([0], np.cumsum(codes == INVALID_CODE)))
+    valid = (invalid[k:] - invalid[:m]) == 0
+    return keys, valid
+
+
+############################################
+# Genome k-mer Seed Index
+############################################
+class GenomeKmerIndex:
+    """게놈 k-mer 시드 인덱스 (build-once, mmap 조회)
+
+    염색체별로 `step` 간격마다 샘플링한 k-mer 키를 정렬해 저장합니다.
+    길이 L 서열의 정확 일치 위치는 `L - k + 1 >= step`이면 반드시 샘플 시드를 하나 이상 포함하므로,
+    시드 조회(searchsorted) -> 후보 시작점 투표 -> 게놈 서열 검증 순서로 전체 위치를 찾습니다.
+    염색체당 `max_seed_hits`번 넘게 나오는 시드는 건너뛰며, 그 때문에 누락이 생길 수 있는 서열은
+    `repetitive()`로 확인할 수 있습니다.
+    """
+
+    def __init__(self, prefix: str, max_seed_hits: int = MAX_SEED_HITS):
+        with open(prefix + META_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"지원하지 않는 genome index 버전입니다: {meta.get('version')}")
+
+        self.prefix = prefix
+        self.max_seed_hits = max_seed_hits
+        self.k: int = meta["k"]
+        self.step: int = meta["step"]
+        self.references: List[str] = [c["name"] for c in meta["chroms"]]
+        self.lengths: Dict[str, int] = {c["name"]: c["length"] for c in meta["chroms"]}
+        self._segments: Dict[str, Tuple[int, int]] = {
+            c["name"]: (c["offset"], c["count"]) for c in meta["chroms"]
+        }
+
+        total = sum(c["count"] for c in meta["chroms"])
+        if total:
+            self._keys = np.memmap(prefix + KEYS_SUFFIX, dtype=np.uint64, mode="r", shape=(total,))
+            self._pos = np.memmap(prefix + POS_SUFFIX, dtype=np.uint32, mode="r", shape=(total,))
+        else:
+            self._keys = np.zeros(0, dtype=np.uint64)
+            self._pos = np.zeros(0, dtype=np.uint32)
+
+    @staticmethod
+    def exists(prefix: Optional[str]) -> TypeGuard[str]:
+        if not prefix:
+            return False
+        return all(os.path.exists(prefix + s) for s in (META_SUFFIX, KEYS_SUFFIX, POS_SUFFIX))
+
+    def check_genome(self, references: Iterable[str], get_length: Callable[[str], int]) -> None:
+        """인덱스가 현재 FASTA와 같은 염색체 구성/길이로 빌드되었는지 확인"""
+        references = list(references)
+        if references != self.references or any(
+            get_length(ref) != self.lengths[ref] for ref in references
+        ):
+            raise ValueError("genome index가 현재 genome FASTA와 일치하지 않습니다. 인덱스를 다시 빌드하세요.")
+
+    def covers(self, length: int, mismatches: int = 0) -> bool:
+        """길이 `length` 서열의 `mismatches`개 이하 불일치 위치를 누락 없이 찾을 수 있는지 여부
+
+        N개 미스매치는 서열을 N+1개 구간으로 나누므로, 가장 짧은 경우에도 한 구간에
+        샘플 시드가 온전히 들어가야 합니다.
+        """
+        if mismatches < 0:
+            return False
+        intact = -(-(length - mismatches) // (mismatches + 1))
+        return intact - self.k + 1 >= self.step
+
+    def _query_seeds(self, seqs: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """배치 전체의 유효 시드 (키, 서열 내 오프셋, 서열 번호)"""
+        q_keys, q_offsets, q_owner = [], [], []
+        for owner, seq in enumerate(seqs):
+            keys, valid = kmer_codes(encode_bases(seq), self.k)
+            offsets = np.nonzero(valid)[0].astype(np.int64)
+            q_keys.append(keys[offsets])
+            q_offsets.append(offsets)
+            q_owner.append(np.full(len(offsets), owner, dtype=np.int64))
+        if not q_keys:
+            return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(q_keys), np.concatenate(q_offsets), np.concatenate(q_owner)
+
+    def _seed_ranges(self, ref: str, qkeys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """염색체 1개에서 시드별 (첫 위치, 개수, 고반복 여부)"""
+        seg_off, seg_count = self._segments[ref]
+        seg_keys = self._keys[seg_off : seg_off + seg_count]
+        lo = np.searchsorted(seg_keys, qkeys, side="left")
+        n_hits = np.searchsorted(seg_keys, qkeys, side="right") - lo
+        return lo, n_hits, n_hits > self.max_seed_hits
+
+    def repetitive(self, seqs: Iterable[str], max_mismatches: int = 0) -> Set[str]:
+        """고반복 시드를 건너뛰어 `search_many` 결과에 누락이 생길 수 있는 서열
+
+        정확 일치는 시작점 잔여류(s % step)마다 고반복이 아닌 시드가 하나라도 남으면 누락이 없고,
+        근사 일치는 어느 시드가 온전할지 모르므로 고반복 시드가 하나라도 있으면 누락될 수 있습니다.
+        """
+        seqs = list(dict.fromkeys(seqs))
+        qkeys, offsets, owners = self._query_seeds(seqs)
+        flagged = np.zeros(len(seqs), dtype=bool)
+        if len(qkeys) == 0:
+            return set()
+        residues = (-offsets) % self.step  # 이 시드가 투표하는 시작점의 잔여류
+        total = np.zeros((len(seqs), self.step), dtype=np.int64)
+        np.add.at(total, (owners, residues), 1)
+        for ref in self.references:
+            if self._segments[ref][1] == 0:
+                continue
+            _, _, frequent = self._seed_ranges(ref, qkeys)
+            if not frequent.any():
+                continue
+            if max_mismatches > 0:
+                flagged[owners[frequent]] = True
+                continue
+            kept = np.zeros((len(seqs), self.step), dtype=np.int64)
+            np.add.at(kept, (owners[~frequent], residues[~frequent]), 1)
+            flagged |= ((total > 0) & (kept == 0)).any(axis=1)
+        return {seq for seq, flag in zip(seqs, flagged.tolist()) if flag}
+
+    def _candidate_starts_many(self, seqs: List[str], exact: bool) -> List[List[Tuple[str, np.ndarray]]]:
+        """배치 전체의 시드를 염색체마다 한 번의 searchsorted로 조회하고, 서열별 후보 시작점(0-based)을 투표로 계산"""
+        n_seqs = len(seqs)
+        results: List[List[Tuple[str, np.ndarray]]] = [[] for _ in seqs]
+        qkeys, offsets, owners = self._query_seeds(seqs)
+        if not n_seqs or len(qkeys) == 0:
+            return results
+        # 정확 일치라면 시작점 s의 모든 샘플 시드(= (s + o) % step == 0인 유효 오프셋 o)가 일치해야 함
+        residues = (-offsets) % self.step
+        expected = np.zeros((n_seqs, self.step), dtype=np.int64)
+        np.add.at(expected, (owners, residues), 1)
+        seq_lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+
+        for ref in self.references:
+            seg_off, seg_count = self._segments[ref]
+            if seg_count == 0:
+                continue
+            lo, n_hits, frequent = self._seed_ranges(ref, qkeys)
+            required = expected
+            if frequent.any():
+                # 고반복 시드는 확장하지 않고, 그만큼 정확 일치 투표 기준을 낮춤
+                n_hits = np.where(frequent, 0, n_hits)
+                required = expected.copy()
+                np.add.at(required, (owners[frequent], residues[frequent]), -1)
+            total = int(n_hits.sum())
+            if total == 0:
+                continue
+
+            first = np.repeat(lo - (np.cumsum(n_hits) - n_hits), n_hits)
+            gidx = seg_off + first + np.arange(total)
+            hit_owner = np.repeat(owners, n_hits)
+            starts = self._pos[gidx].astype(np.int64) - np.repeat(offsets, n_hits)
+            ref_len = self.lengths[ref]
+            in_bounds = (starts >= 0) & (starts + seq_lengths[hit_owner] <= ref_len)
+
+            # (서열, 시작점) 쌍별 투표 수 집계
+            combined, votes = np.unique(
+                hit_owner[in_bounds] * (ref_len + 1) + starts[in_bounds], return_counts=True
+            )
+            hit_owner, starts = combined // (ref_len + 1), combined % (ref_len + 1)
+            if exact:
+                keep = votes >= required[hit_owner, starts % self.step]
+                hit_owner, starts = hit_owner[keep], starts[keep]
+
+            bounds = np.searchsorted(hit_owner, np.arange(n_seqs + 1))
+            for owner in np.nonzero(np.diff(bounds))[0].tolist():
+                results[owner].append((ref, starts[bounds[owner] : bounds[owner + 1]]))
+        return results
+
+    def _extend(
+        self,
+        seq: str,
+        candidates: List[Tuple[str, np.ndarray]],
+        fetch: Callable[[str, int, int], str],
+        max_mismatches: int,
+    ) -> Iterator[Tuple[str, int, int, str]]:
+        """후보 시작점을 게놈 서열과 비교해 검증 (필요한 만큼만 지연 실행)"""
+        length = len(seq)
+        for ref, starts in candidates:
+            for s in starts.tolist():
+                target = fetch(ref, s, s + length)
+                if len(target) != length:
+                    continue
+                if max_mismatches == 0:
+                    if target == seq:
+                        yield ref, s, 0, target
+                    continue
+                mm = sum(1 for a, b in zip(seq, target) if a != b)
+                if mm <= max_mismatches:
+                    yield ref, s, mm, target
+
+    def search_many(
+        self,
+        seqs: Iterable[str],
+        fetch: Callable[[str, int, int], str],
+        max_mismatches: int = 0,
+    ) -> Dict[str, Iterator[Tuple[str, int, int, str]]]:
+        """seed-and-extend: 서열 배치의 정확/근사(`max_mismatches`개 이하) 일치 위치를 한 번에 조회
+
+        시드 조회는 배치 전체에 대해 한 번만 수행하고, 서열별 검증(extend)은 반환된 이터레이터를
+        소비할 때 진행되므로 호출 측에서 조기 탈락한 서열의 검증 비용은 들지 않습니다.
+
+        Returns: {seq: iter[(chrom, 0-based start, mismatches, genome_seq)]} (인덱스 염색체 순서, 좌표 오름차순)
+        """
+        seqs = list(dict.fromkeys(seqs))
+        candidates = self._candidate_starts_many(seqs, exact=max_mismatches == 0)
+        return {
+            seq: self._extend(seq, cands, fetch, max_mismatches)
+            for seq, cands in zip(seqs, candidates)
+        }
+
+    def search(
+        self,
+        seq: str,
+        fetch: Callable[[str, int, int], str],
+        max_mismatches: int = 0,
+    ) -> List[Tuple[str, int, int, str]]:
+        """단일 서열 조회 (`search_many` 참고)"""
+        return list(self.search_many([seq], fetch, max_mismatches)[seq])
+
+
+############################################
+# Index Builder
+############################################
+def build_genome_index(
+    fasta,
+    prefix: str,
+    k: int = DEFAULT_K,
+    step: int = DEFAULT_STEP,
+    chunk_size: int = 5_000_000,
+    log: Callable[[str], None] = lambda msg: None,
+) -> Dict:
+    """`fasta`(pysam.FastaFile 호환 객체)로부터 k-mer 시드 인덱스를 빌드해 `prefix.*`로 저장
+
+    실행 중인 프로세스가 이전 배열을 mmap하고 있을 수 있으므로 새 파일을 만든 뒤 교체합니다.
+    """
+    if not 1 <= k <= 32:
+        raise ValueError("k는 1~32 사이여야 합니다.")
+    if step < 1:
+        raise ValueError("step은 1 이상이어야 합니다.")
+
+    out_dir = os.path.dirname(prefix)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    # 메타 파일을 먼저 지우고 마지막에 써서, 중간에 실패한 빌드는 exists()가 False
+    if os.path.exists(prefix + META_SUFFIX):
+        os.remove(prefix + META_SUFFIX)
+
+    chroms = []
+    offset = 0
+    keys_path, pos_path = prefix + KEYS_SUFFIX, prefix + POS_SUFFIX
+    with open(keys_path + ".part", "wb") as keys_out, open(pos_path + ".part", "wb") as pos_out:
+        for ref in fasta.references:
+            ref_len = fasta.get_reference_length(ref)
+            ref_keys, ref_pos = [], []
+
+            # 청크 경계에 걸친 k-mer도 포함되도록 k-1 만큼 더 읽되, 시작점은 청크 내부로 한정
+            for start_idx in range(0, ref_len, chunk_size):
+                end_idx = min(start_idx + chunk_size + k - 1, ref_len)
+                keys, valid = kmer_codes(encode_bases(fasta.fetch(ref, start_idx, end_idx)), k)
+                local = np.arange(min(len(keys), chunk_size), dtype=np.int64)
+                local = local[valid[: len(local)] & ((start_idx + local) % step == 0)]
+                ref_keys.append(keys[local])
+                ref_pos.append((start_idx + local).astype(np.uint32))
+
+            keys = np.concatenate(ref_keys) if ref_keys else np.zeros(0, dtype=np.uint64)
+            pos = np.concatenate(ref_pos) if ref_pos else np.zeros(0, dtype=np.uint32)
+            order = np.argsort(keys, kind="stable")
+            keys[order].tofile(keys_out)
+            pos[order].tofile(pos_out)
+
+            chroms.append({"name": ref, "length": ref_len, "offset": offset, "count": len(keys)})
+            offset += len(keys)
+            log(f"   -> {ref} 인덱싱 완료 ({len(keys):,} seeds)")
+
+    os.replace(keys_path + ".part", keys_path)
+    os.replace(pos_path + ".part", pos_path)
+
+    meta = {"version": INDEX_VERSION, "k": k, "step": step, "chroms": chroms}
+    with open(prefix + META_SUFFIX + ".part", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(prefix + META_SUFFIX + ".part", prefix + META_SUFFIX)
+    return meta
@@ -0,0 +1,141 @@
+import json
+import mmap
+import os
+from typing import Callable, Dict, Iterable, List, Optional, TypeGuard
+
+import numpy as np
+
+STORE_META_SUFFIX = ".store.json"
+STORE_SEQ_SUFFIX = ".seq.u8"
+
+STORE_VERSION = 1
+
+
+############################################
+# 비압축 게놈 저장소 (mmap 조회)
+############################################
+class GenomeStore:
+    """염색체 서열을 이어 붙인 비압축 바이트 파일 + 오프셋 테이블 (pysam.FastaFile 호환 읽기 전용)
+
+    bgzip FASTA와 달리 조회마다 BGZF 블록을 풀지 않고 mmap 구간을 바로 읽습니다.
+    `view`/`array`는 복사 없는 슬라이스를 돌려주며, 같은 파일을 여는 워커 프로세스끼리
+    OS 페이지 캐시를 공유합니다. 염기는 FASTA 원문 그대로(대소문자, N 포함) 1바이트씩 저장합니다.
+    """
+
+    def __init__(self, prefix: str):
+        with open(prefix + STORE_META_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"지원하지 않는 genome store 버전입니다: {meta.get('version')}")
+
+        self.prefix = prefix
+        self.filename = prefix + STORE_SEQ_SUFFIX
+        self.references: List[str] = [c["name"] for c in meta["chroms"]]
+        self.lengths: List[int] = [c["length"] for c in meta["chroms"]]
+        self._offsets: Dict[str, int] = {c["name"]: c["offset"] for c in meta["chroms"]}
+        self._lengths: Dict[str, int] = dict(zip(self.references, self.lengths))
+
+        self._file = open(self.filename, "rb")
+        if sum(self.lengths):
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer = memoryview(self._mmap)
+        else:
+            # 빈 파일은 mmap할 수 없음
+            self._mmap = None
+            self._buffer = memoryview(b"")
+
+    @staticmethod
+    def exists(prefix: Optional[str]) -> TypeGuard[str]:
+        if not prefix:
+            return False
+        return all(os.path.exists(prefix + s) for s in (STORE_META_SUFFIX, STORE_SEQ_SUFFIX))
+
+    def check_genome(self, references: Iterable[str], get_length: Callable[[str], int]) -> None:
+        """저장소가 현재 FASTA와 같은 염색체 구성/길이로 만들어졌는지 확인"""
+        references = list(references)
+        if references != self.references or any(
+            get_length(ref) != self._lengths[ref] for ref in references
+        ):
+            raise ValueError("genome store가 현재 genome FASTA와 일치하지 않습니다. 저장소를 다시 만드세요.")
+
+    def get_reference_length(self, reference: str) -> int:
+        return self._lengths[reference]
+
+    def _bounds(self, reference: str, start: Optional[int], end: Optional[int]) -> tuple:
+        if reference not in self._offsets:
+            raise KeyError(f"sequence '{reference}' not present")
+        length = self._lengths[reference]
+        start = 0 if start is None else max(0, start)
+        end = length if end is None else min(end, length)
+        if start > end:
+            raise ValueError(f"start ({start}) > end ({end})")
+        offset = self._offsets[reference]
+        return offset + start, offset + end
+
+    def view(self, reference: str, start: Optional[int] = None, end: Optional[int] = None) -> memoryview:
+        """0-based 반개구간 [start, end)의 복사 없는 바이트 슬라이스"""
+        lo, hi = self._bounds(reference, start, end)
+        return self._buffer[lo:hi]
+
+    def array(self, reference: str, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """`view`와 같은 구간의 uint8 배열 (복사 없음, 읽기 전용)"""
+        return np.frombuffer(self.view(reference, start, end), dtype=np.uint8)
+
+    def fetch(self, reference: str, start: Optional[int] = None, end: Optional[int] = None) -> str:
+        """pysam.FastaFile.fetch와 같은 서열 문자열 (end는 염색체 길이로 잘림)"""
+        return str(self.view(reference, start, end), "ascii")
+
+    def close(self) -> None:
+        self._buffer.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 호출자가 아직 view/array를 들고 있으면 매핑은 GC 때 해제
+                pass
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "GenomeStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def build_genome_store(
+    fasta,
+    prefix: str,
+    chunk_size: int = 5_000_000,
+    log: Callable[[str], None] = lambda msg: None,
+) -> Dict:
+    """`fasta`(pysam.FastaFile 호환 객체)의 서열을 `prefix.seq.u8` + `prefix.store.json`으로 저장
+
+    실행 중인 프로세스가 이전 `.seq.u8`을 mmap하고 있을 수 있으므로 새 파일을 만든 뒤 교체합니다.
+    """
+    out_dir = os.path.dirname(prefix)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    # 메타 파일을 마지막에 써서, 중간에 실패한 저장소는 exists()가 False
+    if os.path.exists(prefix + STORE_META_SUFFIX):
+        os.remove(prefix + STORE_META_SUFFIX)
+
+    chroms: List[Dict] = []
+    offset = 0
+    seq_path = prefix + STORE_SEQ_SUFFIX
+    with open(seq_path + ".part", "wb") as seq_out:
+        for ref in fasta.references:
+            ref_len = fasta.get_reference_length(ref)
+            for start_idx in range(0, ref_len, chunk_size):
+                seq_out.write(fasta.fetch(ref, start_idx, min(start_idx + chunk_size, ref_len)).encode("ascii"))
+            chroms.append({"name": ref, "length": ref_len, "offset": offset})
+            offset += ref_len
+            log(f"   -> {ref} 저장 완료 ({ref_len:,} bp)")
+
+    os.replace(seq_path + ".part", seq_path)
+    meta = {"version": STORE_VERSION, "chroms": chroms}
+    with open(prefix + STORE_META_SUFFIX + ".part", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(prefix + STORE_META_SUFFIX + ".part", prefix + STORE_META_SUFFIX)
+    return meta
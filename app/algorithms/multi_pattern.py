@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.algorithms.genome_index import BASE_CODES, INVALID_CODE, kmer_codes
+
+# 대문자 A/C/G/T만 유효 (str.find와 같은 대소문자 구분 검색용)
+UPPER_BASE_CODES = BASE_CODES.copy()
+UPPER_BASE_CODES[np.frombuffer(b"acgt", dtype=np.uint8)] = INVALID_CODE
+
+_MAX_SEED = 32
+_MAX_FILTER_BITS = 22
+
+
+############################################
+# Multi-pattern Single-pass Scanner
+############################################
+class MultiPatternScanner:
+    """여러 DNA 패턴을 청크당 한 번의 선형 패스로 찾는 스캐너
+
+    모든 패턴의 앞 k(= 최소 패턴 길이, 최대 32)염기를 시드로 해시 집합을 만들고, 청크의 모든
+    윈도우 k-mer 키를 NumPy로 한 번에 계산해 시드 집합에 속하는 위치만 패턴 전체와 대조합니다.
+    패턴 수가 늘어도 청크 패스는 한 번이므로 패턴마다 `str.find`를 반복하는 비용이 사라집니다.
+    """
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False):
+        self.patterns: List[str] = list(dict.fromkeys(p.upper() if ignore_case else p for p in patterns))
+        self.ignore_case = ignore_case
+        self._table = BASE_CODES if ignore_case else UPPER_BASE_CODES
+        if not self.patterns:
+            raise ValueError("패턴이 비어 있습니다.")
+
+        codes = [self._encode(p) for p in self.patterns]
+        for pattern, c in zip(self.patterns, codes):
+            if len(c) == 0 or (c == INVALID_CODE).any():
+                raise ValueError(f"A/C/G/T로만 구성된 패턴만 지원합니다: {pattern!r}")
+
+        self.k = min(_MAX_SEED, min(len(c) for c in codes))
+        self._pattern_bytes = [c.tobytes() for c in codes]
+        self._lengths = [len(c) for c in codes]
+        self._max_len = max(self._lengths)
+
+        self._seed_owners: Dict[int, List[int]] = {}
+        for pid, c in enumerate(codes):
+            key = int(kmer_codes(c[: self.k], self.k)[0][0])
+            self._seed_owners.setdefault(key, []).append(pid)
+        self._seed_keys = np.array(sorted(self._seed_owners), dtype=np.uint64)
+
+        # 하위 비트 룩업 테이블로 대부분의 윈도우를 searchsorted 이전에 걸러냄
+        bits = min(2 * self.k, _MAX_FILTER_BITS)
+        self._filter_mask = np.uint64((1 << bits) - 1)
+        self._filter = np.zeros(1 << bits, dtype=bool)
+        self._filter[(self._seed_keys & self._filter_mask).astype(np.int64)] = True
+
+    def _encode(self, seq) -> np.ndarray:
+        if isinstance(seq, str):
+            seq = seq.encode("ascii", errors="replace")
+        return self._table[np.frombuffer(seq, dtype=np.uint8)]
+
+    @property
+    def max_pattern_length(self) -> int:
+        return self._max_len
+
+    def scan(self, text, limit: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """`text`(str/bytes/memoryview)에서 모든 패턴의 출현 위치를 찾는다.
+
+        Args:
+            limit: 이 값 이상인 시작 위치는 무시 (청크 오버랩 중복 방지용)
+        Yields: (0-based 위치, 패턴 인덱스) — 위치 오름차순, 같은 위치는 패턴 순서
+        """
+        codes = self._encode(text)
+        keys, valid = kmer_codes(codes, self.k)
+        if limit is not None:
+            keys, valid = keys[:limit], valid[:limit]
+        if len(keys) == 0:
+            return
+
+        candidate = valid & self._filter[(keys & self._filter_mask).astype(np.int64)]
+        positions = np.nonzero(candidate)[0]
+        if len(positions) == 0:
+            return
+        cand_keys = keys[positions]
+        slot = np.minimum(np.searchsorted(self._seed_keys, cand_keys), len(self._seed_keys) - 1)
+        hit = self._seed_keys[slot] == cand_keys
+        positions, cand_keys = positions[hit], cand_keys[hit]
+
+        code_bytes = codes.tobytes()
+        k = self.k
+        for pos, key in zip(positions.tolist(), cand_keys.tolist()):
+            for pid in self._seed_owners[key]:
+                length = self._lengths[pid]
+                if length == k or code_bytes[pos : pos + length] == self._pattern_bytes[pid]:
+                    yield pos, pid
@@ -0,0 +1,224 @@
+import itertools
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.algorithms.genome_index import BASE_CODES, INVALID_CODE
+
+# 기본 효소 라이브러리 (build_db.py --enzymes로 교체 가능)
+DEFAULT_ENZYMES: Dict[str, str] = {
+    "EcoRI": "GAATTC",
+    "BamHI": "GGATCC",
+    "HindIII": "AAGCTT",
+    "NotI": "GCGGCCGC",
+}
+
+# IUPAC 염기 코드 → 허용 염기
+IUPAC_BASES = {
+    "A": "A", "C": "C", "G": "G", "T": "T",
+    "R": "AG", "Y": "CT", "S": "CG", "W": "AT", "K": "GT", "M": "AC",
+    "B": "CGT", "D": "AGT", "H": "ACT", "V": "ACG", "N": "ACGT",
+}  # fmt: skip
+IUPAC_COMPLEMENT = str.maketrans("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN")
+
+# 게놈 염기(대소문자 무관) → 4비트 마스크 (A=1, C=2, G=4, T=8, 그 외 0 → 어떤 모티프와도 불일치)
+_BASE_MASKS = np.zeros(256, dtype=np.uint8)
+for _base, _bit in zip("ACGT", (1, 2, 4, 8)):
+    _BASE_MASKS[ord(_base)] = _BASE_MASKS[ord(_base.lower())] = _bit
+_IUPAC_MASKS = {code: sum(1 << "ACGT".index(b) for b in bases) for code, bases in IUPAC_BASES.items()}
+
+_MAX_SEED = 8
+_MAX_SEED_KEYS = 4096  # 모티프당 시드 확장 상한 (앞부분이 N으로 가득한 모티프 방지)
+_STRIP = b"\r\n\t "
+
+
+def normalize_site(site: str) -> str:
+    """REBASE식 표기(`G^AATTC`, `GGTCTC(1/5)`)에서 절단 표시를 지우고 IUPAC 대문자 서열만 남김"""
+    site = re.sub(r"\(.*?\)$", "", site.strip()).replace("^", "").replace("_", "").upper()
+    if not site or any(base not in IUPAC_BASES for base in site):
+        raise ValueError(f"IUPAC 염기 코드로만 구성된 인식 서열이어야 합니다: {site!r}")
+    return site
+
+
+def reverse_complement_site(site: str) -> str:
+    return site.translate(IUPAC_COMPLEMENT)[::-1]
+
+
+def load_enzyme_library(path: str) -> Dict[str, str]:
+    """`이름 인식서열` 한 줄에 하나 (`#` 주석, 빈 줄 무시). 파일 순서를 유지"""
+    enzymes: Dict[str, str] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                raise ValueError(f"{path}:{line_no}: `이름 인식서열` 형식이 아닙니다: {line!r}")
+            enzymes[parts[0]] = normalize_site(parts[1])
+    if not enzymes:
+        raise ValueError(f"효소 라이브러리가 비어 있습니다: {path}")
+    return enzymes
+
+
+def iter_fasta_blocks(handle, block_size: int = 8 * 1024 * 1024) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """바이너리 FASTA를 큰 블록 단위로 읽어 (염색체, 서열 조각)을 돌려줌
+
+    레코드가 시작될 때마다 (염색체, None)을 먼저 보내며, 조각의 줄바꿈/공백은 블록 단위로 한 번에 지웁니다.
+    """
+    chrom: Optional[str] = None
+    pending = b""
+    while True:
+        block: bytes = handle.read(block_size)
+        data = pending + block
+        pending = b""
+        if block:
+            # 블록 끝에 걸린 헤더 줄은 다음 블록과 합쳐서 처리
+            header = data.rfind(b">")
+            if header != -1 and data.find(b"\n", header) == -1:
+                data, pending = data[:header], data[header:]
+        pos = 0
+        while pos < len(data):
+            header = data.find(b">", pos)
+            end = len(data) if header == -1 else header
+            piece = data[pos:end].translate(None, _STRIP)
+            if piece and chrom is not None:
+                yield chrom, piece
+            if header == -1:
+                break
+            eol = data.find(b"\n", header)
+            eol = len(data) if eol == -1 else eol
+            chrom = data[header + 1 : eol].split()[0].decode("ascii")
+            yield chrom, None
+            pos = eol + 1
+        if not block:
+            break
+
+
+############################################
+# Restriction Site Scanner
+############################################
+class RestrictionSiteScanner:
+    """효소 라이브러리의 모든 인식 서열(IUPAC 축퇴 코드, 양쪽 가닥)을 청크당 한 번의 패스로 찾는 스캐너
+
+    모든 모티프 앞 k(= 최소 인식 서열 길이, 최대 8)염기를 구체 서열로 펼쳐 시드 룩업 테이블을 만들고,
+    청크의 모든 윈도우 시드 키를 NumPy로 한 번 계산합니다. 시드에 걸린 위치만 모티프별 나머지 염기를
+    4비트 마스크 AND로 벡터 검증하므로, 효소를 늘려도 청크 패스 수는 늘지 않습니다.
+    """
+
+    def __init__(self, enzymes: Dict[str, str]):
+        if not enzymes:
+            raise ValueError("효소 라이브러리가 비어 있습니다.")
+        self.names: List[str] = list(enzymes)
+        self.sites: List[str] = [normalize_site(site) for site in enzymes.values()]
+        self.k = min(_MAX_SEED, min(len(site) for site in self.sites))
+
+        # 모티프: (효소 인덱스, 길이, 위치별 마스크, 시드 번호 배열). 비회문 서열은 역상보도 따로 검색
+        seed_ids: Dict[int, int] = {}
+        self._motifs: List[Tuple[int, int, np.ndarray, np.ndarray]] = []
+        for enzyme_id, site in enumerate(self.sites):
+            for motif in dict.fromkeys((site, reverse_complement_site(site))):
+                seeds = list(itertools.product(*(IUPAC_BASES[b] for b in motif[: self.k])))
+                if len(seeds) > _MAX_SEED_KEYS:
+                    raise ValueError(f"{self.names[enzyme_id]}: 앞부분 축퇴 염기가 너무 많습니다: {motif}")
+                ids = []
+                for seed in seeds:
+                    key = 0
+                    for base in seed:
+                        key = (key << 2) | "ACGT".index(base)
+                    ids.append(seed_ids.setdefault(key, len(seed_ids)))
+                masks = np.array([_IUPAC_MASKS[b] for b in motif], dtype=np.uint8)
+                self._motifs.append((enzyme_id, len(motif), masks, np.array(sorted(ids), dtype=np.int64)))
+
+        self._seed_table = np.full(4**self.k, -1, dtype=np.int32)
+        for key, seed_id in seed_ids.items():
+            self._seed_table[key] = seed_id
+        self._n_seeds = len(seed_ids)
+        self.max_site_length = max(length for _, length, _, _ in self._motifs)
+
+    @property
+    def overlap(self) -> int:
+        """청크 경계에 걸친 인식 서열을 놓치지 않기 위해 다음 청크로 넘길 길이"""
+        return self.max_site_length - 1
+
+    def scan(self, seq: bytes, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """`seq`(대소문자 무관)에서 인식 서열 위치를 찾는다.
+
+        Args:
+            limit: 이 값 이상인 시작 위치는 무시 (청크 오버랩 중복 방지용)
+        Returns: (0-based 위치 배열, 효소 인덱스 배열) — 위치 오름차순, 같은 위치는 라이브러리 순서
+        """
+        raw = np.frombuffer(seq, dtype=np.uint8)
+        codes = BASE_CODES[raw]
+        m = len(raw) - self.k + 1 if limit is None else min(limit, len(raw) - self.k + 1)
+        empty = np.zeros(0, dtype=np.int64)
+        if m <= 0:
+            return empty, empty
+
+        # k <= 8 이므로 시드 키는 uint16에 들어감. N 등 비정상 염기는 시드에 걸린 위치에서만 확인
+        low = (codes & 3).astype(np.uint16)
+        keys = low[:m].copy()
+        for j in range(1, self.k):
+            keys <<= 2
+            keys |= low[j : j + m]
+        seed = self._seed_table[keys]
+        candidates = np.nonzero(seed >= 0)[0]
+        for j in range(self.k):
+            candidates = candidates[codes[candidates + j] != INVALID_CODE]
+        if len(candidates) == 0:
+            return empty, empty
+        # 시드 번호별로 후보 위치를 모아 두고, 모티프마다 자기 시드 구간만 검증
+        order = np.argsort(seed[candidates], kind="stable")
+        by_seed = candidates[order]
+        bounds = np.searchsorted(seed[by_seed], np.arange(self._n_seeds + 1))
+
+        masks = _BASE_MASKS[raw]
+        hit_pos, hit_enzyme = [], []
+        for enzyme_id, length, motif_masks, ids in self._motifs:
+            pos = np.concatenate([by_seed[bounds[i] : bounds[i + 1]] for i in ids])
+            pos = pos[pos + length <= len(raw)]
+            for j in range(self.k, length):
+                if len(pos) == 0:
+                    break
+                pos = pos[(masks[pos + j] & motif_masks[j]) != 0]
+            hit_pos.append(pos)
+            hit_enzyme.append(np.full(len(pos), enzyme_id, dtype=np.int64))
+
+        # 같은 위치에서 정방향/역상보가 모두 맞은 경우를 합치고 (위치, 효소) 순으로 정렬
+        combined = np.unique(np.concatenate(hit_pos) * len(self.names) + np.concatenate(hit_enzyme))
+        return combined // len(self.names), combined % len(self.names)
+
+    def scan_fasta(
+        self,
+        handle,
+        block_size: int = 8 * 1024 * 1024,
+        log: Callable[[str], None] = lambda msg: None,
+    ) -> Iterator[Tuple[str, str, int, int]]:
+        """바이너리 FASTA 핸들 전체를 스캔해 (염색체, 효소, 1-based 시작, 끝)을 염색체/위치 순으로 돌려줌"""
+        chrom: Optional[str] = None
+        carry, offset = b"", 0
+
+        def rows(ref: str, buf: bytes, base: int, limit: Optional[int]) -> Iterator[Tuple[str, str, int, int]]:
+            positions, enzymes = self.scan(buf, limit)
+            for pos, enzyme_id in zip(positions.tolist(), enzymes.tolist()):
+                start = base + pos + 1
+                yield ref, self.names[enzyme_id], start, start + len(self.sites[enzyme_id]) - 1
+
+        for ref, piece in iter_fasta_blocks(handle, block_size):
+            if piece is None:
+                if chrom is not None:
+                    yield from rows(chrom, carry, offset, None)
+                    log(f"   -> {chrom} 스캔 완료")
+                chrom, carry, offset = ref, b"", 0
+                continue
+            buf = carry + piece
+            limit = len(buf) - self.overlap
+            if limit > 0:
+                yield from rows(ref, buf, offset, limit)  # 조각의 염색체 = 현재 레코드(chrom)
+                carry, offset = buf[limit:], offset + limit
+            else:
+                carry = buf
+        if chrom is not None:
+            yield from rows(chrom, carry, offset, None)
+            log(f"   -> {chrom} 스캔 완료")
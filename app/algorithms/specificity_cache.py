@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# (ref, pos_1based, end_1based, 3' 말단 10nt 미스매치 수)
+Hit = Tuple[str, int, int, int]
+
+
+class SpecificityCache:
+    """프라이머 서열별 게놈 히트 목록 LRU 캐시 (요청/템플릿 간 공유, 스레드 안전)
+
+    히트 목록은 타겟 구간/SNP/스플라이스 제외를 적용하기 전의 원본이므로, 다른 템플릿이나
+    다른 max_hits/mismatch_cutoff 요청에서도 그대로 다시 판정할 수 있습니다.
+    `complete=False`는 프라이머가 탈락해 스캔이 중간에 멈춘 목록으로, 그 목록만으로 탈락이
+    확정되지 않는 요청에서는 다시 스캔해야 합니다.
+    키의 `mode`는 검색 방식(근사 시드 허용 개수)으로, 같은 모드끼리만 히트 집합이 같습니다.
+    """
+
+    def __init__(self, max_entries: int = 200_000, max_list_length: int = 1000):
+        self.max_entries = max_entries
+        self.max_list_length = max_list_length
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[Tuple[Hit, ...], bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, mode: int, seq: str) -> Optional[Tuple[Tuple[Hit, ...], bool]]:
+        with self._lock:
+            entry = self._entries.get((mode, seq))
+            if entry is not None:
+                self._entries.move_to_end((mode, seq))
+            return entry
+
+    def put(self, mode: int, seq: str, hits, complete: bool) -> None:
+        if self.max_entries <= 0 or len(hits) > self.max_list_length:
+            return
+        with self._lock:
+            self._entries[(mode, seq)] = (tuple(hits), complete)
+            self._entries.move_to_end((mode, seq))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -1,4 +1,616 @@
 """의존성 주입 모듈.
 
 공용 DI(예: DB 세션, 인증/인가 등)를 추가하기 위한 자리입니다.
+genome FASTA / annotations.db 경로 해석, 파일 검증, 요청 간 공유되는 PrimerDesigner 풀을 제공합니다.
 """
+import asyncio
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+import pysam
+from fastapi import FastAPI, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from app.algorithms.annotation_index import AnnotationIndex
+from app.algorithms.genome_index import KEYS_SUFFIX, META_SUFFIX
+from app.algorithms.genome_store import STORE_META_SUFFIX
+from app.algorithms.PrimerDesigner import (
+    PrimerDesigner,
+    ProgressCallback,
+    StopCallback,
+    init_scan_worker,
+)
+from app.schemas.request import PrimerDesignRequest
+from app.services.design_jobs import DesignJobManager, JobStore
+from app.services.design_pipeline import (
+    init_worker,
+    run_design,
+    run_design_batch,
+    run_design_batch_in_worker,
+    run_design_in_worker,
+    specificity_cache_from_env,
+)
+from app.services.metrics import DESIGN_METRICS
+from app.services.result_cache import DesignResultCache, design_request_key
+
+
+def project_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def resolve_paths() -> tuple[str, str]:
+    root = project_root()
+    db_path = os.getenv("DB_PATH") or os.path.join(root, "database", "annotations.db")
+    genome_path = os.getenv("GENOME_PATH") or os.path.join(
+        root, "database", "raw_data", "GRCh38.primary_assembly.genome.fa.gz"
+    )
+    return db_path, genome_path
+
+
+def resolve_genome_index_path() -> str:
+    return os.getenv("GENOME_INDEX_PATH") or os.path.join(
+        project_root(), "database", "genome_index", "GRCh38"
+    )
+
+
+def resolve_genome_store_path() -> str:
+    return os.getenv("GENOME_STORE_PATH") or os.path.join(
+        project_root(), "database", "genome_store", "GRCh38"
+    )
+
+
+def resolve_annotation_snapshot_path() -> str:
+    return os.getenv("ANNOTATION_SNAPSHOT_PATH") or os.path.join(
+        project_root(), "database", "annotation_snapshot", "annotations"
+    )
+
+
+def validate_genome_fasta(genome_path: str) -> None:
+    if not os.path.exists(genome_path):
+        raise HTTPException(status_code=503, detail="genome FASTA 파일을 찾을 수 없습니다.")
+
+    if genome_path.endswith(".gz"):
+        fai_path = f"{genome_path}.fai"
+        gzi_path = f"{genome_path}.gzi"
+        missing = [path for path in (fai_path, gzi_path) if not os.path.exists(path)]
+        if missing:
+            raise HTTPException(
+                status_code=503,
+                detail=(
+                    "GENOME_PATH가 .gz인 경우 bgzip FASTA와 인덱스(.fai, .gzi)가 모두 필요합니다. "
+                    f"누락 파일: {', '.join(missing)}"
+                ),
+            )
+
+    try:
+        fasta = pysam.FastaFile(genome_path)
+        fasta.close()
+    except OSError as exc:
+        msg = str(exc)
+        if "Cannot index files compressed with gzip" in msg or "File truncated" in msg:
+            raise HTTPException(
+                status_code=503,
+                detail=(
+                    "현재 genome 파일은 일반 gzip 형식으로 보입니다. "
+                    "pysam 사용을 위해서는 bgzip으로 압축된 FASTA(.fa.gz)와 "
+                    "인덱스(.fai, .gzi)가 필요합니다."
+                ),
+            ) from exc
+        raise HTTPException(status_code=503, detail=f"genome FASTA 파일을 열 수 없습니다: {exc}") from exc
+
+
+def validate_db_path(db_path: str) -> None:
+    if not os.path.exists(db_path):
+        raise HTTPException(status_code=503, detail="annotations.db 파일을 찾을 수 없습니다.")
+
+
+############################################
+# PrimerDesigner 리소스 풀
+############################################
+class DesignerPool:
+    """FASTA 핸들을 가진 PrimerDesigner를 요청 간 재사용하는 풀 (어노테이션 인덱스는 인스턴스 간 공유)
+
+    파일 검증은 앱 시작 시 한 번 수행하고, 실패한 경우에만 체크아웃 시점에 다시 시도합니다.
+    인스턴스는 필요할 때 `size`개까지 만들고, 모두 사용 중이면 `acquire_timeout`초까지 반납을 기다립니다.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        genome_path: str,
+        genome_index: Optional[str],
+        size: int,
+        genome_store: Optional[str] = None,
+        annotation_snapshot: Optional[str] = None,
+        acquire_timeout: Optional[float] = None,
+    ):
+        self.db_path = db_path
+        self.genome_path = genome_path
+        self.genome_index = genome_index
+        self.genome_store = genome_store
+        self.annotation_snapshot = annotation_snapshot
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self.annotations = AnnotationIndex(db_path, snapshot=annotation_snapshot)
+        self.specificity_cache = specificity_cache_from_env()
+        self.scan_workers = int(os.getenv("SPECIFICITY_SCAN_WORKERS", "0"))
+        self._scan_processes: Optional[ProcessPoolExecutor] = None
+        self._idle: "queue.LifoQueue[PrimerDesigner]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._validated = False
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> "DesignerPool":
+        db_path, genome_path = resolve_paths()
+        size = int(os.getenv("DESIGNER_POOL_SIZE", "4"))
+        return cls(
+            db_path,
+            genome_path,
+            resolve_genome_index_path(),
+            size,
+            resolve_genome_store_path(),
+            resolve_annotation_snapshot_path(),
+            acquire_timeout=float(os.getenv("DESIGNER_ACQUIRE_TIMEOUT", "30")),
+        )
+
+    def validate(self) -> None:
+        validate_db_path(self.db_path)
+        validate_genome_fasta(self.genome_path)
+        try:
+            # 어노테이션 스냅샷은 기동 시 한 번 mmap (워커 간 페이지 공유)
+            self.annotations.open_snapshot()
+        except ValueError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        self._validated = True
+
+    def ensure_validated(self) -> None:
+        if not self._validated:
+            self.validate()
+
+    def refresh_annotations(self) -> None:
+        """DB가 바뀌었으면(빌드/--refresh) 공유 어노테이션 트랙을 버리고 스냅샷을 다시 확인"""
+        try:
+            self.annotations.db_fingerprint()
+            self.annotations.open_snapshot()
+        except (ValueError, sqlite3.Error) as exc:
+            raise HTTPException(status_code=503, detail=f"annotations.db를 다시 읽을 수 없습니다: {exc}") from exc
+
+    def data_identity(self) -> Optional[Dict]:
+        """annotations.db 내용 지문 (결과 캐시 키 / 작업 중복 제거 키). DB를 열 수 없으면 None"""
+        try:
+            return self.annotations.db_fingerprint()
+        except (OSError, sqlite3.Error):
+            return None
+
+    def _scan_pool(self) -> Optional[ProcessPoolExecutor]:
+        """SPECIFICITY_SCAN_WORKERS > 0이면 청크 스캔을 나눠 실행할 프로세스 풀 (인스턴스 간 공유)"""
+        if self.scan_workers <= 0:
+            return None
+        with self._lock:
+            if self._scan_processes is None:
+                self._scan_processes = ProcessPoolExecutor(
+                    max_workers=self.scan_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_scan_worker,
+                    initargs=(self.genome_path, self.genome_store),
+                )
+            return self._scan_processes
+
+    def _replace_broken_scan_pool(self, designer: PrimerDesigner) -> None:
+        """스캔 중 풀이 깨진 인스턴스를 새 풀에 다시 연결 (깨진 풀은 한 번만 정리)"""
+        broken, designer.broken_scan_executor = designer.broken_scan_executor, None
+        if broken is None:
+            return
+        with self._lock:
+            if self._scan_processes is broken:
+                self._scan_processes = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        designer.scan_executor = self._scan_pool()
+
+    def _create(self) -> PrimerDesigner:
+        scan_executor = self._scan_pool()
+        return PrimerDesigner(
+            genome_fasta=self.genome_path,
+            annotation_db=self.db_path,
+            genome_index=self.genome_index,
+            annotations=self.annotations,
+            specificity_cache=self.specificity_cache,
+            genome_store=self.genome_store,
+            scan_executor=scan_executor,
+            scan_workers=self.scan_workers,
+        )
+
+    def acquire(self, timeout: Optional[float] = None) -> PrimerDesigner:
+        """인스턴스 체크아웃. `timeout`(기본: acquire_timeout, None이면 무제한)초 안에 반납되지 않으면 503"""
+        self.ensure_validated()
+        self.refresh_annotations()
+        if timeout is None:
+            timeout = self.acquire_timeout
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._create()
+            except Exception as exc:
+                with self._lock:
+                    self._created -= 1
+                raise HTTPException(status_code=500, detail=f"프라이머 설계 중 오류가 발생했습니다: {exc}") from exc
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty as exc:
+            raise HTTPException(status_code=503, detail="사용 가능한 설계 리소스가 없습니다.") from exc
+
+    def release(self, designer: PrimerDesigner) -> None:
+        if self._closed:
+            designer.close()
+            return
+        self._replace_broken_scan_pool(designer)
+        self._idle.put(designer)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if self._scan_processes is not None:
+            self._scan_processes.shutdown(wait=False, cancel_futures=True)
+            self._scan_processes = None
+
+
+############################################
+# 설계 실행기 (이벤트 루프 밖에서 CPU 작업 실행)
+############################################
+# 프로세스 풀에서 실행 중인 요청의 중단 여부를 확인하는 주기 (초)
+STOP_POLL_INTERVAL = 0.1
+
+
+class DesignExecutor:
+    """설계 파이프라인을 이벤트 루프 밖에서 실행하고, 대기 중인 요청 수를 제한
+
+    `workers > 0`이면 워커마다 PrimerDesigner를 미리 열어 둔 프로세스 풀에서 실행해 코어 수만큼
+    처리량이 늘고, `workers == 0`이면 스레드 풀에서 DesignerPool 인스턴스를 체크아웃해 실행합니다.
+    실행 중 + 대기 중인 요청이 `max_pending`에 도달하면 즉시 503을 반환합니다.
+    프로세스 풀의 중단 요청은 워커와 공유하는 플래그 배열(요청마다 슬롯 하나)로 전달합니다.
+    """
+
+    def __init__(self, pool: DesignerPool, workers: int, max_pending: int):
+        self.pool = pool
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.pending = 0
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_flags = self._context.RawArray("b", self.max_pending) if self.workers else None
+        self._free_stop_slots = list(range(self.max_pending)) if self.workers else []
+
+    @classmethod
+    def from_env(cls, pool: DesignerPool) -> "DesignExecutor":
+        workers = int(os.getenv("DESIGN_PROCESS_WORKERS", "0"))
+        max_pending = int(os.getenv("DESIGN_MAX_PENDING", str(4 * max(workers, pool.size))))
+        return cls(pool, workers, max_pending)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=init_worker,
+                initargs=(
+                    self.pool.db_path,
+                    self.pool.genome_path,
+                    self.pool.genome_index,
+                    self.pool.genome_store,
+                    self.pool.annotation_snapshot,
+                    self._stop_flags,
+                ),
+            )
+        return self._processes
+
+    async def _run_in_processes(self, fn, *args):
+        """프로세스 풀에서 실행. 풀이 깨지면(워커 초기화 실패/비정상 종료) 버리고 다음 요청에서 새로 만듦"""
+        processes = self._process_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(processes, fn, *args)
+        except BrokenProcessPool as exc:
+            if self._processes is processes:
+                self._processes = None
+            processes.shutdown(wait=False, cancel_futures=True)
+            raise HTTPException(
+                status_code=503,
+                detail="설계 워커 프로세스가 비정상 종료되었습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "1"},
+            ) from exc
+
+    async def _run_stoppable_in_processes(self, request: PrimerDesignRequest, should_stop: StopCallback) -> dict:
+        """프로세스 풀에서 실행하면서 `should_stop()`을 주기적으로 확인해 워커의 중단 플래그에 반영"""
+        flags = self._stop_flags
+        assert flags is not None
+        slot = self._free_stop_slots.pop()
+        flags[slot] = 0
+        task = asyncio.ensure_future(
+            self._run_in_processes(run_design_in_worker, request.model_dump(by_alias=True), slot)
+        )
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=STOP_POLL_INTERVAL)
+                if done:
+                    return task.result()
+                if should_stop():
+                    flags[slot] = 1
+        finally:
+            if task.done():
+                self._free_stop_slots.append(slot)
+            else:
+                # 호출 쪽이 먼저 취소됨: 워커를 멈추고, 워커가 끝난 뒤에 슬롯을 돌려받음
+                flags[slot] = 1
+                task.add_done_callback(lambda _: self._free_stop_slots.append(slot))
+
+    def check_capacity(self) -> None:
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="설계 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "1"},
+            )
+
+    def _run_pooled(
+        self,
+        request: PrimerDesignRequest,
+        progress: Optional[ProgressCallback] = None,
+        should_stop: Optional[StopCallback] = None,
+    ) -> dict:
+        designer = self.pool.acquire()
+        try:
+            return run_design(designer, request, progress, should_stop)
+        finally:
+            self.pool.release(designer)
+
+    async def run(
+        self,
+        request: PrimerDesignRequest,
+        progress: Optional[ProgressCallback] = None,
+        should_stop: Optional[StopCallback] = None,
+    ) -> dict:
+        """설계 실행. 진행 콜백은 프로세스 경계를 넘길 수 없으므로 있으면 스레드 풀에서 실행
+
+        중단 콜백은 프로세스 풀에서도 지원하며, 중단 플래그 슬롯이 모두 사용 중일 때만
+        (취소된 요청이 워커에서 아직 끝나지 않은 경우) 스레드 풀로 실행합니다.
+        """
+        self.check_capacity()
+        self.pending += 1
+        try:
+            if (
+                not self.workers
+                or progress is not None
+                or (should_stop is not None and not self._free_stop_slots)
+            ):
+                return await run_in_threadpool(self._run_pooled, request, progress, should_stop)
+
+            # 워커 initializer가 실패하지 않도록 파일 검증을 먼저 통과시킴
+            self.pool.ensure_validated()
+            if should_stop is not None:
+                return await self._run_stoppable_in_processes(request, should_stop)
+            return await self._run_in_processes(run_design_in_worker, request.model_dump(by_alias=True))
+        finally:
+            self.pending -= 1
+
+    def _run_batch_pooled(self, requests: list[PrimerDesignRequest]) -> list[dict]:
+        designer = self.pool.acquire()
+        try:
+            return run_design_batch(designer, requests)
+        finally:
+            self.pool.release(designer)
+
+    async def run_batch(self, requests: list[PrimerDesignRequest]) -> list[dict]:
+        """여러 요청을 게놈 패스를 공유해 한 번에 실행 (대기열에서는 요청 1건으로 계산)"""
+        self.check_capacity()
+        self.pending += 1
+        try:
+            if not self.workers:
+                return await run_in_threadpool(self._run_batch_pooled, requests)
+
+            self.pool.ensure_validated()
+            bodies = [request.model_dump(by_alias=True) for request in requests]
+            return await self._run_in_processes(run_design_batch_in_worker, bodies)
+        finally:
+            self.pending -= 1
+
+    def close(self) -> None:
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+
+def design_identity_paths(pool: DesignerPool) -> list[Optional[str]]:
+    """설계 결과를 좌우하는 데이터 파일 (결과 캐시 키 / 작업 중복 제거 키에 포함)
+
+    annotations.db는 파일 stat 대신 내용 지문(`DesignerPool.data_identity`)으로 키에 넣습니다.
+    """
+    index, store = pool.genome_index, pool.genome_store
+    return [
+        pool.genome_path,
+        f"{pool.genome_path}.fai",
+        f"{pool.genome_path}.gzi",
+        index and index + META_SUFFIX,
+        index and index + KEYS_SUFFIX,
+        store and store + STORE_META_SUFFIX,
+    ]
+
+
+def result_cache_from_env(pool: DesignerPool) -> Optional[DesignResultCache]:
+    """DESIGN_CACHE_SIZE=0이면 캐시 비활성화, DESIGN_CACHE_PATH가 있으면 디스크 계층 사용"""
+    max_entries = int(os.getenv("DESIGN_CACHE_SIZE", "256"))
+    if max_entries <= 0:
+        return None
+    return DesignResultCache(
+        max_entries=max_entries,
+        max_bytes=int(float(os.getenv("DESIGN_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        ttl_seconds=float(os.getenv("DESIGN_CACHE_TTL", "3600")),
+        disk_path=os.getenv("DESIGN_CACHE_PATH") or None,
+        identity_paths=design_identity_paths(pool),
+        data_identity=pool.data_identity,
+    )
+
+
+async def run_cached(
+    executor: DesignExecutor,
+    cache: Optional[DesignResultCache],
+    request: PrimerDesignRequest,
+    progress: Optional[ProgressCallback] = None,
+    should_stop: Optional[StopCallback] = None,
+) -> tuple[dict, Optional[str]]:
+    """결과 캐시를 먼저 조회하고, 없으면 실행 후 저장. (결과, "hit"/"miss"/None) 반환
+
+    단계 지표(`timings`)는 이번에 계산한 결과에만 있고 캐시에는 저장하지 않습니다.
+    """
+    if cache is None:
+        result = await executor.run(request, progress, should_stop)
+        DESIGN_METRICS.observe(result.get("timings"))
+        return result, None
+
+    key = cache.key(request)
+    result = cache.get(key)
+    if result is not None:
+        DESIGN_METRICS.observe(None, "hit")
+        return result, "hit"
+    result = await executor.run(request, progress, should_stop)
+    cache.put(key, without_timings(result))
+    DESIGN_METRICS.observe(result.get("timings"), "miss")
+    return result, "miss"
+
+
+def without_timings(result: dict) -> dict:
+    return {name: value for name, value in result.items() if name != "timings"}
+
+
+async def run_cached_batch(
+    executor: DesignExecutor,
+    cache: Optional[DesignResultCache],
+    requests: list[PrimerDesignRequest],
+) -> list[tuple[dict, Optional[str]]]:
+    """요청별로 결과 캐시를 조회하고, 캐시에 없는 요청만 모아 한 번에 실행. 입력 순서대로 (결과, 캐시 상태) 반환"""
+    if cache is None:
+        results = await executor.run_batch(requests)
+        if results:
+            DESIGN_METRICS.observe(results[0].get("timings"), requests=len(results))
+        return [(result, None) for result in results]
+
+    keys = [cache.key(request) for request in requests]
+    outcomes: list[Optional[tuple[dict, Optional[str]]]] = [None] * len(requests)
+    # 같은 요청이 여러 번 있으면 한 번만 계산
+    missing: dict[str, list[int]] = {}
+    for i, key in enumerate(keys):
+        result = cache.get(key)
+        if result is not None:
+            outcomes[i] = (result, "hit")
+        else:
+            missing.setdefault(key, []).append(i)
+
+    for outcome in outcomes:
+        if outcome is not None:
+            DESIGN_METRICS.observe(None, "hit")
+    if missing:
+        computed = await executor.run_batch([requests[indices[0]] for indices in missing.values()])
+        # 배치 단계 지표는 배치 전체 기준이므로 한 번만 반영
+        DESIGN_METRICS.observe(computed[0].get("timings"), "miss", requests=sum(map(len, missing.values())))
+        for (key, indices), result in zip(missing.items(), computed):
+            cache.put(key, without_timings(result))
+            outcomes[indices[0]] = (result, "miss")
+            for i in indices[1:]:
+                outcomes[i] = (cache.get(key) or result, "miss")
+    # 모든 자리가 캐시 히트 또는 계산 결과로 채워짐
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
+def design_jobs_from_env(
+    pool: DesignerPool, executor: DesignExecutor, cache: Optional[DesignResultCache]
+) -> Optional[DesignJobManager]:
+    """작업 저장소는 DESIGN_JOBS_DB (기본: annotations.db 옆 design_jobs.db). 디렉터리가 없으면 작업 API 비활성화"""
+    path = os.getenv("DESIGN_JOBS_DB") or os.path.join(os.path.dirname(os.path.abspath(pool.db_path)), "design_jobs.db")
+    if not os.path.isdir(os.path.dirname(os.path.abspath(path))):
+        return None
+    identity_paths = design_identity_paths(pool)
+    return DesignJobManager(
+        store=JobStore(path, ttl_seconds=float(os.getenv("DESIGN_JOB_TTL", "86400"))),
+        runner=lambda request, should_stop: run_cached(executor, cache, request, should_stop=should_stop),
+        key=lambda request: design_request_key(request, identity_paths, pool.data_identity()),
+        concurrency=int(os.getenv("DESIGN_JOB_CONCURRENCY", "2")),
+    )
+
+
+def open_design_resources(app: FastAPI) -> DesignerPool:
+    """앱 lifespan 시작 시 풀/실행기/결과 캐시를 만들고 파일을 한 번 검증 (실패해도 앱 기동은 계속)"""
+    pool = DesignerPool.from_env()
+    try:
+        pool.validate()
+    except HTTPException:
+        pass
+    app.state.designer_pool = pool
+    app.state.design_executor = DesignExecutor.from_env(pool)
+    app.state.result_cache = result_cache_from_env(pool)
+    app.state.design_jobs = design_jobs_from_env(pool, app.state.design_executor, app.state.result_cache)
+    return pool
+
+
+def close_design_resources(app: FastAPI) -> None:
+    jobs: Optional[DesignJobManager] = getattr(app.state, "design_jobs", None)
+    if jobs is not None:
+        jobs.close()
+        app.state.design_jobs = None
+    cache: Optional[DesignResultCache] = getattr(app.state, "result_cache", None)
+    if cache is not None:
+        cache.close()
+        app.state.result_cache = None
+    executor: Optional[DesignExecutor] = getattr(app.state, "design_executor", None)
+    if executor is not None:
+        executor.close()
+        app.state.design_executor = None
+    pool: Optional[DesignerPool] = getattr(app.state, "designer_pool", None)
+    if pool is not None:
+        pool.close()
+        app.state.designer_pool = None
+
+
+def get_designer_pool(app: FastAPI) -> DesignerPool:
+    pool: Optional[DesignerPool] = getattr(app.state, "designer_pool", None)
+    if pool is None:
+        pool = open_design_resources(app)
+    return pool
+
+
+def get_design_executor(request: Request) -> DesignExecutor:
+    if getattr(request.app.state, "design_executor", None) is None:
+        get_designer_pool(request.app)
+    return request.app.state.design_executor
+
+
+def get_result_cache(request: Request) -> Optional[DesignResultCache]:
+    get_design_executor(request)
+    return getattr(request.app.state, "result_cache", None)
+
+
+def get_design_jobs(request: Request) -> DesignJobManager:
+    get_design_executor(request)
+    jobs: Optional[DesignJobManager] = getattr(request.app.state, "design_jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="작업 저장소를 사용할 수 없습니다.")
+    return jobs
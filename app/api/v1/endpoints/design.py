@@ -1,86 +1,35 @@
-import os
+import asyncio
+import json
+import threading
 import time
 from datetime import datetime, timezone
 
-import pysam
-from fastapi import APIRouter, HTTPException, status
-
-from app.algorithms.PrimerDesigner import PrimerDesigner
-from app.schemas.request import PrimerDesignRequest
-from app.schemas.response import PrimerDesignResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.algorithms.PrimerDesigner import DesignCancelled
+from app.api.deps import (
+    DesignExecutor,
+    get_design_executor,
+    get_design_jobs,
+    get_result_cache,
+    run_cached,
+    run_cached_batch,
+)
+from app.schemas.job import DesignJobStatus
+from app.schemas.request import PrimerDesignBatchRequest, PrimerDesignRequest
+from app.schemas.response import PrimerDesignBatchResponse, PrimerDesignResponse
+from app.services.design_jobs import JOB_SUCCEEDED, DesignJobManager
+from app.services.result_cache import DesignResultCache, json_default
 
 router = APIRouter()
 
 
-def _project_root() -> str:
-    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
-
-
-def _resolve_paths() -> tuple[str, str]:
-    root = _project_root()
-    db_path = os.getenv("DB_PATH") or os.path.join(root, "database", "annotations.db")
-    genome_path = os.getenv("GENOME_PATH") or os.path.join(
-        root, "database", "raw_data", "GRCh38.primary_assembly.genome.fa.gz"
-    )
-    return db_path, genome_path
-
-
-def _validate_genome_fasta(genome_path: str) -> None:
-    if not os.path.exists(genome_path):
-        raise HTTPException(status_code=503, detail="genome FASTA 파일을 찾을 수 없습니다.")
-
-    if genome_path.endswith(".gz"):
-        fai_path = f"{genome_path}.fai"
-        gzi_path = f"{genome_path}.gzi"
-        missing = [path for path in (fai_path, gzi_path) if not os.path.exists(path)]
-        if missing:
-            raise HTTPException(
-                status_code=503,
-                detail=(
-                    "GENOME_PATH가 .gz인 경우 bgzip FASTA와 인덱스(.fai, .gzi)가 모두 필요합니다. "
-                    f"누락 파일: {', '.join(missing)}"
-                ),
-            )
-
-    try:
-        fasta = pysam.FastaFile(genome_path)
-        fasta.close()
-    except OSError as exc:
-        msg = str(exc)
-        if "Cannot index files compressed with gzip" in msg or "File truncated" in msg:
-            raise HTTPException(
-                status_code=503,
-                detail=(
-                    "현재 genome 파일은 일반 gzip 형식으로 보입니다. "
-                    "pysam 사용을 위해서는 bgzip으로 압축된 FASTA(.fa.gz)와 "
-                    "인덱스(.fai, .gzi)가 필요합니다."
-                ),
-            ) from exc
-        raise HTTPException(status_code=503, detail=f"genome FASTA 파일을 열 수 없습니다: {exc}") from exc
-
-
-def _normalize_gc_range(gc_min: float, gc_max: float) -> tuple[float, float]:
-    if gc_min > 1 or gc_max > 1:
-        return gc_min / 100.0, gc_max / 100.0
-    return gc_min, gc_max
-
-
-def _validate_db_path(db_path: str) -> None:
-    if not os.path.exists(db_path):
-        raise HTTPException(status_code=503, detail="annotations.db 파일을 찾을 수 없습니다.")
-
-
-def _intron_size_range(request: PrimerDesignRequest) -> tuple[int, int] | None:
-    if not request.position.intronSize:
-        return None
-    return int(request.position.intronSize.min), int(request.position.intronSize.max)
-
-
-def _to_candidate(candidate: dict, index: int) -> dict:
+def _to_candidate(candidate: dict, candidate_id: str) -> dict:
     seq = candidate["seq"]
     gc_percent = ((seq.count("G") + seq.count("C")) / len(seq)) * 100 if seq else 0.0
     return {
-        "id": f"cand_{index}",
+        "id": candidate_id,
         "sequence": seq,
         "start_bp": int(candidate["start"]),
         "end_bp": int(candidate["end"]),
@@ -93,138 +42,234 @@ def _to_candidate(candidate: dict, index: int) -> dict:
     }
 
 
-def _filter_candidates_by_template(
-    designer: PrimerDesigner,
-    request: PrimerDesignRequest,
-    candidates: list[dict],
-    template_info: dict,
-) -> list[dict]:
-    mapped_candidates = [
-        designer.map_to_genomic_coords(candidate, template_info) for candidate in candidates
-    ]
-
-    if request.position.searchRange.from_ <= request.position.searchRange.to:
-        mapped_candidates = [
-            candidate
-            for candidate in mapped_candidates
-            if request.position.searchRange.from_
-            <= candidate["genomic_start"]
-            <= request.position.searchRange.to
-        ]
-
-    filtered_candidates = [
-        candidate
-        for candidate in mapped_candidates
-        if designer.local_db_filter(
-            chrom=template_info["chrom"],
-            primer=candidate,
-            junction_mode=request.position.exonJunctionSpan,
-            restriction_enzymes=request.position.restrictionEnzymes,
-            intron_inclusion=request.position.intronInclusion,
-            intron_size_range=_intron_size_range(request),
-        )
-    ]
-
-    if request.specificity.checkEnabled and filtered_candidates:
-        end_strict = request.specificity.endMismatchStrictness
-        mismatch_cutoff = end_strict.minMismatch if end_strict else 2
-        filtered_candidates = designer.filter_specific_primers(
-            primers=filtered_candidates,
-            target_chrom=template_info["chrom"],
-            target_start=template_info["genomic_start"],
-            target_end=template_info["genomic_start"] + template_info["template_length"] - 1,
-            mispriming_library=request.specificity.misprimingLibrary,
-            snp_exclusion=request.specificity.snpExclusion,
-            splice_variant_handling=request.specificity.spliceVariantHandling,
-            mismatch_cutoff=mismatch_cutoff,
-        )
+def _to_pair(pair: dict, index: int) -> dict:
+    return {
+        "id": f"pair_{index}",
+        "forward": _to_candidate(pair["fwd"], f"pair_{index}_fwd"),
+        "reverse": _to_candidate(pair["rev"], f"pair_{index}_rev"),
+        "product_size_bp": int(pair["product_size"]),
+        "tm_diff_c": float(pair["tm_diff"]),
+        "penalty": float(pair["penalty"]),
+    }
+
 
-    return filtered_candidates
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def _timestamp(epoch: float | None = None) -> str:
+    moment = datetime.fromtimestamp(epoch, timezone.utc) if epoch is not None else datetime.now(timezone.utc)
+    return moment.isoformat().replace("+00:00", "Z")
 
 
 def _build_response(
     request: PrimerDesignRequest,
-    template_info: dict | None,
-    candidates: list[dict],
-    started: float,
+    result: dict,
+    execution_time_ms: int,
+    cache_status: str | None = None,
+    timestamp: str | None = None,
 ) -> PrimerDesignResponse:
+    template_info = result["template_info"]
+    candidates, pairs = result["candidates"], result["pairs"]
     response = {
         "genome": {
             "id": (template_info["chrom"] if template_info else request.basic.targetOrganism),
             "name": request.basic.targetOrganism,
             "sequence": request.basic.templateSequence,
             "length_bp": len(request.basic.templateSequence),
+            "placements": template_info.get("placements", []) if template_info else [],
         },
-        "candidates": [_to_candidate(candidate, i) for i, candidate in enumerate(candidates, start=1)],
+        "candidates": [_to_candidate(candidate, f"cand_{i}") for i, candidate in enumerate(candidates, start=1)],
+        "pairs": [_to_pair(pair, i) for i, pair in enumerate(pairs, start=1)],
         "meta": {
             "params": request,
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "execution_time_ms": int((time.perf_counter() - started) * 1000),
+            "timestamp": timestamp or _timestamp(),
+            "execution_time_ms": execution_time_ms,
+            "cache": cache_status,
+            "timings": result.get("timings"),
         },
     }
     return PrimerDesignResponse(**response)
 
 
-def _close_designer(designer: PrimerDesigner | None) -> None:
-    if designer is None:
-        return
-    try:
-        designer.cur.close()
-    except Exception:
-        pass
-    try:
-        designer.db.close()
-    except Exception:
-        pass
-    try:
-        designer.genome.close()
-    except Exception:
-        pass
-
-
 @router.post("/design", response_model=PrimerDesignResponse, status_code=status.HTTP_200_OK)
-async def design(request: PrimerDesignRequest) -> PrimerDesignResponse:
+async def design(
+    request: PrimerDesignRequest,
+    executor: DesignExecutor = Depends(get_design_executor),
+    cache: DesignResultCache | None = Depends(get_result_cache),
+) -> PrimerDesignResponse:
     """프라이머 설계"""
     started = time.perf_counter()
-    db_path, genome_path = _resolve_paths()
-
-    _validate_db_path(db_path)
-    _validate_genome_fasta(genome_path)
-
-    designer: PrimerDesigner | None = None
 
     try:
-        designer = PrimerDesigner(genome_fasta=genome_path, annotation_db=db_path)
-
-        tm_range = (request.basic.primerTm.min, request.basic.primerTm.max)
-        gc_range = _normalize_gc_range(request.properties.gcContent.min, request.properties.gcContent.max)
-
-        candidates = designer.generate_candidates(
-            template=request.basic.templateSequence,
-            tm_range=tm_range,
-            gc_range=gc_range,
-            max_poly_x=request.properties.maxPolyX,
-            gc_clamp=request.properties.gcClamp,
-        )
-
-        template_info = designer.locate_template_in_genome(request.basic.templateSequence)
+        result, cache_status = await run_cached(executor, cache, request)
+        return _build_response(request, result, _elapsed_ms(started), cache_status)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"프라이머 설계 중 오류가 발생했습니다: {exc}") from exc
 
-        if template_info:
-            candidates = _filter_candidates_by_template(designer, request, candidates, template_info)
 
-        # [추가] 품질 점수(Penalty) 기준 상위 50개 필터링
-        opt_tm = request.basic.primerTm.opt
-        for cand in candidates:
-            # 페널티 = |Tm오차| + |말단안정성오차|
-            cand["penalty"] = abs(cand.get("tm", 0) - opt_tm) + abs(cand.get("dg3", 0) + 8.0)
-        
-        candidates.sort(key=lambda x: x["penalty"])
-        candidates = candidates[:50] # 최정예 50개만 선정
+@router.post("/design/batch", response_model=PrimerDesignBatchResponse, status_code=status.HTTP_200_OK)
+async def design_batch(
+    batch: PrimerDesignBatchRequest,
+    executor: DesignExecutor = Depends(get_design_executor),
+    cache: DesignResultCache | None = Depends(get_result_cache),
+) -> PrimerDesignBatchResponse:
+    """프라이머 설계 (여러 템플릿을 게놈 1회 패스로 처리, 결과는 요청마다 /design과 동일)"""
+    started = time.perf_counter()
 
-        return _build_response(request, template_info, candidates, started)
+    try:
+        outcomes = await run_cached_batch(executor, cache, batch.requests)
+        elapsed = _elapsed_ms(started)
+        timestamp = _timestamp()
+        return PrimerDesignBatchResponse(
+            results=[
+                _build_response(request, result, elapsed, cache_status, timestamp)
+                for request, (result, cache_status) in zip(batch.requests, outcomes)
+            ],
+            execution_time_ms=elapsed,
+        )
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"프라이머 설계 중 오류가 발생했습니다: {exc}") from exc
-    finally:
-        _close_designer(designer)
+
+
+############################################
+# 스트리밍 설계 (NDJSON)
+############################################
+def _ndjson(event: dict) -> bytes:
+    return (json.dumps(event, ensure_ascii=False, default=json_default) + "\n").encode("utf-8")
+
+
+def _progress_event(stage: str, payload: dict) -> dict:
+    if stage == "candidates":
+        return {
+            "event": "candidates",
+            "count": payload["count"],
+            "candidates": [
+                _to_candidate(candidate, f"cand_{i}") for i, candidate in enumerate(payload["candidates"], start=1)
+            ],
+        }
+    if stage == "template":
+        info = payload["template_info"]
+        return {
+            "event": "template",
+            "found": info is not None,
+            "chrom": info["chrom"] if info else None,
+            "placements": info.get("placements", []) if info else [],
+        }
+    return {"event": stage, **payload}
+
+
+@router.post("/design/stream", status_code=status.HTTP_200_OK)
+async def design_stream(
+    request: PrimerDesignRequest,
+    http_request: Request,
+    executor: DesignExecutor = Depends(get_design_executor),
+    cache: DesignResultCache | None = Depends(get_result_cache),
+) -> StreamingResponse:
+    """프라이머 설계 (단계별 진행 상황을 NDJSON으로 스트리밍)
+
+    한 줄에 이벤트 하나씩 `candidates`(필터링 전 잠정 순위) → `template` → `filtered` → `specificity`(진행률)
+    순으로 보내고, 마지막 줄은 `/design`과 같은 응답을 담은 `result`(실패 시 `error`)입니다.
+    클라이언트 연결이 끊기면 게놈 스캔 루프를 중단합니다.
+    """
+    started = time.perf_counter()
+    # 스트림 시작 전에 판별 가능한 오류는 일반 HTTP 상태 코드로 응답
+    executor.pool.ensure_validated()
+    executor.check_capacity()
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def progress(stage: str, payload: dict) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, _progress_event(stage, payload))
+
+        task = asyncio.ensure_future(run_cached(executor, cache, request, progress, cancelled.is_set))
+        try:
+            while not (task.done() and queue.empty()):
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, task}, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield _ndjson(getter.result())
+                    continue
+                getter.cancel()
+                if not task.done() and await http_request.is_disconnected():
+                    cancelled.set()
+                    return
+
+            result, cache_status = task.result()
+            response = _build_response(request, result, _elapsed_ms(started), cache_status)
+            yield _ndjson({"event": "result", "data": response.model_dump(mode="json", by_alias=True)})
+        except DesignCancelled:
+            return
+        except HTTPException as exc:
+            yield _ndjson({"event": "error", "status_code": exc.status_code, "detail": exc.detail})
+        except Exception as exc:
+            yield _ndjson(
+                {"event": "error", "status_code": 500, "detail": f"프라이머 설계 중 오류가 발생했습니다: {exc}"}
+            )
+        finally:
+            # 스트림이 어떤 이유로든 끝나면 스레드에서 도는 스캔도 다음 확인 지점에서 멈추도록 신호
+            cancelled.set()
+            if not task.done():
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+############################################
+# 비동기 작업 (POST /design/jobs)
+############################################
+def _job_status(job: dict, deduplicated: bool = False) -> DesignJobStatus:
+    result = None
+    if job["status"] == JOB_SUCCEEDED and job["result"] is not None:
+        result = _build_response(
+            PrimerDesignRequest.model_validate(job["request"]),
+            job["result"],
+            job["execution_time_ms"],
+            job["cache"],
+            _timestamp(job["updated"]),
+        )
+    return DesignJobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        created_at=_timestamp(job["created"]),
+        updated_at=_timestamp(job["updated"]),
+        expires_at=_timestamp(job["expires"]) if job["expires"] is not None else None,
+        deduplicated=deduplicated,
+        error=job["error"],
+        result=result,
+    )
+
+
+@router.post("/design/jobs", response_model=DesignJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_design_job(
+    request: PrimerDesignRequest,
+    jobs: DesignJobManager = Depends(get_design_jobs),
+) -> DesignJobStatus:
+    """프라이머 설계 작업 등록 (같은 요청의 유효한 작업이 있으면 그 작업을 반환)"""
+    job, deduplicated = jobs.submit(request)
+    return _job_status(job, deduplicated)
+
+
+@router.get("/design/jobs/{job_id}", response_model=DesignJobStatus)
+async def get_design_job(job_id: str, jobs: DesignJobManager = Depends(get_design_jobs)) -> DesignJobStatus:
+    """작업 상태 조회 (완료된 작업은 /design과 같은 응답을 result에 포함)"""
+    job = jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return _job_status(job)
+
+
+@router.post("/design/jobs/{job_id}/cancel", response_model=DesignJobStatus)
+async def cancel_design_job(job_id: str, jobs: DesignJobManager = Depends(get_design_jobs)) -> DesignJobStatus:
+    """대기/실행 중인 작업 취소 (이미 끝난 작업은 상태만 반환)"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return _job_status(job)
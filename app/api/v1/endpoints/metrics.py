@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import DESIGN_METRICS
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+async def metrics(request: Request) -> PlainTextResponse:
+    """설계 파이프라인 단계별 지표 (Prometheus 텍스트 형식)"""
+    state = request.app.state
+    gauges = {}
+    executor = getattr(state, "design_executor", None)
+    if executor is not None:
+        gauges["primer_design_pending_requests"] = executor.pending
+    pool = getattr(state, "designer_pool", None)
+    if pool is not None:
+        gauges["primer_design_specificity_cache_entries"] = len(pool.specificity_cache)
+    return PlainTextResponse(DESIGN_METRICS.render(gauges), media_type="text/plain; version=0.0.4")
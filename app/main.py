@@ -1,10 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.deps import close_design_resources, open_design_resources
 from app.api.v1.endpoints.design import router as design_router
 from app.api.v1.endpoints.health import router as health_router
+from app.api.v1.endpoints.metrics import router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 요청 간 공유할 FASTA/DB 리소스 풀과 설계 실행기 (파일 검증은 여기서 1회)
+    open_design_resources(app)
+    # 이전 프로세스에서 끝나지 않은 설계 작업 재개
+    if app.state.design_jobs is not None:
+        app.state.design_jobs.resume()
+    yield
+    close_design_resources(app)
+
 
-app = FastAPI(title="PrimerFlow API", version="0.1.0")
+app = FastAPI(title="PrimerFlow API", version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/")
@@ -14,6 +30,7 @@ async def root():
         "docs": "/docs",
         "health": "/health",
         "database": "/health/db",
+        "metrics": "/metrics",
         
     }
 
@@ -30,4 +47,5 @@ app.add_middleware(
 )
 
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(design_router)
@@ -0,0 +1,16 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.response import PrimerDesignResponse
+
+
+class DesignJobStatus(BaseModel):
+    job_id: str  # 작업 ID
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]  # 작업 상태
+    created_at: str  # 등록 시간 (ISO 8601)
+    updated_at: str  # 마지막 상태 변경 시간
+    expires_at: Optional[str] = None  # 결과 보관 만료 시간 (끝난 작업만)
+    deduplicated: bool = False  # 같은 요청의 기존 작업을 재사용했는지
+    error: Optional[str] = None  # 실패 사유
+    result: Optional[PrimerDesignResponse] = None  # 완료 시 설계 결과
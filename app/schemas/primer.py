@@ -9,11 +9,19 @@ class Metrics(BaseModel):
     penalties: Optional[Any] = None  # 패널티 점수 등
 
 
+class GenomicPlacement(BaseModel):
+    chrom: str  # 염색체
+    genomic_start: int  # 게놈 시작 위치 (1-based)
+    strand: Literal["+", "-"]  # 게놈 기준 방향
+    template_length: int  # 템플릿 길이
+
+
 class GenomeSequence(BaseModel):
     id: str  # 고유 ID
     name: str  # FASTA Header
     sequence: str  # 정규화된 유전자 서열 (A/C/G/T/N...)
     length_bp: int  # 서열 길이
+    placements: list[GenomicPlacement] = []  # 템플릿이 일치하는 모든 게놈 위치
 
 
 class PrimerCandidate(BaseModel):
@@ -23,3 +31,12 @@ class PrimerCandidate(BaseModel):
     end_bp: int  # 프라이머 끝 위치
     strand: Literal["forward", "reverse"]  # 방향
     metrics: Metrics
+
+
+class PrimerPair(BaseModel):
+    id: str  # 페어 ID
+    forward: PrimerCandidate  # forward 프라이머
+    reverse: PrimerCandidate  # reverse 프라이머
+    product_size_bp: int  # PCR 산물 길이
+    tm_diff_c: float  # 두 프라이머의 Tm 차이
+    penalty: float  # 페어 패널티 점수 (낮을수록 좋음)
@@ -1,6 +1,6 @@
 from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.common import EndMismatchStrictness, PrimerTm, Range, SearchRange
 
@@ -41,3 +41,11 @@ class PrimerDesignRequest(BaseModel):
     properties: PrimerProperties
     specificity: PrimerSpecificity
     position: PrimerPosition
+
+
+# 한 배치로 묶을 수 있는 최대 설계 요청 수 (수백 건을 게놈 1회 패스로 처리)
+MAX_BATCH_REQUESTS = 500
+
+
+class PrimerDesignBatchRequest(BaseModel):
+    requests: list[PrimerDesignRequest] = Field(min_length=1, max_length=MAX_BATCH_REQUESTS)  # 게놈 패스를 공유할 설계 요청
@@ -1,18 +1,37 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
-from app.schemas.primer import GenomeSequence, PrimerCandidate
+from app.schemas.primer import GenomeSequence, PrimerCandidate, PrimerPair
 from app.schemas.request import PrimerDesignRequest
 
 
+class StageTiming(BaseModel):
+    ms: float  # 단계 소요 시간
+    count: Optional[int] = None  # 단계를 통과한 후보(템플릿은 위치, 페어링은 페어) 수
+
+
+class DesignTimings(BaseModel):
+    stages: dict[str, StageTiming]  # candidates/template/mapping/db_filter/specificity/pairing/ranking
+    specificity_chroms_ms: dict[str, float] = {}  # 염색체별 특이성 스캔 시간 (병렬 스캔은 워커 시간의 합)
+    counters: dict[str, int] = {}  # sqlite_queries, fasta_bytes, specificity_cache_hits/misses
+
+
 class Meta(BaseModel):
     params: PrimerDesignRequest  # 요청 시 사용된 파라미터 (검증용)
     timestamp: str  # 생성 시간
     execution_time_ms: Optional[int] = None  # 실행 시간
+    cache: Optional[Literal["hit", "miss"]] = None  # 결과 캐시 적중 여부 (캐시 비활성화 시 None)
+    timings: Optional[DesignTimings] = None  # 단계별 지표 (이번 요청에서 계산한 경우만, 캐시 적중 시 None)
 
 
 class PrimerDesignResponse(BaseModel):
     genome: GenomeSequence  # 분석된 게놈 정보
     candidates: list[PrimerCandidate]  # 후보 프라이머 목록
+    pairs: list[PrimerPair] = []  # 프라이머 페어 목록 (penalty 오름차순)
     meta: Meta  # 메타 데이터
+
+
+class PrimerDesignBatchResponse(BaseModel):
+    results: list[PrimerDesignResponse]  # 요청 순서대로의 설계 결과
+    execution_time_ms: Optional[int] = None  # 배치 전체 실행 시간
@@ -0,0 +1,250 @@
+"""오래 걸리는 설계를 위한 비동기 작업 큐.
+
+작업 상태/결과는 annotations.db 옆의 SQLite 파일에 저장되어 재시작 후에도 조회할 수 있고,
+대기/실행 중이던 작업은 다음 기동 시 다시 실행됩니다. 같은 요청 해시의 유효한 작업이 있으면
+새로 만들지 않고 기존 작업을 돌려줍니다.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.algorithms.PrimerDesigner import DesignCancelled, StopCallback
+from app.schemas.request import PrimerDesignRequest
+from app.services.result_cache import json_default
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+# 같은 요청이 다시 들어오면 재사용하는 상태
+REUSABLE_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED)
+
+# (요청, 중단 콜백) -> (파이프라인 결과, 캐시 상태)
+JobRunner = Callable[[PrimerDesignRequest, StopCallback], Awaitable[Tuple[dict, Optional[str]]]]
+
+
+############################################
+# SQLite 작업 저장소
+############################################
+class JobStore:
+    """design_job 테이블 (요청/결과는 JSON 문자열, 시각은 epoch 초)"""
+
+    COLUMNS = (
+        "id",
+        "request_hash",
+        "status",
+        "request",
+        "result",
+        "error",
+        "execution_time_ms",
+        "cache",
+        "created",
+        "updated",
+        "expires",
+    )
+
+    def __init__(self, path: str, ttl_seconds: float = 86400.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS design_job (
+                id TEXT PRIMARY KEY,
+                request_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                execution_time_ms INTEGER,
+                cache TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                expires REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_design_job_hash ON design_job(request_hash, status);
+            """
+        )
+        self._db.commit()
+
+    def _row(self, row) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        for field in ("request", "result"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    def _select(self, where: str, params: tuple) -> list:
+        rows = self._db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM design_job WHERE {where}", params)
+        return [self._row(row) for row in rows.fetchall()]
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM design_job WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        self.purge_expired()
+        with self._lock:
+            jobs = self._select("id=?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def create_or_get(self, request_hash: str, request_body: dict) -> Tuple[Dict, bool]:
+        """(작업, 새로 만들었는지). 같은 해시의 대기/실행/성공 작업이 있으면 그 작업을 반환"""
+        self.purge_expired()
+        with self._lock:
+            placeholders = ",".join("?" * len(REUSABLE_STATUSES))
+            existing = self._select(
+                f"request_hash=? AND status IN ({placeholders}) ORDER BY created DESC LIMIT 1",
+                (request_hash, *REUSABLE_STATUSES),
+            )
+            if existing:
+                return existing[0], False
+
+            now = time.time()
+            job_id = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO design_job (id, request_hash, status, request, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, request_hash, JOB_QUEUED, json.dumps(request_body), now, now),
+            )
+            self._db.commit()
+            return self._select("id=?", (job_id,))[0], True
+
+    def update(self, job_id: str, status: str, only_if: Tuple[str, ...] = (), **fields) -> bool:
+        """상태 전이. `only_if`가 있으면 현재 상태가 그중 하나일 때만 변경하고 변경 여부를 반환"""
+        now = time.time()
+        fields["status"] = status
+        fields["updated"] = now
+        # 끝난 작업만 TTL 이후 삭제
+        fields["expires"] = now + self.ttl_seconds if status not in (JOB_QUEUED, JOB_RUNNING) else None
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=json_default)
+        assignments = ", ".join(f"{name}=?" for name in fields)
+        where, params = "id=?", [job_id]
+        if only_if:
+            where += f" AND status IN ({','.join('?' * len(only_if))})"
+            params += list(only_if)
+        with self._lock:
+            cur = self._db.execute(f"UPDATE design_job SET {assignments} WHERE {where}", (*fields.values(), *params))
+            self._db.commit()
+            return cur.rowcount > 0
+
+    def unfinished(self) -> list:
+        with self._lock:
+            return self._select("status IN (?, ?) ORDER BY created", (JOB_QUEUED, JOB_RUNNING))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+############################################
+# 작업 실행 관리자
+############################################
+class DesignJobManager:
+    """작업을 `concurrency`개까지 동시에 실행 (실제 계산은 DesignExecutor의 워커 풀에서 수행)"""
+
+    def __init__(self, store: JobStore, runner: JobRunner, key: Callable[[PrimerDesignRequest], str], concurrency: int):
+        self.store = store
+        self.runner = runner
+        self.key = key
+        self.concurrency = max(1, concurrency)
+        # 3.10부터 Semaphore는 처음 대기할 때 실행 중인 루프에 묶이므로 여기서 만들어도 됨
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._stop_events: Dict[str, threading.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._closing = False
+
+    def _schedule(self, job_id: str, request: PrimerDesignRequest) -> None:
+        self._stop_events[job_id] = threading.Event()
+        self._tasks[job_id] = asyncio.get_running_loop().create_task(self._run(job_id, request))
+
+    async def _run(self, job_id: str, request: PrimerDesignRequest) -> None:
+        stop = self._stop_events[job_id]
+        try:
+            async with self._semaphore:
+                if stop.is_set() or not self.store.update(job_id, JOB_RUNNING, only_if=(JOB_QUEUED,)):
+                    return
+                started = time.perf_counter()
+                while True:
+                    try:
+                        result, cache_status = await self.runner(request, stop.is_set)
+                        break
+                    except HTTPException as exc:
+                        # 동기 요청으로 실행기 대기열이 찼을 때는 실패 대신 잠시 후 재시도
+                        if exc.status_code == 503 and exc.headers and "Retry-After" in exc.headers:
+                            if stop.is_set():
+                                raise DesignCancelled() from exc
+                            await asyncio.sleep(float(exc.headers["Retry-After"]))
+                            continue
+                        raise
+                # 실행 중 취소된 작업은 결과를 기록하지 않음
+                self.store.update(
+                    job_id,
+                    JOB_SUCCEEDED,
+                    only_if=(JOB_RUNNING,),
+                    result=result,
+                    cache=cache_status,
+                    execution_time_ms=int((time.perf_counter() - started) * 1000),
+                )
+        except DesignCancelled:
+            # 종료 중 중단된 작업은 다음 기동 때 다시 실행
+            self.store.update(job_id, JOB_QUEUED if self._closing else JOB_CANCELLED, only_if=(JOB_RUNNING,))
+        except HTTPException as exc:
+            self.store.update(job_id, JOB_FAILED, only_if=(JOB_RUNNING,), error=str(exc.detail))
+        except Exception as exc:
+            self.store.update(
+                job_id, JOB_FAILED, only_if=(JOB_RUNNING,), error=f"프라이머 설계 중 오류가 발생했습니다: {exc}"
+            )
+        finally:
+            self._stop_events.pop(job_id, None)
+            self._tasks.pop(job_id, None)
+
+    def submit(self, request: PrimerDesignRequest) -> Tuple[Dict, bool]:
+        """(작업, 기존 작업 재사용 여부)"""
+        job, created = self.store.create_or_get(self.key(request), request.model_dump(by_alias=True, mode="json"))
+        if created:
+            self._schedule(job["id"], request)
+        elif job["status"] in (JOB_QUEUED, JOB_RUNNING) and job["id"] not in self._tasks:
+            # 이전 프로세스에서 남은 작업
+            self._schedule(job["id"], request)
+        return job, not created
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if self.store.update(job_id, JOB_CANCELLED, only_if=(JOB_QUEUED, JOB_RUNNING)):
+            stop = self._stop_events.get(job_id)
+            if stop is not None:
+                stop.set()
+        return self.store.get(job_id)
+
+    def resume(self) -> int:
+        """이전 프로세스에서 끝나지 않은 작업을 다시 대기열에 넣음 (이벤트 루프 안에서 호출)"""
+        count = 0
+        for job in self.store.unfinished():
+            if job["id"] in self._tasks:
+                continue
+            self.store.update(job["id"], JOB_QUEUED)
+            self._schedule(job["id"], PrimerDesignRequest.model_validate(job["request"]))
+            count += 1
+        return count
+
+    def close(self) -> None:
+        self._closing = True
+        for stop in self._stop_events.values():
+            stop.set()
+        for task in self._tasks.values():
+            task.cancel()
+        self.store.close()
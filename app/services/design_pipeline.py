@@ -0,0 +1,381 @@
+"""프라이머 설계 파이프라인 (요청 1건 = 후보 생성 -> 템플릿 위치 -> 필터링 -> 랭킹).
+
+엔드포인트와 워커 프로세스가 같은 로직을 쓰도록 FastAPI와 무관한 순수 함수로 둡니다.
+"""
+import os
+from typing import MutableSequence, Optional
+
+from app.algorithms.PrimerDesigner import (
+    DesignCancelled,
+    PrimerDesigner,
+    ProgressCallback,
+    StopCallback,
+)
+from app.algorithms.specificity_cache import SpecificityCache
+from app.schemas.request import PrimerDesignRequest
+from app.services.metrics import StageTimings
+
+TOP_CANDIDATES = 50
+TOP_PAIRS = 50
+
+
+def specificity_cache_from_env() -> SpecificityCache:
+    """SPECIFICITY_CACHE_SIZE: 히트 목록을 보관할 프라이머 서열 수 (0이면 캐시하지 않음)"""
+    return SpecificityCache(max_entries=int(os.getenv("SPECIFICITY_CACHE_SIZE", "200000")))
+
+
+def normalize_gc_range(gc_min: float, gc_max: float) -> tuple[float, float]:
+    if gc_min > 1 or gc_max > 1:
+        return gc_min / 100.0, gc_max / 100.0
+    return gc_min, gc_max
+
+
+def intron_size_range(request: PrimerDesignRequest) -> tuple[int, int] | None:
+    if not request.position.intronSize:
+        return None
+    return int(request.position.intronSize.min), int(request.position.intronSize.max)
+
+
+def prefilter_candidates(
+    designer: PrimerDesigner,
+    request: PrimerDesignRequest,
+    candidates: list[dict],
+    template_info: dict,
+    progress: Optional[ProgressCallback] = None,
+    timings: Optional[StageTimings] = None,
+) -> list[dict]:
+    """게놈 좌표 매핑 + searchRange + 로컬 DB 필터 (특이성 검사 전 단계)"""
+    timings = timings if timings is not None else StageTimings()
+    with timings.stage("mapping") as stage:
+        mapped_candidates = [
+            designer.map_to_genomic_coords(candidate, template_info) for candidate in candidates
+        ]
+
+        if request.position.searchRange.from_ <= request.position.searchRange.to:
+            mapped_candidates = [
+                candidate
+                for candidate in mapped_candidates
+                if request.position.searchRange.from_
+                <= candidate["genomic_start"]
+                <= request.position.searchRange.to
+            ]
+        stage["count"] = len(mapped_candidates)
+
+    with timings.stage("db_filter") as stage:
+        keep = designer.local_db_filter_many(
+            chrom=template_info["chrom"],
+            primers=mapped_candidates,
+            junction_mode=request.position.exonJunctionSpan,
+            restriction_enzymes=request.position.restrictionEnzymes,
+            intron_inclusion=request.position.intronInclusion,
+            intron_size_range=intron_size_range(request),
+        )
+        filtered_candidates = [candidate for candidate, ok in zip(mapped_candidates, keep) if ok]
+        stage["count"] = len(filtered_candidates)
+    if progress is not None:
+        progress("filtered", {"count": len(filtered_candidates)})
+    return filtered_candidates
+
+
+def specificity_check(request: PrimerDesignRequest, candidates: list[dict], template_info: dict) -> dict:
+    """요청의 특이성 옵션 -> filter_specific_primers 키워드 인자"""
+    end_strict = request.specificity.endMismatchStrictness
+    return {
+        "primers": candidates,
+        "target_chrom": template_info["chrom"],
+        "target_start": template_info["genomic_start"],
+        "target_end": template_info["genomic_start"] + template_info["template_length"] - 1,
+        "mispriming_library": request.specificity.misprimingLibrary,
+        "snp_exclusion": request.specificity.snpExclusion,
+        "splice_variant_handling": request.specificity.spliceVariantHandling,
+        "mismatch_cutoff": end_strict.minMismatch if end_strict else 2,
+    }
+
+
+def candidate_penalty(request: PrimerDesignRequest, cand: dict) -> float:
+    # 페널티 = |Tm오차| + |말단안정성오차|
+    return abs(cand.get("tm", 0) - request.basic.primerTm.opt) + abs(cand.get("dg3", 0) + 8.0)
+
+
+def rank_candidates(request: PrimerDesignRequest, candidates: list[dict]) -> list[dict]:
+    """품질 점수(Penalty) 기준 상위 50개 필터링"""
+    for cand in candidates:
+        cand["penalty"] = candidate_penalty(request, cand)
+
+    candidates.sort(key=lambda x: x["penalty"])
+    return candidates[:TOP_CANDIDATES]  # 최정예 50개만 선정
+
+
+def pair_candidates(designer: PrimerDesigner, request: PrimerDesignRequest, candidates: list[dict]) -> list[dict]:
+    """필터를 통과한 전체 후보로 productSize / maxTmDifference 조건의 상위 페어 선정"""
+    return designer.pair_primers(
+        candidates,
+        product_range=(request.basic.productSize.min, request.basic.productSize.max),
+        max_tm_diff=request.properties.maxTmDifference,
+        opt_tm=request.basic.primerTm.opt,
+        top_k=TOP_PAIRS,
+    )
+
+
+class RankedSpecificity:
+    """특이성 검사를 penalty 순으로 나눠 실행하고, 최종 결과가 확정되면 나머지 후보는 검사하지 않음
+
+    전체 후보를 검사한 뒤 상위를 고르는 방식과 결과가 같습니다. 통과 여부는 서열마다 독립이므로
+    penalty 순으로 TOP_CANDIDATES개가 통과하면 후보 순위가 확정되고, 페어 penalty는 두 후보 penalty의
+    합 이상이므로 현재 TOP_PAIRS번째 페어가 검사하지 않은 후보로 만들 수 있는 하한보다 작으면 페어도 확정됩니다.
+    검사 묶음 크기는 `first_batch`부터 라운드마다 두 배로 늘립니다.
+    """
+
+    def __init__(
+        self,
+        designer: PrimerDesigner,
+        request: PrimerDesignRequest,
+        candidates: list[dict],
+        template_info: dict,
+        first_batch: int = 2 * TOP_CANDIDATES,
+    ):
+        self.designer = designer
+        self.request = request
+        self.check = specificity_check(request, [], template_info)
+        # 전체 검사와 같은 중복 제거/반복 서열 필터 (통과 목록의 순서 기준)
+        self.pool = list(designer.specificity_pool(candidates, self.check["mispriming_library"]).values())
+        self.check["mispriming_library"] = False  # 위에서 이미 적용
+        self.index = {p["seq"]: i for i, p in enumerate(self.pool)}
+        self.penalties = [candidate_penalty(request, p) for p in self.pool]
+        self.order = sorted(range(len(self.pool)), key=self.penalties.__getitem__)
+        self.checked = 0
+        self.batch = max(1, first_batch)
+        self.passed: list[int] = []
+        self.done = not self.pool
+
+    def next_check(self) -> Optional[dict]:
+        """다음 라운드의 filter_specific_primers 키워드 인자 (끝났으면 None)"""
+        if self.done:
+            return None
+        batch = [self.pool[i] for i in self.order[self.checked : self.checked + self.batch]]
+        self.checked += len(batch)
+        self.batch *= 2
+        return {**self.check, "primers": batch}
+
+    def accept(self, passed: list[dict]) -> None:
+        self.passed.extend(self.index[p["seq"]] for p in passed)
+        self.done = self.checked >= len(self.pool) or self._settled()
+
+    def _settled(self) -> bool:
+        if len(self.passed) < TOP_CANDIDATES:
+            return False
+        pairs = pair_candidates(self.designer, self.request, self.candidates())
+        if len(pairs) < TOP_PAIRS:
+            return False
+        # 검사하지 않은 후보가 들어간 페어의 penalty 하한 (부동소수 합산 순서 차이만큼 여유)
+        bound = self.penalties[self.order[self.checked]] + self.penalties[self.order[0]]
+        return pairs[-1]["penalty"] < bound - 1e-9
+
+    def candidates(self) -> list[dict]:
+        """지금까지 통과한 후보 (전체 검사 결과와 같은 순서)"""
+        return [self.pool[i] for i in sorted(self.passed)]
+
+
+def filter_specific_ranked(
+    designer: PrimerDesigner,
+    request: PrimerDesignRequest,
+    candidates: list[dict],
+    template_info: dict,
+    progress: Optional[ProgressCallback] = None,
+    should_stop: Optional[StopCallback] = None,
+    timings: Optional[StageTimings] = None,
+) -> list[dict]:
+    timings = timings if timings is not None else StageTimings()
+    with timings.stage("specificity") as stage:
+        ranked = RankedSpecificity(designer, request, candidates, template_info)
+        while (check := ranked.next_check()) is not None:
+            ranked.accept(designer.filter_specific_primers(**check, progress=progress, should_stop=should_stop))
+        passed = ranked.candidates()
+        stage["count"] = len(passed)
+    return passed
+
+
+def generate_candidates(designer: PrimerDesigner, request: PrimerDesignRequest) -> list[dict]:
+    tm_range = (request.basic.primerTm.min, request.basic.primerTm.max)
+    gc_range = normalize_gc_range(request.properties.gcContent.min, request.properties.gcContent.max)
+    return designer.generate_candidates(
+        template=request.basic.templateSequence,
+        tm_range=tm_range,
+        gc_range=gc_range,
+        max_poly_x=request.properties.maxPolyX,
+        gc_clamp=request.properties.gcClamp,
+    )
+
+
+def pair_and_rank(
+    designer: PrimerDesigner,
+    request: PrimerDesignRequest,
+    template_info: Optional[dict],
+    candidates: list[dict],
+    timings: StageTimings,
+) -> dict:
+    with timings.stage("pairing") as stage:
+        pairs = pair_candidates(designer, request, candidates)
+        stage["count"] = len(pairs)
+    with timings.stage("ranking") as stage:
+        ranked = rank_candidates(request, candidates)
+        stage["count"] = len(ranked)
+    return {"template_info": template_info, "candidates": ranked, "pairs": pairs}
+
+
+def finish_timings(designer: PrimerDesigner, timings: StageTimings, sqlite_queries: int) -> dict:
+    """설계기 누적 지표를 반영해 meta.timings 형태로 변환 (`sqlite_queries`는 시작 시점 조회 수)"""
+    timings.add_designer_stats(designer.reset_stats())
+    # 어노테이션 인덱스는 풀에서 공유하므로 동시 요청이 있으면 다른 요청의 최초 로드가 섞일 수 있음
+    timings.add("sqlite_queries", designer.annotations.queries - sqlite_queries)
+    return timings.as_dict()
+
+
+def run_design(
+    designer: PrimerDesigner,
+    request: PrimerDesignRequest,
+    progress: Optional[ProgressCallback] = None,
+    should_stop: Optional[StopCallback] = None,
+) -> dict:
+    """설계 파이프라인 전체 실행. 결과는 프로세스 간 전달이 가능한 dict/list로만 구성
+
+    `progress(stage, payload)`가 있으면 단계가 끝날 때마다 중간 결과를 알리고
+    ("candidates" → "template" → "filtered" → "specificity"...), `should_stop()`이 True가 되면
+    다음 확인 지점에서 DesignCancelled로 중단합니다.
+    """
+
+    def checkpoint() -> None:
+        if should_stop is not None and should_stop():
+            raise DesignCancelled()
+
+    timings = StageTimings()
+    sqlite_queries = designer.annotations.queries
+    designer.reset_stats()
+
+    with timings.stage("candidates") as stage:
+        candidates = generate_candidates(designer, request)
+        stage["count"] = len(candidates)
+    if progress is not None:
+        # 필터링 전 후보의 잠정 순위 (원본 dict는 건드리지 않음)
+        preview = sorted(
+            ({**cand, "penalty": candidate_penalty(request, cand)} for cand in candidates),
+            key=lambda x: x["penalty"],
+        )[:TOP_CANDIDATES]
+        progress("candidates", {"count": len(candidates), "candidates": preview})
+    checkpoint()
+
+    with timings.stage("template") as stage:
+        template_info = designer.locate_template_in_genome(request.basic.templateSequence)
+        stage["count"] = len(template_info["placements"]) if template_info else 0
+    if progress is not None:
+        progress("template", {"template_info": template_info})
+    checkpoint()
+
+    if template_info:
+        candidates = prefilter_candidates(designer, request, candidates, template_info, progress, timings)
+        if request.specificity.checkEnabled and candidates:
+            candidates = filter_specific_ranked(
+                designer, request, candidates, template_info, progress, should_stop, timings
+            )
+
+    result = pair_and_rank(designer, request, template_info, candidates, timings)
+    result["timings"] = finish_timings(designer, timings, sqlite_queries)
+    return result
+
+
+def run_design_batch(designer: PrimerDesigner, requests: list[PrimerDesignRequest]) -> list[dict]:
+    """여러 요청을 게놈 패스를 공유해 한 번에 실행 (결과는 요청마다 run_design과 동일, 입력 순서대로)
+
+    템플릿 위치 탐색은 요청 전체에 대해 한 번, 특이성 검사는 라운드마다 한 번씩 수행하고,
+    후보 생성/로컬 필터/페어링/랭킹은 요청별로 처리합니다.
+    """
+    timings = StageTimings()
+    sqlite_queries = designer.annotations.queries
+    designer.reset_stats()
+
+    with timings.stage("candidates") as stage:
+        candidate_lists = [generate_candidates(designer, request) for request in requests]
+        stage["count"] = sum(map(len, candidate_lists))
+    with timings.stage("template") as stage:
+        template_infos = designer.locate_templates_in_genome([r.basic.templateSequence for r in requests])
+        stage["count"] = sum(len(info["placements"]) for info in template_infos if info)
+
+    ranked: dict[int, RankedSpecificity] = {}
+    for i, (request, template_info) in enumerate(zip(requests, template_infos)):
+        if not template_info:
+            continue
+        candidate_lists[i] = prefilter_candidates(designer, request, candidate_lists[i], template_info, timings=timings)
+        if request.specificity.checkEnabled and candidate_lists[i]:
+            ranked[i] = RankedSpecificity(designer, request, candidate_lists[i], template_info)
+
+    # 라운드마다 아직 확정되지 않은 요청의 다음 묶음을 모아 게놈 1회 패스로 검사
+    with timings.stage("specificity") as stage:
+        while checks := {i: check for i, r in ranked.items() if (check := r.next_check()) is not None}:
+            for i, passed in zip(checks, designer.filter_specific_primers_many(list(checks.values()))):
+                ranked[i].accept(passed)
+        for i, r in ranked.items():
+            candidate_lists[i] = r.candidates()
+        stage["count"] = sum(len(candidate_lists[i]) for i in ranked)
+
+    results = [
+        pair_and_rank(designer, request, template_info, candidates, timings)
+        for request, template_info, candidates in zip(requests, template_infos, candidate_lists)
+    ]
+    # 단계 지표는 배치 전체 기준 (각 결과에 같은 값)
+    batch_timings = finish_timings(designer, timings, sqlite_queries)
+    for result in results:
+        result["timings"] = batch_timings
+    return results
+
+
+############################################
+# 워커 프로세스 진입점
+############################################
+_worker_designer: Optional[PrimerDesigner] = None
+# 부모 프로세스와 공유하는 중단 플래그 (요청마다 슬롯 하나, 0이 아니면 중단)
+_worker_stop_flags: Optional[MutableSequence[int]] = None
+
+
+def init_worker(
+    db_path: str,
+    genome_path: str,
+    genome_index: Optional[str],
+    genome_store: Optional[str] = None,
+    annotation_snapshot: Optional[str] = None,
+    stop_flags: Optional[MutableSequence[int]] = None,
+) -> None:
+    """프로세스 풀 initializer: 워커마다 PrimerDesigner를 한 번 열어 재사용"""
+    global _worker_designer, _worker_stop_flags
+    _worker_stop_flags = stop_flags
+    _worker_designer = PrimerDesigner(
+        genome_fasta=genome_path,
+        annotation_db=db_path,
+        genome_index=genome_index,
+        specificity_cache=specificity_cache_from_env(),
+        genome_store=genome_store,
+        annotation_snapshot=annotation_snapshot,
+    )
+
+
+def _worker() -> PrimerDesigner:
+    if _worker_designer is None:
+        raise RuntimeError("워커 PrimerDesigner가 초기화되지 않았습니다.")
+    # DB가 바뀌었으면(빌드/--refresh) 이 워커의 어노테이션 트랙을 버림
+    _worker_designer.annotations.db_fingerprint()
+    return _worker_designer
+
+
+def run_design_in_worker(body: dict, stop_slot: Optional[int] = None) -> dict:
+    """`stop_slot`이 있으면 공유 중단 플래그의 해당 슬롯을 should_stop으로 사용"""
+    flags = _worker_stop_flags
+    if stop_slot is None or flags is None:
+        return run_design(_worker(), PrimerDesignRequest.model_validate(body))
+
+    def should_stop() -> bool:
+        return bool(flags[stop_slot])
+
+    return run_design(_worker(), PrimerDesignRequest.model_validate(body), should_stop=should_stop)
+
+
+def run_design_batch_in_worker(bodies: list[dict]) -> list[dict]:
+    return run_design_batch(_worker(), [PrimerDesignRequest.model_validate(body) for body in bodies])
@@ -0,0 +1,154 @@
+"""설계 파이프라인 단계별 지표.
+
+요청마다 StageTimings로 단계별 소요 시간/후보 수를 모아 `meta.timings`로 돌려주고,
+프로세스 전역 DesignMetrics에 누적해 `/metrics`에서 Prometheus 텍스트 형식으로 노출합니다.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class StageTimings:
+    """요청 1건(또는 배치 1건)의 단계별 소요 시간, 단계 출력 후보 수, 카운터
+
+    단계: candidates → template → mapping → db_filter → specificity → pairing → ranking
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = {}
+        self.specificity_chroms_ms: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        """`with timings.stage("db_filter") as entry: ...; entry["count"] = n` (같은 단계는 누적)"""
+        entry = self.stages.setdefault(name, {"ms": 0.0, "count": None})
+        started = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["ms"] += (time.perf_counter() - started) * 1000
+
+    def add(self, name: str, value: int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def add_designer_stats(self, stats: Dict) -> None:
+        """PrimerDesigner.reset_stats() 결과를 반영"""
+        for name in ("fasta_bytes", "specificity_cache_hits", "specificity_cache_misses"):
+            self.add(name, stats.get(name, 0))
+        for chrom, seconds in stats.get("specificity_chrom_seconds", {}).items():
+            self.specificity_chroms_ms[chrom] = self.specificity_chroms_ms.get(chrom, 0.0) + seconds * 1000
+
+    def as_dict(self) -> Dict:
+        return {
+            "stages": {
+                name: {"ms": round(entry["ms"], 3), "count": entry["count"]} for name, entry in self.stages.items()
+            },
+            "specificity_chroms_ms": {chrom: round(ms, 3) for chrom, ms in self.specificity_chroms_ms.items()},
+            "counters": dict(self.counters),
+        }
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class DesignMetrics:
+    """프로세스 전역 누적 지표 (스레드 안전). 라벨 조합별 카운터/게이지를 보관"""
+
+    HELP = {
+        "primer_design_requests_total": ("counter", "설계 요청 수 (result 캐시 적중 여부별)"),
+        "primer_design_stage_seconds_total": ("counter", "단계별 누적 소요 시간(초)"),
+        "primer_design_stage_runs_total": ("counter", "단계 실행 횟수"),
+        "primer_design_stage_candidates": ("gauge", "마지막 실행에서 단계를 통과한 후보 수"),
+        "primer_design_specificity_chrom_seconds_total": ("counter", "염색체별 특이성 스캔 누적 시간(초)"),
+        "primer_design_sqlite_queries_total": ("counter", "annotations.db 조회 수"),
+        "primer_design_fasta_bytes_total": ("counter", "게놈에서 읽은 바이트 수"),
+        "primer_design_specificity_cache_lookups_total": ("counter", "특이성 히트 캐시 조회 수 (적중 여부별)"),
+        "primer_design_result_cache_hit_ratio": ("gauge", "결과 캐시 적중률 (누적)"),
+        "primer_design_specificity_cache_hit_ratio": ("gauge", "특이성 히트 캐시 적중률 (누적)"),
+        "primer_design_pending_requests": ("gauge", "실행/대기 중인 설계 요청 수"),
+        "primer_design_specificity_cache_entries": ("gauge", "특이성 히트 캐시 항목 수"),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def _inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def _set(self, name: str, value: float, **labels: str) -> None:
+        self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def _get(self, name: str, **labels: str) -> float:
+        return self._values.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def observe(self, timings: Optional[Dict], cache_status: Optional[str] = None, requests: int = 1) -> None:
+        """설계 실행 1회 반영 (`timings`는 StageTimings.as_dict(), 캐시 적중이면 None, 배치면 `requests`건)"""
+        with self._lock:
+            self._inc("primer_design_requests_total", requests, cache=cache_status or "disabled")
+            if timings:
+                for stage, entry in timings.get("stages", {}).items():
+                    self._inc("primer_design_stage_seconds_total", entry["ms"] / 1000, stage=stage)
+                    self._inc("primer_design_stage_runs_total", stage=stage)
+                    if entry.get("count") is not None:
+                        self._set("primer_design_stage_candidates", entry["count"], stage=stage)
+                for chrom, ms in timings.get("specificity_chroms_ms", {}).items():
+                    self._inc("primer_design_specificity_chrom_seconds_total", ms / 1000, chrom=chrom)
+                counters = timings.get("counters", {})
+                self._inc("primer_design_sqlite_queries_total", counters.get("sqlite_queries", 0))
+                self._inc("primer_design_fasta_bytes_total", counters.get("fasta_bytes", 0))
+                self._inc(
+                    "primer_design_specificity_cache_lookups_total",
+                    counters.get("specificity_cache_hits", 0),
+                    result="hit",
+                )
+                self._inc(
+                    "primer_design_specificity_cache_lookups_total",
+                    counters.get("specificity_cache_misses", 0),
+                    result="miss",
+                )
+
+    def _ratios(self) -> None:
+        for name, total_name, labels in (
+            ("primer_design_result_cache_hit_ratio", "primer_design_requests_total", "cache"),
+            ("primer_design_specificity_cache_hit_ratio", "primer_design_specificity_cache_lookups_total", "result"),
+        ):
+            hits = self._get(total_name, **{labels: "hit"})
+            total = hits + self._get(total_name, **{labels: "miss"})
+            if total:
+                self._set(name, hits / total)
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus 텍스트 형식 (`gauges`는 호출 시점 값을 그대로 노출할 추가 게이지)"""
+        with self._lock:
+            self._ratios()
+            values = dict(self._values)
+        for name, value in (gauges or {}).items():
+            values[(name, ())] = value
+
+        lines = []
+        for name in sorted({key[0] for key in values}):
+            kind, help_text = self.HELP.get(name, ("gauge", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(values.items()):
+                if metric != name:
+                    continue
+                label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {_format(value)}" if label_text else f"{name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+DESIGN_METRICS = DesignMetrics()
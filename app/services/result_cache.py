@@ -0,0 +1,173 @@
+"""동일한 /design 요청의 파이프라인 결과를 재사용하는 캐시.
+
+키는 정규화한 요청 파라미터 + annotations.db 내용 지문(build_manifest 체크섬) + genome 파일 식별 정보
+(경로, 크기, mtime)의 해시라서, DB를 다시 빌드/갱신하거나 게놈 인덱스를 다시 빌드하면 이전 결과는
+자동으로 무효화됩니다.
+메모리(LRU + TTL + 크기 제한) 계층과 선택적인 SQLite 디스크 계층으로 구성됩니다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from app.schemas.request import PrimerDesignRequest
+
+# 파이프라인 결과(dict) 형식이 바뀌면 올려서 디스크에 남은 이전 형식 항목을 무효화
+CACHE_FORMAT_VERSION = 2
+
+# 파이프라인 결과에 영향을 주지 않는 필드 (응답 생성 시 요청에서 다시 채움)
+CACHE_EXCLUDED_FIELDS = (("basic", "targetOrganism"),)
+
+
+def canonical_request(request: PrimerDesignRequest) -> dict:
+    body = request.model_dump(by_alias=True, mode="json")
+    for section, field in CACHE_EXCLUDED_FIELDS:
+        body[section].pop(field, None)
+    # 제한효소는 순서/중복과 무관하게 같은 필터
+    body["position"]["restrictionEnzymes"] = sorted(set(body["position"]["restrictionEnzymes"]))
+    return body
+
+
+def file_identity(paths: Iterable[Optional[str]]) -> list:
+    identity = []
+    for path in paths:
+        if not path:
+            continue
+        try:
+            st = os.stat(path)
+            identity.append([os.path.abspath(path), st.st_size, st.st_mtime_ns])
+        except OSError:
+            identity.append([os.path.abspath(path), None, None])
+    return identity
+
+
+def design_request_key(
+    request: PrimerDesignRequest, identity_paths: Iterable[Optional[str]], data_identity: Optional[Dict] = None
+) -> str:
+    """정규화한 요청 + 데이터 파일 식별 정보 + DB 내용 지문의 SHA-256 (결과 캐시 키, 작업 중복 제거 키)"""
+    material = {
+        "version": CACHE_FORMAT_VERSION,
+        "request": canonical_request(request),
+        "files": file_identity(identity_paths),
+    }
+    if data_identity is not None:
+        material["data"] = data_identity
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def json_default(value):
+    # 파이프라인 결과에 섞일 수 있는 NumPy 스칼라
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class DesignResultCache:
+    """설계 결과 캐시 (스레드 안전). 값은 JSON 문자열로 보관해 크기 계산과 디스크 저장을 단순화"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 10000,
+        identity_paths: Iterable[Optional[str]] = (),
+        data_identity: Optional[Callable[[], Optional[Dict]]] = None,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.disk_max_entries = max(1, disk_max_entries)
+        self.identity_paths = list(identity_paths)
+        # 키를 만들 때마다 읽는 DB 내용 지문 (파일 stat과 달리 갱신 중인 DB도 커밋된 내용 기준)
+        self.data_identity = data_identity
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS design_cache (key TEXT PRIMARY KEY, created REAL, payload TEXT)"
+            )
+            self._disk.commit()
+
+    def key(self, request: PrimerDesignRequest) -> str:
+        data = self.data_identity() if self.data_identity is not None else None
+        return design_request_key(request, self.identity_paths, data)
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, payload: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        if len(payload) > self.max_bytes:
+            return
+        self._entries[key] = (created, payload)
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, key: str) -> Optional[dict]:
+        """캐시된 결과 (매번 새 객체로 역직렬화하므로 호출자가 수정해도 안전)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    return json.loads(entry[1])
+                self._entries.pop(key)
+                self._bytes -= len(entry[1])
+
+            if self._disk is None:
+                return None
+            row = self._disk.execute("SELECT created, payload FROM design_cache WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[0]):
+                self._disk.execute("DELETE FROM design_cache WHERE key=?", (key,))
+                self._disk.commit()
+                return None
+            self._remember(key, row[0], row[1])
+            return json.loads(row[1])
+
+    def put(self, key: str, result: dict) -> None:
+        payload = json.dumps(result, default=json_default)
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, payload)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO design_cache (key, created, payload) VALUES (?, ?, ?)",
+                    (key, created, payload),
+                )
+                if self.ttl_seconds > 0:
+                    self._disk.execute("DELETE FROM design_cache WHERE created < ?", (created - self.ttl_seconds,))
+                self._disk.execute(
+                    "DELETE FROM design_cache WHERE key NOT IN "
+                    "(SELECT key FROM design_cache ORDER BY created DESC LIMIT ?)",
+                    (self.disk_max_entries,),
+                )
+                self._disk.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM design_cache")
+                self._disk.commit()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,398 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# ---------------------------------------------------------
+# 1. 경로 및 설정
+# ---------------------------------------------------------
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(BASE_DIR)
+
+DEFAULT_WORKDIR = os.path.join(tempfile.gettempdir(), "primerflow_benchmark")
+BENCHMARK_VERSION = 1
+
+# build_db.py와 같은 스키마
+SCHEMA = """
+    CREATE TABLE snp (id INTEGER PRIMARY KEY, chrom TEXT, pos INTEGER);
+    CREATE TABLE restriction_site (id INTEGER PRIMARY KEY, chrom TEXT, name TEXT, start INTEGER, end INTEGER);
+    CREATE TABLE exon (id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER, transcript_id TEXT);
+    CREATE TABLE repeats (id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER);
+
+    CREATE INDEX idx_snp ON snp(chrom, pos);
+    CREATE INDEX idx_res ON restriction_site(chrom, start);
+    CREATE INDEX idx_res_name ON restriction_site(chrom, name, start, end);
+    CREATE INDEX idx_exon ON exon(chrom, start, end);
+    CREATE INDEX idx_repeats ON repeats(chrom, start, end);
+"""
+ENZYMES = {"EcoRI": "GAATTC", "BamHI": "GGATCC", "HindIII": "AAGCTT", "NotI": "GCGGCCGC"}
+
+
+# ---------------------------------------------------------
+# 2. 합성 게놈 / 어노테이션 DB 생성
+# ---------------------------------------------------------
+def synthetic_genome(chrom_count: int, chrom_length: int, seed: int) -> dict:
+    """무작위 염기 + 소문자(soft-mask) 구간 + N 구간을 가진 염색체들"""
+    rng = np.random.default_rng(seed)
+    bases = np.frombuffer(b"ACGT", dtype=np.uint8)
+    chroms = {}
+    for i in range(chrom_count):
+        # 염색체마다 길이를 조금씩 다르게 (실제 게놈처럼 청크 경계가 어긋나도록)
+        length = max(1000, int(chrom_length * (1.0 - 0.1 * i / max(1, chrom_count))))
+        seq = bases[rng.integers(0, 4, length)].copy()
+        for _ in range(max(1, length // 50_000)):
+            start = int(rng.integers(0, length - 500))
+            seq[start : start + int(rng.integers(50, 500))] |= 32  # 소문자 (겹쳐도 그대로)
+        for _ in range(max(1, length // 500_000)):
+            start = int(rng.integers(0, length - 200))
+            seq[start : start + int(rng.integers(10, 200))] = ord("N")
+        chroms[f"chr{i + 1}"] = seq.tobytes().decode("ascii")
+    return chroms
+
+
+def write_bgzip_fasta(chroms: dict, path: str) -> None:
+    """bgzip FASTA + .fai/.gzi 인덱스"""
+    import pysam
+
+    plain = path[: -len(".gz")] if path.endswith(".gz") else path + ".plain"
+    with open(plain, "w") as f:
+        for name, seq in chroms.items():
+            f.write(f">{name}\n")
+            for i in range(0, len(seq), 60):
+                f.write(seq[i : i + 60] + "\n")
+    pysam.tabix_compress(plain, path, force=True)
+    os.remove(plain)
+    pysam.faidx(path)
+
+
+def write_annotations_db(chroms: dict, path: str, seed: int) -> dict:
+    """엑손(전사체당 여러 개)/SNP/반복서열 + 실제 서열에서 찾은 제한효소 자리"""
+    rng = np.random.default_rng(seed + 1)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    counts = {"exon": 0, "snp": 0, "repeats": 0, "restriction_site": 0}
+    for chrom, seq in chroms.items():
+        length = len(seq)
+        exons = []
+        for t in range(max(1, length // 20_000)):
+            pos = int(rng.integers(1, max(2, length - 20_000)))
+            for _ in range(int(rng.integers(2, 8))):
+                size = int(rng.integers(80, 400))
+                exons.append((chrom, pos, pos + size, f"{chrom}_T{t}"))
+                pos += size + int(rng.integers(200, 3000))
+        conn.executemany("INSERT INTO exon (chrom, start, end, transcript_id) VALUES (?, ?, ?, ?)", exons)
+
+        snps = [(chrom, int(p)) for p in rng.integers(1, length, length // 300)]
+        conn.executemany("INSERT INTO snp (chrom, pos) VALUES (?, ?)", snps)
+
+        starts = rng.integers(1, length, max(1, length // 5_000))
+        repeats = [(chrom, int(s), int(s + rng.integers(100, 2000))) for s in starts]
+        conn.executemany("INSERT INTO repeats (chrom, start, end) VALUES (?, ?, ?)", repeats)
+
+        upper = seq.upper()
+        sites = []
+        for name, motif in ENZYMES.items():
+            pos = upper.find(motif)
+            while pos != -1:
+                sites.append((chrom, name, pos + 1, pos + len(motif)))
+                pos = upper.find(motif, pos + 1)
+        conn.executemany("INSERT INTO restriction_site (chrom, name, start, end) VALUES (?, ?, ?, ?)", sites)
+
+        for table, rows in (("exon", exons), ("snp", snps), ("repeats", repeats), ("restriction_site", sites)):
+            counts[table] += len(rows)
+    conn.commit()
+    conn.close()
+    return counts
+
+
+def prepare_fixtures(args) -> dict:
+    """설정별 작업 디렉터리에 픽스처를 만들고, 이미 있으면 재사용"""
+    name = f"g{args.chroms}x{args.chrom_length}_s{args.seed}"
+    workdir = os.path.join(args.workdir, name)
+    os.makedirs(workdir, exist_ok=True)
+    fasta = os.path.join(workdir, "genome.fa.gz")
+    db = os.path.join(workdir, "annotations.db")
+    marker = os.path.join(workdir, "fixtures.json")
+
+    chroms = synthetic_genome(args.chroms, args.chrom_length, args.seed)
+    if not os.path.exists(marker):
+        print(f"🧬 합성 게놈 생성: {args.chroms} x {args.chrom_length:,} bp -> {workdir}")
+        write_bgzip_fasta(chroms, fasta)
+        counts = write_annotations_db(chroms, db, args.seed)
+        with open(marker, "w", encoding="utf-8") as f:
+            json.dump({"annotations": counts}, f)
+    with open(marker, encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    fixtures.update({"workdir": workdir, "fasta": fasta, "db": db, "chroms": chroms})
+    if args.genome_index:
+        fixtures["genome_index"] = build_index(fasta, os.path.join(workdir, "genome_index"))
+    if args.genome_store:
+        fixtures["genome_store"] = build_store(fasta, os.path.join(workdir, "genome_store"))
+    return fixtures
+
+
+def build_index(fasta_path: str, prefix: str) -> str:
+    import pysam
+
+    from app.algorithms.genome_index import GenomeKmerIndex, build_genome_index
+
+    if not GenomeKmerIndex.exists(prefix):
+        with pysam.FastaFile(fasta_path) as fasta:
+            build_genome_index(fasta, prefix)
+    return prefix
+
+
+def build_store(fasta_path: str, prefix: str) -> str:
+    import pysam
+
+    from app.algorithms.genome_store import GenomeStore, build_genome_store
+
+    if not GenomeStore.exists(prefix):
+        with pysam.FastaFile(fasta_path) as fasta:
+            build_genome_store(fasta, prefix)
+    return prefix
+
+
+# ---------------------------------------------------------
+# 3. 측정
+# ---------------------------------------------------------
+def design_body(template: str, tm_window: float) -> dict:
+    return {
+        "basic": {
+            "templateSequence": template,
+            "targetOrganism": "synthetic",
+            "productSize": {"min": 100, "max": 300},
+            "primerTm": {"min": 60 - tm_window / 2, "opt": 60, "max": 60 + tm_window / 2},
+        },
+        "properties": {
+            "gcContent": {"min": 40, "max": 60},
+            "maxTmDifference": 3,
+            "gcClamp": True,
+            "maxPolyX": 4,
+            "concentration": 50,
+        },
+        "specificity": {
+            "checkEnabled": True,
+            "spliceVariantHandling": False,
+            "snpExclusion": False,
+            "misprimingLibrary": False,
+        },
+        "position": {
+            "searchRange": {"from": 1, "to": 0},
+            "exonJunctionSpan": "none",
+            "intronInclusion": True,
+            "restrictionEnzymes": [],
+        },
+    }
+
+
+def pick_template(chroms: dict, length: int, seed: int) -> str:
+    """N이 없는 구간에서 대문자 템플릿을 고름"""
+    rng = np.random.default_rng(seed + length)
+    names = list(chroms)
+    while True:
+        seq = chroms[names[int(rng.integers(0, len(names)))]]
+        start = int(rng.integers(0, len(seq) - length))
+        template = seq[start : start + length].upper()
+        if "N" not in template:
+            return template
+
+
+def summarize(samples: list) -> dict:
+    return {"median": round(statistics.median(samples), 3), "min": round(min(samples), 3), "runs": len(samples)}
+
+
+def bench_pipeline(fixtures: dict, body: dict, repeat: int) -> dict:
+    """PrimerDesigner 단계별 시간 (캐시 없이, 요청마다 새 설계기)"""
+    from app.algorithms.PrimerDesigner import PrimerDesigner
+    from app.algorithms.specificity_cache import SpecificityCache
+    from app.schemas.request import PrimerDesignRequest
+    from app.services.design_pipeline import run_design
+
+    request = PrimerDesignRequest.model_validate(body)
+    totals, stages, counts, counters = [], {}, {}, {}
+    for _ in range(repeat):
+        designer = PrimerDesigner(
+            fixtures["fasta"],
+            fixtures["db"],
+            genome_index=fixtures.get("genome_index"),
+            genome_store=fixtures.get("genome_store"),
+            specificity_cache=SpecificityCache(max_entries=0),
+        )
+        try:
+            started = time.perf_counter()
+            result = run_design(designer, request)
+            totals.append((time.perf_counter() - started) * 1000)
+        finally:
+            designer.close()
+        timings = result["timings"]
+        for stage, entry in timings["stages"].items():
+            stages.setdefault(stage, []).append(entry["ms"])
+            counts[stage] = entry["count"]
+        counters = timings["counters"]
+
+    return {
+        "total_ms": summarize(totals),
+        "stages_ms": {stage: summarize(samples) for stage, samples in stages.items()},
+        "counts": counts,
+        "counters": counters,
+    }
+
+
+def bench_endpoint(fixtures: dict, bodies: list, repeat: int) -> list:
+    """/design 전체 (결과/특이성 캐시 비활성화, 앱은 한 번만 기동)"""
+    os.environ.update(
+        {
+            "GENOME_PATH": fixtures["fasta"],
+            "DB_PATH": fixtures["db"],
+            "GENOME_INDEX_PATH": fixtures.get("genome_index") or os.path.join(fixtures["workdir"], "no_index"),
+            "GENOME_STORE_PATH": fixtures.get("genome_store") or os.path.join(fixtures["workdir"], "no_store"),
+            "DESIGN_CACHE_SIZE": "0",
+            "SPECIFICITY_CACHE_SIZE": "0",
+            "DESIGN_JOBS_DB": os.path.join(fixtures["workdir"], "design_jobs.db"),
+        }
+    )
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    results = []
+    with TestClient(app) as client:
+        for body in bodies:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = client.post("/design", json=body)
+                samples.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            results.append({"total_ms": summarize(samples)})
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path: str, report: dict, threshold: float) -> bool:
+    """기준 결과 대비 중앙값 변화율 출력. threshold(%)를 넘는 회귀가 있으면 False"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {case["name"]: case for case in json.load(f)["cases"]}
+
+    ok = True
+    print(f"\n📊 비교 기준: {baseline_path}")
+    for case in report["cases"]:
+        base = baseline.get(case["name"])
+        if base is None:
+            continue
+        rows = [("pipeline", base["pipeline"]["total_ms"], case["pipeline"]["total_ms"])]
+        rows += [
+            (f"  {stage}", base["pipeline"]["stages_ms"][stage], stats)
+            for stage, stats in case["pipeline"]["stages_ms"].items()
+            if stage in base["pipeline"]["stages_ms"]
+        ]
+        if "endpoint" in case and "endpoint" in base:
+            rows.append(("endpoint", base["endpoint"]["total_ms"], case["endpoint"]["total_ms"]))
+        print(f"- {case['name']}")
+        for label, old, new in rows:
+            change = (new["median"] - old["median"]) / old["median"] * 100 if old["median"] else 0.0
+            flag = ""
+            if threshold is not None and change > threshold and not label.startswith(" "):
+                flag, ok = " ⚠️", False
+            print(f"    {label:<14} {old['median']:>10.1f} -> {new['median']:>10.1f} ms ({change:+.1f}%){flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 게놈/어노테이션으로 PrimerDesigner 단계별 및 /design 성능 측정")
+    parser.add_argument("--chroms", type=int, default=4, help="합성 염색체 수")
+    parser.add_argument("--chrom-length", type=int, default=2_000_000, help="염색체 길이 (bp)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--template-lengths", default="300,1000,3000", help="쉼표로 구분한 템플릿 길이")
+    parser.add_argument("--tm-windows", default="2,6", help="쉼표로 구분한 Tm 허용 폭(°C, opt 60 중심) — 후보 수 조절")
+    parser.add_argument("--repeat", type=int, default=3, help="조건별 반복 횟수 (중앙값/최솟값 기록)")
+    parser.add_argument("--skip-endpoint", action="store_true", help="/design 측정 생략")
+    parser.add_argument("--genome-index", action="store_true", help="k-mer 인덱스를 빌드해 사용")
+    parser.add_argument("--genome-store", action="store_true", help="비압축 genome store를 만들어 사용")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="픽스처 저장 위치 (설정이 같으면 재사용)")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: 표준 출력)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=None, help="회귀로 볼 중앙값 증가율(%%), 초과 시 종료 코드 1")
+    args = parser.parse_args()
+
+    fixtures = prepare_fixtures(args)
+    lengths = [int(v) for v in args.template_lengths.split(",") if v]
+    windows = [float(v) for v in args.tm_windows.split(",") if v]
+
+    cases = []
+    for length in lengths:
+        template = pick_template(fixtures["chroms"], length, args.seed)
+        for window in windows:
+            body = design_body(template, window)
+            name = f"len={length},tm_window={window:g}"
+            print(f"⏱️  {name}")
+            cases.append(
+                {
+                    "name": name,
+                    "template_length": length,
+                    "tm_window": window,
+                    "body": body,
+                    "pipeline": bench_pipeline(fixtures, body, args.repeat),
+                }
+            )
+
+    if not args.skip_endpoint:
+        for case, result in zip(cases, bench_endpoint(fixtures, [c["body"] for c in cases], args.repeat)):
+            case["endpoint"] = result
+    for case in cases:
+        del case["body"]
+
+    report = {
+        "version": BENCHMARK_VERSION,
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "platform": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "config": {
+            "chroms": args.chroms,
+            "chrom_length": args.chrom_length,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "genome_index": args.genome_index,
+            "genome_store": args.genome_store,
+            "annotations": fixtures["annotations"],
+        },
+        "cases": cases,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"\n🎉 결과 저장: {args.out}")
+    else:
+        print(text)
+
+    if args.compare and not compare(args.compare, report, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+import time
+
+# ---------------------------------------------------------
+# 1. 경로 및 설정
+# ---------------------------------------------------------
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(BASE_DIR)
+
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, "database", "annotations.db")
+DEFAULT_SNAPSHOT_PREFIX = os.path.join(BASE_DIR, "database", "annotation_snapshot", "annotations")
+
+
+def main():
+    from app.algorithms.annotation_index import build_annotation_snapshot
+
+    parser = argparse.ArgumentParser(description="annotations.db의 열 지향 스냅샷 생성 (기동 시 SQLite 조회 없이 mmap)")
+    parser.add_argument("--db", default=os.getenv("DB_PATH") or DEFAULT_DB_PATH)
+    parser.add_argument("--out", default=os.getenv("ANNOTATION_SNAPSHOT_PATH") or DEFAULT_SNAPSHOT_PREFIX)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ annotations.db 파일이 없습니다: {args.db}")
+        sys.exit(1)
+
+    print(f"🗂️  어노테이션 스냅샷 생성 시작: {args.db}")
+    started = time.perf_counter()
+    meta = build_annotation_snapshot(args.db, args.out, log=print)
+
+    print(f"\n🎉 어노테이션 스냅샷 생성 완료! (트랙 {len(meta['tracks']):,}개, {time.perf_counter() - started:.1f}s)")
+    print(f"   파일 위치: {args.out}.*")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,228 +1,559 @@
+import argparse
 import gzip
+import hashlib
+import json
+import multiprocessing
 import os
+import shutil
 import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 
 # ---------------------------------------------------------
 # 1. 경로 및 설정
 # ---------------------------------------------------------
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(BASE_DIR)
+
+from app.algorithms.annotation_index import (  # noqa: E402
+    build_annotation_snapshot,
+    invalidate_annotation_snapshot,
+)
+from app.algorithms.restriction_sites import (  # noqa: E402
+    DEFAULT_ENZYMES,
+    RestrictionSiteScanner,
+    load_enzyme_library,
+)
 
 DB_PATH = os.path.join(BASE_DIR, "database", "annotations.db")
 RAW_DATA_DIR = os.path.join(BASE_DIR, "database", "raw_data")
+SNAPSHOT_PREFIX = os.path.join(BASE_DIR, "database", "annotation_snapshot", "annotations")
 
-# 제한 효소 목록 (필요시 추가)
-ENZYMES = {
-    'EcoRI': 'GAATTC',
-    'BamHI': 'GGATCC',
-    'HindIII': 'AAGCTT',
-    'NotI': 'GCGGCCGC'
+# 테이블 스키마 / 인덱스 (인덱스는 적재가 끝난 뒤 생성)
+TABLE_SCHEMAS = {
+    'exon': "id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER, transcript_id TEXT",
+    'snp': "id INTEGER PRIMARY KEY, chrom TEXT, pos INTEGER",
+    'repeats': "id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER",
+    'restriction_site': "id INTEGER PRIMARY KEY, chrom TEXT, name TEXT, start INTEGER, end INTEGER",
+}
+# AnnotationIndex의 트랙 로드 쿼리(염색체[, 효소]별 start/end)가 모두 커버링 인덱스만 읽도록 구성
+TABLE_INDEXES = {
+    'exon': ["CREATE INDEX IF NOT EXISTS idx_exon ON exon(chrom, start, end)"],
+    'snp': ["CREATE INDEX IF NOT EXISTS idx_snp ON snp(chrom, pos)"],
+    'repeats': ["CREATE INDEX IF NOT EXISTS idx_repeats ON repeats(chrom, start, end)"],
+    'restriction_site': [
+        "CREATE INDEX IF NOT EXISTS idx_res ON restriction_site(chrom, start)",
+        "CREATE INDEX IF NOT EXISTS idx_res_name ON restriction_site(chrom, name, start, end)",
+    ],
 }
 
-def get_db_connection():
+# 대량 적재용 PRAGMA: 빌드 중인 파일은 완성 후 교체하므로 저널/동기화가 필요 없음
+BULK_PRAGMAS = (
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",  # 256MB (인덱스 생성 시 정렬 버퍼)
+)
+
+CHECKPOINT_VERSION = 2
+
+# 테이블별 원천 파일/체크섬/행 수/빌드 시각 (증분 갱신 판단용)
+MANIFEST_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS build_manifest (
+        table_name TEXT PRIMARY KEY,
+        source TEXT,
+        size INTEGER,
+        mtime_ns INTEGER,
+        checksum TEXT,
+        row_count INTEGER,
+        built_at TEXT,
+        build_seconds REAL,
+        params TEXT
+    )
+"""
+SHADOW_SUFFIX = "__shadow"
+SHADOW_COPY_BATCH = 500000  # 그림자 테이블 복사 시 커밋 단위 (API 읽기가 길게 막히지 않도록)
+
+def get_db_connection(path=None):
     # DB 파일이 위치할 디렉터리가 없으면 생성하여 연결 오류를 방지
-    db_dir = os.path.dirname(DB_PATH)
+    path = path or DB_PATH
+    db_dir = os.path.dirname(path)
     if db_dir:
         os.makedirs(db_dir, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
-
-def init_schema(conn):
-    cursor = conn.cursor()
-    print("⚙️  스키마 재설정 중 (기존 데이터 삭제)...")
-    
-    # 기존 테이블 삭제 후 재생성 (Clean Build)
-    cursor.executescript("""
-        DROP TABLE IF EXISTS snp;
-        DROP TABLE IF EXISTS restriction_site;
-        DROP TABLE IF EXISTS exon;
-        DROP TABLE IF EXISTS repeats;
-
-        CREATE TABLE snp (id INTEGER PRIMARY KEY, chrom TEXT, pos INTEGER);
-        CREATE TABLE restriction_site (id INTEGER PRIMARY KEY, chrom TEXT, name TEXT, start INTEGER, end INTEGER);
-        CREATE TABLE exon (id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER, transcript_id TEXT);
-        CREATE TABLE repeats (id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER);
-        
-        CREATE INDEX idx_snp ON snp(chrom, pos);
-        CREATE INDEX idx_res ON restriction_site(chrom, start);
-        CREATE INDEX idx_exon ON exon(chrom, start, end);
-        CREATE INDEX idx_repeats ON repeats(chrom, start, end);
-    """)
-    print("✅ 스키마 준비 완료")
+    return sqlite3.connect(path)
+
+def apply_bulk_pragmas(conn):
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma)
+
+def create_table(conn, table, name=None):
+    conn.execute(f"CREATE TABLE {name or table} ({TABLE_SCHEMAS[table]})")
+
+def table_columns(table):
+    """id(자동 증가)를 제외한 INSERT 대상 컬럼"""
+    return [col.split()[0] for col in TABLE_SCHEMAS[table].split(", ") if not col.startswith("id ")]
+
+def insert_query(table):
+    columns = table_columns(table)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
 
 # ---------------------------------------------------------
 # 제너레이터(Generator) 기반 파서: 메모리 OOM 방지
+# (파싱 오류는 호출자로 전달 → 해당 소스는 체크포인트를 남기지 않음)
 # ---------------------------------------------------------
-def parse_gff3(filename):
-    path = os.path.join(RAW_DATA_DIR, filename)
-    if not os.path.exists(path):
-        print(f"⚠️ Exon GFF3 파일이 존재하지 않아 파싱을 건너뜁니다: {path}")
-        return
-    print(f"📖 Exon 파싱 시작: {filename}")
-    open_func = gzip.open if filename.endswith('.gz') else open
-    try:
-        with open_func(path, 'rt', encoding='utf-8') as f:
-            for line in f:
-                if line.startswith("#"): continue
-                parts = line.strip().split('\t')
-                if len(parts) < 9 or parts[2] != 'exon': continue
-                chrom, start, end = parts[0], int(parts[3]), int(parts[4])
-                attr = parts[8]
-                tid = "unknown"
-                if "Parent=" in attr:
-                    tid = attr.split("Parent=")[1].split(";")[0].replace("transcript:", "")
-                # 리스트에 담지 않고 바로바로 반환(yield)
-                yield (chrom, start, end, tid)
-    except Exception as e:
-        print(f"❌ Exon 파싱 오류: {e}")
-
-def parse_vcf(filename):
-    path = os.path.join(RAW_DATA_DIR, filename)
-    if not os.path.exists(path):
-        print(f"⚠️ SNP VCF 파일을 찾을 수 없습니다: {path}")
-        return
-    print(f"📖 SNP 파싱 시작: {filename}")
-    open_func = gzip.open if filename.endswith('.gz') else open
-    try:
-        with open_func(path, 'rt', encoding='utf-8') as f:
-            for line in f:
-                if line.startswith("#"): continue
-                parts = line.strip().split('\t')
-                if len(parts) < 2: continue
-                yield (parts[0], int(parts[1]))
-    except Exception as e:
-        print(f"❌ SNP 파싱 오류: {e}")
-
-def parse_repeats_rmsk(filename):
-    path = os.path.join(RAW_DATA_DIR, filename)
-    if not os.path.exists(path):
-        print(f"⚠️  파일 없음: {filename} (Repeats 건너뜀)")
-        return
-    print(f"📖 Repeats 파싱 시작: {filename}")
-    open_func = gzip.open if filename.endswith('.gz') else open
-    try:
-        with open_func(path, 'rt', encoding='utf-8') as f:
-            for line in f:
-                parts = line.strip().split('\t')
-                if len(parts) < 8: continue
-                chrom = parts[5]
-                start = int(parts[6]) + 1
-                end = int(parts[7])
-                yield (chrom, start, end)
-    except Exception as e:
-        print(f"❌ Repeats 파싱 오류: {e}")
-
-# ---------------------------------------------------------
-# Rolling Window 기반 FASTA 스캐너: 대용량 염색체 OOM 방지
-# ---------------------------------------------------------
-def scan_restriction_sites(fasta_filename, chunk_size=1000000):
-    path = os.path.join(RAW_DATA_DIR, fasta_filename)
-    if not os.path.exists(path):
-        print(f"⚠️  파일 없음: {fasta_filename} (제한효소 스캔 건너뜀)")
-        return
+def parse_gff3(path):
+    print(f"📖 Exon 파싱 시작: {os.path.basename(path)}")
+    open_func = gzip.open if path.endswith('.gz') else open
+    with open_func(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith("#"): continue
+            parts = line.strip().split('\t')
+            if len(parts) < 9 or parts[2] != 'exon': continue
+            chrom, start, end = parts[0], int(parts[3]), int(parts[4])
+            attr = parts[8]
+            tid = "unknown"
+            if "Parent=" in attr:
+                tid = attr.split("Parent=")[1].split(";")[0].replace("transcript:", "")
+            # 리스트에 담지 않고 바로바로 반환(yield)
+            yield (chrom, start, end, tid)
 
-    print(f"🕵️ 제한효소 스캔 시작 (FASTA 읽는 중... 시간 소요 예상): {fasta_filename}")
-    open_func = gzip.open if fasta_filename.endswith('.gz') else open
-    
-    # 모티프가 청크 경계에 걸치는 것을 방지하기 위한 오버랩 길이 설정
-    overlap_len = max(len(m) for m in ENZYMES.values()) - 1 if ENZYMES else 0
+def parse_vcf(path):
+    print(f"📖 SNP 파싱 시작: {os.path.basename(path)}")
+    open_func = gzip.open if path.endswith('.gz') else open
+    with open_func(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith("#"): continue
+            parts = line.strip().split('\t')
+            if len(parts) < 2: continue
+            yield (parts[0], int(parts[1]))
 
-    try:
-        with open_func(path, 'rt', encoding='utf-8') as f:
-            buffer = ""
-            global_pos = 0
-            current_chrom = None
-            
-            def process_buffer(buf, g_pos, is_last=False):
-                buf_up = buf.upper()
-                # 마지막 청크가 아니면 오버랩 영역에서 시작하는 모티프는 다음 청크로 넘김 (중복 방지)
-                limit = len(buf) if is_last else len(buf) - overlap_len
-                for name, motif in ENZYMES.items():
-                    pos = buf_up.find(motif)
-                    while pos != -1 and pos < limit:
-                        yield (current_chrom, name, g_pos + pos + 1, g_pos + pos + len(motif))
-                        pos = buf_up.find(motif, pos + 1)
-
-            for line in f:
-                line = line.strip()
-                if not line: continue
-                if line.startswith(">"):
-                    if current_chrom and buffer:
-                        yield from process_buffer(buffer, global_pos, is_last=True)
-                        print(f"   -> {current_chrom} 스캔 완료")
-                    current_chrom = line[1:].split()[0]
-                    buffer = ""
-                    global_pos = 0
-                else:
-                    buffer += line
-                    # 버퍼가 chunk_size 이상 커지면 스캔 후 털어냄 (Rolling Window)
-                    if len(buffer) >= chunk_size:
-                        yield from process_buffer(buffer, global_pos, is_last=False)
-                        advance = len(buffer) - overlap_len
-                        global_pos += advance
-                        buffer = buffer[-overlap_len:]
-            
-            # 마지막 염색체의 남은 버퍼 처리
-            if current_chrom and buffer:
-                yield from process_buffer(buffer, global_pos, is_last=True)
-                print(f"   -> {current_chrom} 스캔 완료")
-
-    except Exception as e:
-        print(f"❌ 제한효소 스캔 오류: {e}")
+def parse_repeats_rmsk(path):
+    print(f"📖 Repeats 파싱 시작: {os.path.basename(path)}")
+    open_func = gzip.open if path.endswith('.gz') else open
+    with open_func(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            parts = line.strip().split('\t')
+            if len(parts) < 8: continue
+            chrom = parts[5]
+            start = int(parts[6]) + 1
+            end = int(parts[7])
+            yield (chrom, start, end)
+
+# ---------------------------------------------------------
+# 블록 단위 FASTA 스캐너: 큰 바이너리 블록을 읽어 줄바꿈을 한 번에 제거하고 모든 효소를 한 패스로 검색
+# ---------------------------------------------------------
+def scan_restriction_sites(path, enzymes=None, block_size=8 * 1024 * 1024):
+    print(f"🕵️ 제한효소 스캔 시작 (FASTA 읽는 중... 시간 소요 예상): {os.path.basename(path)}")
+    open_func = gzip.open if path.endswith('.gz') else open
+    # IUPAC 축퇴 코드/역상보까지 포함한 효소 라이브러리 (기본: DEFAULT_ENZYMES, --enzymes로 교체)
+    scanner = RestrictionSiteScanner(enzymes or DEFAULT_ENZYMES)
+    with open_func(path, 'rb') as f:
+        yield from scanner.scan_fasta(f, block_size, log=print)
+
+# 테이블 → (원천 파일명, 파서, 표시 이름). 오래 걸리는 소스부터 제출
+SOURCES = {
+    'restriction_site': ("GRCh38.primary_assembly.genome.fa.gz", scan_restriction_sites, "Restriction Site"),
+    'repeats': ("rmsk.txt.gz", parse_repeats_rmsk, "Repeats"),
+    'snp': ("clinvar.vcf.gz", parse_vcf, "SNP"),
+    'exon': ("gencode.v49.annotation.gff3.gz", parse_gff3, "Exon"),
+}
 
 # ---------------------------------------------------------
 # Batch Insert Helper: DB 적재 시 메모리/트랜잭션 최적화
 # ---------------------------------------------------------
-def insert_in_batches(cursor, conn, query, generator, batch_size=100000):
+def insert_in_batches(conn, query, generator, batch_size=100000):
+    """batch_size 단위로 executemany (커밋은 호출자가 한 번에)"""
     batch = []
     count = 0
     for record in generator:
         batch.append(record)
         if len(batch) >= batch_size:
-            cursor.executemany(query, batch)
-            conn.commit()
+            conn.executemany(query, batch)
             count += len(batch)
             batch = []
     if batch:
-        cursor.executemany(query, batch)
-        conn.commit()
+        conn.executemany(query, batch)
         count += len(batch)
     return count
 
+# ---------------------------------------------------------
+# 소스별 스테이징 + 체크포인트 (중단 후 재실행 시 끝난 소스는 건너뜀)
+# ---------------------------------------------------------
+def source_signature(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def file_checksum(path, block_size=4 * 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def params_json(params):
+    """파서 옵션(예: 효소 라이브러리)의 정규화 JSON. 기본값(빈 옵션)이면 None"""
+    return json.dumps(params, sort_keys=True) if params else None
+
+def source_checksum(path, params=None):
+    """원천 파일 + 파서 옵션 체크섬 (옵션이 없으면 파일 체크섬과 같음 → 기존 매니페스트 호환)"""
+    checksum = file_checksum(path)
+    if not params:
+        return checksum
+    return hashlib.sha256(f"{checksum}:{params_json(params)}".encode()).hexdigest()
+
+def source_params(enzymes=None):
+    """테이블별 파서 옵션. 기본 효소 라이브러리면 옵션 없음"""
+    if enzymes and enzymes != DEFAULT_ENZYMES:
+        return {'restriction_site': {"enzymes": enzymes}}
+    return {}
+
+def staging_paths(work_dir, table):
+    base = os.path.join(work_dir, table)
+    return base + ".db", base + ".json"
+
+def load_checkpoint(work_dir, table, source_path, params=None):
+    """스테이징이 끝났고 원천 파일/파서 옵션이 그대로면 체크포인트 정보, 아니면 None"""
+    db_path, checkpoint_path = staging_paths(work_dir, table)
+    if not (os.path.exists(db_path) and os.path.exists(checkpoint_path)):
+        return None
+    with open(checkpoint_path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("source") != source_signature(source_path):
+        return None
+    if checkpoint.get("params") != params_json(params):
+        return None
+    return checkpoint
+
+def stage_source(table, raw_dir, work_dir, params=None):
+    """워커 프로세스: 원천 1개를 인덱스 없는 스테이징 DB로 적재하고 체크포인트를 남김"""
+    filename, parser, label = SOURCES[table]
+    source_path = os.path.join(raw_dir, filename)
+    db_path, checkpoint_path = staging_paths(work_dir, table)
+    part_path = db_path + ".part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+    started = time.perf_counter()
+    # 파싱 전에 원천을 식별 (파싱 도중 파일이 바뀌면 다음 실행에서 다시 적재됨)
+    signature, checksum = source_signature(source_path), source_checksum(source_path, params)
+    conn = sqlite3.connect(part_path)
+    try:
+        apply_bulk_pragmas(conn)
+        create_table(conn, table)
+        count = insert_in_batches(conn, insert_query(table), parser(source_path, **(params or {})))
+        conn.commit()
+    finally:
+        conn.close()
+    # 스테이징 DB → 체크포인트 순서로 확정 (체크포인트가 있으면 스테이징은 완전함)
+    os.replace(part_path, db_path)
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "table": table,
+        "source": signature,
+        "checksum": checksum,
+        "params": params_json(params),
+        "rows": count,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    with open(checkpoint_path + ".part", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(checkpoint_path + ".part", checkpoint_path)
+    print(f"   -> ✅ {label} {count:,}개 스테이징 완료 ({checkpoint['seconds']}s)")
+    return checkpoint
+
+def stage_sources(raw_dir, work_dir, workers, tables=None, params=None):
+    """끝나지 않은 소스를 프로세스 풀에서 병렬 적재. 반환: (테이블별 체크포인트, 실패 테이블)"""
+    params = params or {}
+    checkpoints, pending = {}, []
+    for table, (filename, _, label) in SOURCES.items():
+        if tables is not None and table not in tables:
+            continue
+        source_path = os.path.join(raw_dir, filename)
+        if not os.path.exists(source_path):
+            print(f"⚠️  파일 없음: {filename} ({label} 건너뜀)")
+            continue
+        checkpoint = load_checkpoint(work_dir, table, source_path, params.get(table))
+        if checkpoint:
+            print(f"⏭️  {label}: 체크포인트 재사용 ({checkpoint['rows']:,}개)")
+            checkpoints[table] = checkpoint
+        else:
+            pending.append(table)
+
+    failed = []
+    if not pending:
+        return checkpoints, failed
+    print(f"💾 {len(pending)}개 소스 병렬 적재 시작 (workers={min(workers, len(pending))})")
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as pool:
+        futures = {pool.submit(stage_source, table, raw_dir, work_dir, params.get(table)): table for table in pending}
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                checkpoints[table] = future.result()
+            except Exception as e:
+                print(f"❌ {SOURCES[table][2]} 적재 오류: {e}")
+                failed.append(table)
+    return checkpoints, failed
+
+# ---------------------------------------------------------
+# 빌드 매니페스트: 테이블별 원천 체크섬/행 수/빌드 시각
+# ---------------------------------------------------------
+def ensure_manifest(conn):
+    """매니페스트 테이블 생성 (params 컬럼이 없던 이전 빌드는 컬럼 추가)"""
+    conn.execute(MANIFEST_SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(build_manifest)")}
+    if "params" not in columns:
+        conn.execute("ALTER TABLE build_manifest ADD COLUMN params TEXT")
+
+def write_manifest(conn, table, checkpoint):
+    ensure_manifest(conn)
+    conn.execute(
+        "INSERT OR REPLACE INTO build_manifest "
+        "(table_name, source, size, mtime_ns, checksum, row_count, built_at, build_seconds, params) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            table,
+            checkpoint["source"]["path"],
+            checkpoint["source"]["size"],
+            checkpoint["source"]["mtime_ns"],
+            checkpoint["checksum"],
+            checkpoint["rows"],
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            checkpoint["seconds"],
+            checkpoint.get("params"),
+        ),
+    )
+
+def read_manifest(conn):
+    ensure_manifest(conn)
+    rows = conn.execute("SELECT table_name, size, mtime_ns, checksum, params FROM build_manifest").fetchall()
+    return {
+        table: {"size": size, "mtime_ns": mtime_ns, "checksum": checksum, "params": params}
+        for table, size, mtime_ns, checksum, params in rows
+    }
+
+def stale_tables(db_path, raw_dir, params=None):
+    """원천/파서 옵션이 바뀌었거나(체크섬) 매니페스트/테이블이 없는 테이블 목록"""
+    params = params or {}
+    conn = sqlite3.connect(db_path, timeout=60)
+    try:
+        manifest = read_manifest(conn)
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+        stale = []
+        for table, (filename, _, label) in SOURCES.items():
+            source_path = os.path.join(raw_dir, filename)
+            if not os.path.exists(source_path):
+                print(f"⚠️  파일 없음: {filename} ({label} 유지)")
+                continue
+            entry = manifest.get(table)
+            if table not in existing or entry is None or entry["params"] != params_json(params.get(table)):
+                stale.append(table)
+                continue
+            stat = os.stat(source_path)
+            if (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+                continue  # 크기/수정 시각이 같으면 체크섬 계산 생략
+            if source_checksum(source_path, params.get(table)) != entry["checksum"]:
+                stale.append(table)
+            else:
+                # 내용은 같고 수정 시각만 바뀜 → 다음 갱신에서 다시 해시하지 않도록 기록
+                conn.execute(
+                    "UPDATE build_manifest SET size=?, mtime_ns=? WHERE table_name=?",
+                    (stat.st_size, stat.st_mtime_ns, table),
+                )
+        conn.commit()
+    finally:
+        conn.close()
+    return stale
+
+# ---------------------------------------------------------
+# 최종 DB 조립: 새 파일에 스테이징 테이블 복사 → 인덱스 생성 → 원자적 교체
+# ---------------------------------------------------------
+def assemble_db(db_path, work_dir, checkpoints):
+    building_path = db_path + ".building"
+    if os.path.exists(building_path):
+        os.remove(building_path)
+    conn = get_db_connection(building_path)
+    try:
+        apply_bulk_pragmas(conn)
+        for table in TABLE_SCHEMAS:
+            create_table(conn, table)
+            if table not in checkpoints:
+                continue
+            staging_db, _ = staging_paths(work_dir, table)
+            conn.execute("ATTACH DATABASE ? AS staging", (staging_db,))
+            # 스키마가 같고 대상이 비어 있으면 SQLite가 페이지 단위로 복사 (행 단위 재삽입 없음)
+            conn.execute(f"INSERT INTO {table} SELECT * FROM staging.{table}")
+            conn.commit()
+            conn.execute("DETACH DATABASE staging")
+        print("⚙️  인덱스 생성 중...")
+        for table, indexes in TABLE_INDEXES.items():
+            for sql in indexes:
+                conn.execute(sql)
+        for table, checkpoint in checkpoints.items():
+            write_manifest(conn, table, checkpoint)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        conn.close()
+    os.replace(building_path, db_path)
+
+# ---------------------------------------------------------
+# 증분 갱신: 그림자 테이블에 적재 후 한 트랜잭션에서 교체 (실행 중인 API는 이전/새 테이블 중 하나만 봄)
+# ---------------------------------------------------------
+def swap_table(db_path, work_dir, table, checkpoint):
+    shadow = table + SHADOW_SUFFIX
+    staging_db, _ = staging_paths(work_dir, table)
+    conn = sqlite3.connect(db_path, timeout=60)
+    try:
+        # 그림자 테이블은 실패하면 다시 만들므로 채우는 동안만 동기화 생략
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(f"DROP TABLE IF EXISTS {shadow}")
+        create_table(conn, table, shadow)
+        conn.commit()
+
+        # 1) 그림자 테이블 채우기: API는 이 테이블을 읽지 않으며, 배치마다 커밋해 읽기 잠금을 짧게 유지
+        conn.execute("ATTACH DATABASE ? AS staging", (staging_db,))
+        last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM staging.{table}").fetchone()[0]
+        for lo in range(0, last_id, SHADOW_COPY_BATCH):
+            conn.execute(
+                f"INSERT INTO {shadow} SELECT * FROM staging.{table} WHERE id > ? AND id <= ?",
+                (lo, lo + SHADOW_COPY_BATCH),
+            )
+            conn.commit()
+        conn.execute("DETACH DATABASE staging")
+
+        # 2) 교체: 기존 테이블 삭제 → 이름 변경 → 인덱스(원래 이름) → 매니페스트를 한 트랜잭션으로.
+        #    캐시를 디스크로 흘리지 않아 커밋 직전까지 다른 연결은 이전 테이블을 그대로 읽음.
+        #    API가 읽는 테이블을 바꾸는 커밋이므로 기본 동기화 수준(FULL)으로 되돌려 실행
+        conn.execute("PRAGMA synchronous = FULL")
+        conn.execute("PRAGMA cache_spill = OFF")
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+        for sql in TABLE_INDEXES[table]:
+            conn.execute(sql)
+        write_manifest(conn, table, checkpoint)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def ensure_indexes(db_path):
+    """이전 버전 빌드에 없던 인덱스를 추가 (커밋 전까지 다른 연결은 그대로 읽음)"""
+    conn = sqlite3.connect(db_path, timeout=60)
+    try:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+        missing = [
+            sql
+            for table, indexes in TABLE_INDEXES.items()
+            if table in existing
+            for sql in indexes
+            if sql.split()[5] not in existing  # CREATE INDEX IF NOT EXISTS <name> ...
+        ]
+        if not missing:
+            return
+        print(f"⚙️  누락된 인덱스 {len(missing)}개 생성 중...")
+        conn.execute("PRAGMA cache_spill = OFF")
+        conn.execute("BEGIN IMMEDIATE")
+        for sql in missing:
+            conn.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+def refresh_db(db_path, raw_dir, work_dir, workers, snapshot=None, params=None):
+    """원천이 바뀐 테이블만 다시 적재. 실패하면 False"""
+    ensure_indexes(db_path)
+    stale = stale_tables(db_path, raw_dir, params)
+    if not stale:
+        print("✅ 모든 테이블이 최신입니다. (갱신할 원천 없음)")
+        return True
+    print(f"🔄 갱신 대상: {', '.join(stale)}")
+    checkpoints, failed = stage_sources(raw_dir, work_dir, workers, tables=stale, params=params)
+    if failed:
+        print(f"\n❌ 적재 실패: {', '.join(failed)} — 해당 테이블은 교체하지 않았습니다.")
+        return False
+    if snapshot:
+        # 교체 도중 새로 뜨는 프로세스가 이전 스냅샷을 쓰지 않도록 먼저 무효화 (SQLite로 조회)
+        invalidate_annotation_snapshot(snapshot)
+    for table in stale:
+        if table in checkpoints:
+            print(f"🔁 {SOURCES[table][2]} 테이블 교체 중...")
+            swap_table(db_path, work_dir, table, checkpoints[table])
+    return True
+
+def write_snapshot(db_path, snapshot):
+    """local_db_filter용 염색체별 정렬 좌표 배열 (API가 기동 시 mmap)"""
+    print(f"🗂️  어노테이션 스냅샷 생성 중: {snapshot}.*")
+    build_annotation_snapshot(db_path, snapshot, log=print)
+
 def main():
-    conn = get_db_connection()
-    init_schema(conn)
-    cursor = conn.cursor()
-
-    # 1. Exon
-    exons_gen = parse_gff3("gencode.v49.annotation.gff3.gz") 
-    if exons_gen:
-        print("💾 Exon 데이터 스트리밍 저장 시작...")
-        count = insert_in_batches(cursor, conn, "INSERT INTO exon (chrom, start, end, transcript_id) VALUES (?, ?, ?, ?)", exons_gen)
-        print(f"   -> ✅ Exon {count:,}개 저장 완료")
-
-    # 2. SNP
-    snps_gen = parse_vcf("clinvar.vcf.gz")
-    if snps_gen:
-        print("💾 SNP 데이터 스트리밍 저장 시작...")
-        count = insert_in_batches(cursor, conn, "INSERT INTO snp (chrom, pos) VALUES (?, ?)", snps_gen)
-        print(f"   -> ✅ SNP {count:,}개 저장 완료")
-
-    # 3. Repeats
-    repeats_gen = parse_repeats_rmsk("rmsk.txt.gz")
-    if repeats_gen:
-        print("💾 Repeats 데이터 스트리밍 저장 시작...")
-        count = insert_in_batches(cursor, conn, "INSERT INTO repeats (chrom, start, end) VALUES (?, ?, ?)", repeats_gen)
-        print(f"   -> ✅ Repeats {count:,}개 저장 완료")
-
-    # 4. Restriction Sites
-    res_sites_gen = scan_restriction_sites("GRCh38.primary_assembly.genome.fa.gz")
-    if res_sites_gen:
-        print("💾 Restriction Site 데이터 스트리밍 저장 시작...")
-        count = insert_in_batches(cursor, conn, "INSERT INTO restriction_site (chrom, name, start, end) VALUES (?, ?, ?, ?)", res_sites_gen)
-        print(f"   -> ✅ Restriction Site {count:,}개 저장 완료")
-
-    conn.close()
-    print(f"\n🎉 최종 DB 구축 완료! 파일 위치: {DB_PATH}")
+    parser = argparse.ArgumentParser(description="원천 데이터(GFF3/VCF/rmsk/FASTA)로 annotations.db 구축")
+    parser.add_argument("--db", default=DB_PATH, help="생성할 DB 경로")
+    parser.add_argument("--raw-dir", default=RAW_DATA_DIR, help="원천 데이터 디렉터리")
+    parser.add_argument("--work-dir", default=None, help="소스별 스테이징/체크포인트 위치 (기본: <db>.work)")
+    parser.add_argument("--workers", type=int, default=min(len(SOURCES), os.cpu_count() or 1), help="병렬 적재 프로세스 수")
+    parser.add_argument("--fresh", action="store_true", help="체크포인트를 버리고 모든 소스를 다시 적재")
+    parser.add_argument("--refresh", action="store_true", help="기존 DB에서 원천이 바뀐 테이블만 다시 적재 (그림자 테이블 교체)")
+    parser.add_argument("--keep-work", action="store_true", help="완료 후 스테이징 파일 보존")
+    parser.add_argument(
+        "--snapshot",
+        default=os.getenv("ANNOTATION_SNAPSHOT_PATH") or SNAPSHOT_PREFIX,
+        help="함께 만들 열 지향 어노테이션 스냅샷 prefix",
+    )
+    parser.add_argument("--no-snapshot", action="store_true", help="어노테이션 스냅샷을 만들지 않음")
+    parser.add_argument(
+        "--enzymes",
+        default=None,
+        help="제한효소 라이브러리 파일 (`이름 인식서열` 줄 단위, IUPAC 축퇴 코드 허용. 기본: EcoRI/BamHI/HindIII/NotI)",
+    )
+    args = parser.parse_args()
+    snapshot = None if args.no_snapshot else args.snapshot
+    try:
+        params = source_params(load_enzyme_library(args.enzymes) if args.enzymes else None)
+    except (OSError, ValueError) as e:
+        print(f"❌ 효소 라이브러리 오류: {e}")
+        sys.exit(1)
+
+    work_dir = args.work_dir or args.db + ".work"
+    if args.fresh and os.path.isdir(work_dir):
+        shutil.rmtree(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    if args.refresh and os.path.exists(args.db):
+        if not refresh_db(args.db, args.raw_dir, work_dir, max(1, args.workers), snapshot, params):
+            sys.exit(1)
+        if snapshot:
+            write_snapshot(args.db, snapshot)
+        if not args.keep_work:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"\n🎉 DB 갱신 완료! ({time.perf_counter() - started:.1f}s) 파일 위치: {args.db}")
+        return
+
+    checkpoints, failed = stage_sources(args.raw_dir, work_dir, max(1, args.workers), params=params)
+    if failed:
+        print(f"\n❌ 적재 실패: {', '.join(failed)} — 기존 DB는 그대로 두었습니다. 다시 실행하면 끝난 소스는 건너뜁니다.")
+        sys.exit(1)
+
+    print("🔧 최종 DB 조립 중...")
+    if snapshot:
+        invalidate_annotation_snapshot(snapshot)
+    assemble_db(args.db, work_dir, checkpoints)
+    if snapshot:
+        write_snapshot(args.db, snapshot)
+    if not args.keep_work:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    rows = sum(c["rows"] for c in checkpoints.values())
+    print(f"\n🎉 최종 DB 구축 완료! ({rows:,}행, {time.perf_counter() - started:.1f}s) 파일 위치: {args.db}")
 
 if __name__ == "__main__":
     main()
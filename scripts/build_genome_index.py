@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+
+# ---------------------------------------------------------
+# 1. 경로 및 설정
+# ---------------------------------------------------------
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(BASE_DIR)
+
+DEFAULT_GENOME_PATH = os.path.join(BASE_DIR, "database", "raw_data", "GRCh38.primary_assembly.genome.fa.gz")
+DEFAULT_INDEX_PREFIX = os.path.join(BASE_DIR, "database", "genome_index", "GRCh38")
+
+
+def main():
+    from app.algorithms.genome_index import DEFAULT_K, DEFAULT_STEP, build_genome_index
+
+    parser = argparse.ArgumentParser(description="게놈 k-mer 시드 인덱스 빌드 (템플릿 위치/오프타겟 조회용)")
+    parser.add_argument("--genome", default=os.getenv("GENOME_PATH") or DEFAULT_GENOME_PATH)
+    parser.add_argument("--out", default=os.getenv("GENOME_INDEX_PATH") or DEFAULT_INDEX_PREFIX)
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="시드 k-mer 길이 (최대 32)")
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP, help="시드 샘플링 간격")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.genome):
+        print(f"❌ genome FASTA 파일이 없습니다: {args.genome}")
+        sys.exit(1)
+
+    import pysam
+
+    print(f"🧬 genome index 빌드 시작 (k={args.k}, step={args.step}): {args.genome}")
+    started = time.perf_counter()
+    with pysam.FastaFile(args.genome) as fasta:
+        meta = build_genome_index(fasta, args.out, k=args.k, step=args.step, log=print)
+
+    seeds = sum(c["count"] for c in meta["chroms"])
+    print(f"\n🎉 genome index 빌드 완료! ({seeds:,} seeds, {time.perf_counter() - started:.1f}s)")
+    print(f"   파일 위치: {args.out}.*")
+    print(f"   최소 조회 길이(정확 일치 보장): {args.k + args.step - 1} bp")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+import time
+
+# ---------------------------------------------------------
+# 1. 경로 및 설정
+# ---------------------------------------------------------
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(BASE_DIR)
+
+DEFAULT_GENOME_PATH = os.path.join(BASE_DIR, "database", "raw_data", "GRCh38.primary_assembly.genome.fa.gz")
+DEFAULT_STORE_PREFIX = os.path.join(BASE_DIR, "database", "genome_store", "GRCh38")
+
+
+def main():
+    from app.algorithms.genome_store import build_genome_store
+
+    parser = argparse.ArgumentParser(description="비압축 게놈 저장소 생성 (bgzip 압축 해제 없이 mmap으로 조회)")
+    parser.add_argument("--genome", default=os.getenv("GENOME_PATH") or DEFAULT_GENOME_PATH)
+    parser.add_argument("--out", default=os.getenv("GENOME_STORE_PATH") or DEFAULT_STORE_PREFIX)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.genome):
+        print(f"❌ genome FASTA 파일이 없습니다: {args.genome}")
+        sys.exit(1)
+
+    import pysam
+
+    print(f"🧬 genome store 생성 시작: {args.genome}")
+    started = time.perf_counter()
+    with pysam.FastaFile(args.genome) as fasta:
+        meta = build_genome_store(fasta, args.out, log=print)
+
+    total = sum(c["length"] for c in meta["chroms"])
+    print(f"\n🎉 genome store 생성 완료! ({total:,} bp, {time.perf_counter() - started:.1f}s)")
+    print(f"   파일 위치: {args.out}.*")
+
+
+if __name__ == "__main__":
+    main()
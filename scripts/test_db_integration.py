@@ -1,4 +1,5 @@
 import os
+import sqlite3
 import sys
 
 # ---------------------------------------------------------
@@ -71,8 +72,9 @@ def main():
     print("\n🧪 [Test Case] 제한효소(EcoRI) 필터링 테스트")
     
     # DB에서 EcoRI 위치 하나를 조회해봅니다.
-    pd.cur.execute("SELECT chrom, start, end FROM restriction_site WHERE name='EcoRI' LIMIT 1")
-    row = pd.cur.fetchone()
+    conn = sqlite3.connect(DB_PATH)
+    row = conn.execute("SELECT chrom, start, end FROM restriction_site WHERE name='EcoRI' LIMIT 1").fetchone()
+    conn.close()
     
     if row:
         chrom, r_start, r_end = row
@@ -103,8 +105,7 @@ def main():
         print("⚠️ SKIP: DB에 EcoRI 데이터가 없습니다. (구축 스크립트를 다시 확인해주세요)")
 
     # 종료
-    pd.cur.close()
-    pd.db.close()
+    pd.close()
     print("\n🎉 모든 테스트 종료")
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import random
+import sqlite3
+
+import pysam
+import pytest
+
+SCHEMA = """
+    CREATE TABLE snp (id INTEGER PRIMARY KEY, chrom TEXT, pos INTEGER);
+    CREATE TABLE restriction_site (id INTEGER PRIMARY KEY, chrom TEXT, name TEXT, start INTEGER, end INTEGER);
+    CREATE TABLE exon (id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER, transcript_id TEXT);
+    CREATE TABLE repeats (id INTEGER PRIMARY KEY, chrom TEXT, start INTEGER, end INTEGER);
+"""
+
+
+def random_seq(length: int, rng: random.Random) -> str:
+    return "".join(rng.choice("ACGT") for _ in range(length))
+
+
+def design_body(template: str, check_specificity: bool = True) -> dict:
+    return {
+        "basic": {
+            "templateSequence": template,
+            "targetOrganism": "Homo sapiens",
+            "productSize": {"min": 100, "max": 300},
+            "primerTm": {"min": 57, "opt": 60, "max": 63},
+        },
+        "properties": {
+            "gcContent": {"min": 40, "max": 60},
+            "maxTmDifference": 3,
+            "gcClamp": True,
+            "maxPolyX": 4,
+            "concentration": 50,
+        },
+        "specificity": {
+            "checkEnabled": check_specificity,
+            "spliceVariantHandling": False,
+            "snpExclusion": False,
+            "misprimingLibrary": False,
+        },
+        "position": {
+            "searchRange": {"from": 1, "to": 0},
+            "exonJunctionSpan": "none",
+            "intronInclusion": True,
+            "restrictionEnzymes": [],
+        },
+    }
+
+
+@pytest.fixture
+def genome_factory(tmp_path):
+    """{chrom: seq} 딕셔너리로 faidx 인덱스가 포함된 FASTA를 만든다."""
+
+    def _make(chroms: dict, name: str = "genome.fa") -> str:
+        path = tmp_path / name
+        with open(path, "w") as f:
+            for chrom, seq in chroms.items():
+                f.write(f">{chrom}\n")
+                for i in range(0, len(seq), 60):
+                    f.write(seq[i : i + 60] + "\n")
+        pysam.faidx(str(path))
+        return str(path)
+
+    return _make
+
+
+@pytest.fixture
+def annotation_db(tmp_path):
+    """빈 annotations.db 스키마를 만들고 경로를 반환한다."""
+    path = tmp_path / "annotations.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+    return str(path)
+
+
+@pytest.fixture
+def design_env(monkeypatch, tmp_path, genome_factory, annotation_db):
+    """설계 API용 환경 변수(GENOME_PATH/DB_PATH)를 설정하고 chr1[2000:2600] 템플릿을 반환한다."""
+    rng = random.Random(21)
+    chrom = random_seq(8000, rng)
+    genome_path = genome_factory({"chr1": chrom, "chr2": random_seq(3000, rng)})
+    monkeypatch.setenv("GENOME_PATH", genome_path)
+    monkeypatch.setenv("DB_PATH", annotation_db)
+    monkeypatch.setenv("GENOME_INDEX_PATH", str(tmp_path / "missing_index"))
+    return chrom[2000:2600]
@@ -0,0 +1,201 @@
+import random
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+from app.algorithms.annotation_index import AnnotationIndex, build_annotation_snapshot
+from app.algorithms.PrimerDesigner import PrimerDesigner
+from tests.conftest import random_seq
+
+
+def _fill(db_path: str, rng: random.Random) -> None:
+    conn = sqlite3.connect(db_path)
+    for chrom in ("chr1", "chr2"):
+        conn.executemany(
+            "INSERT INTO snp (chrom, pos) VALUES (?, ?)",
+            [(chrom, rng.randint(1, 20000)) for _ in range(300)],
+        )
+        for table in ("exon", "repeats"):
+            rows = []
+            for _ in range(120):
+                start = rng.randint(1, 20000)
+                rows.append((chrom, start, start + rng.randint(0, 400)))
+            conn.executemany(f"INSERT INTO {table} (chrom, start, end) VALUES (?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT INTO restriction_site (chrom, name, start, end) VALUES (?, ?, ?, ?)",
+            [(chrom, rng.choice(["EcoRI", "BamHI"]), s, s + 5) for s in rng.sample(range(1, 20000), 80)],
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_queries_match_sql(annotation_db) -> None:
+    rng = random.Random(7)
+    _fill(annotation_db, rng)
+    index = AnnotationIndex(annotation_db)
+    cur = sqlite3.connect(annotation_db).cursor()
+
+    for _ in range(400):
+        chrom = rng.choice(["chr1", "chr2", "chrX"])
+        lo = rng.randint(1, 20500)
+        hi = lo + rng.randint(0, 30)
+
+        cur.execute("SELECT COUNT(*) FROM snp WHERE chrom=? AND pos BETWEEN ? AND ?", (chrom, lo, hi))
+        assert index.snps(chrom).count(lo, hi) == cur.fetchone()[0]
+
+        cur.execute("SELECT COUNT(*) FROM repeats WHERE chrom=? AND NOT (end < ? OR start > ?)", (chrom, lo, hi))
+        assert index.repeats(chrom).overlaps(lo, hi) == (cur.fetchone()[0] > 0)
+
+        cur.execute(
+            "SELECT COUNT(*) FROM restriction_site WHERE chrom=? AND name IN (?) AND NOT (end < ? OR start > ?)",
+            (chrom, "EcoRI", lo, hi),
+        )
+        assert index.has_restriction_site(chrom, ["EcoRI"], lo, hi) == (cur.fetchone()[0] > 0)
+
+        cur.execute("SELECT transcript_id FROM exon WHERE chrom=? AND start <= ? AND end >= ?", (chrom, lo, hi))
+        assert index.exons(chrom).contains(lo, hi) == (cur.fetchone() is not None)
+
+        cur.execute("SELECT start, end FROM exon WHERE chrom=? ORDER BY start, end", (chrom,))
+        exons = cur.fetchall()
+        sizes = [
+            exons[i + 1][0] - exons[i][1]
+            for i in range(len(exons) - 1)
+            if lo > exons[i][1] and hi < exons[i + 1][0]
+        ]
+        spanning = any(lo < e[1] and hi > exons[i + 1][0] for i, e in enumerate(exons[:-1]))
+        assert index.exons(chrom).intron_size(lo, hi) == (sizes[0] if sizes else None)
+        assert index.exons(chrom).spans_junction(lo, hi) == spanning
+
+
+def _reference_filter(cur, chrom, p, junction_mode, enzymes, intron_inclusion, size_range) -> bool:
+    """기존 후보별 SQL 구현"""
+    g_start, g_end = p["genomic_start"], p["genomic_end"]
+    s_pos, e_pos = (g_end - 4, g_end) if p["genomic_strand"] == "+" else (g_start, g_start + 4)
+    cur.execute("SELECT COUNT(*) FROM snp WHERE chrom=? AND pos BETWEEN ? AND ?", (chrom, s_pos, e_pos))
+    if cur.fetchone()[0] > 0:
+        return False
+    if enzymes:
+        placeholders = ",".join(["?"] * len(enzymes))
+        cur.execute(
+            f"SELECT COUNT(*) FROM restriction_site WHERE chrom=? AND name IN ({placeholders}) "
+            "AND NOT (end < ? OR start > ?)",
+            (chrom, *enzymes, g_start, g_end),
+        )
+        if cur.fetchone()[0] > 0:
+            return False
+    cur.execute("SELECT start, end FROM exon WHERE chrom=? ORDER BY start, end", (chrom,))
+    exons = cur.fetchall()
+    introns = [
+        exons[i + 1][0] - exons[i][1]
+        for i in range(len(exons) - 1)
+        if g_start > exons[i][1] and g_end < exons[i + 1][0]
+    ]
+    if introns and not intron_inclusion:
+        return False
+    if introns and size_range and not all(size_range[0] <= size <= size_range[1] for size in introns):
+        return False
+    if junction_mode == "spanning":
+        return any(g_start < e[1] and g_end > exons[i + 1][0] for i, e in enumerate(exons[:-1]))
+    return True
+
+
+def test_local_db_filter_many_matches_reference(annotation_db, genome_factory) -> None:
+    rng = random.Random(9)
+    _fill(annotation_db, rng)
+    designer = PrimerDesigner(genome_factory({"chr1": random_seq(100, rng)}), annotation_db)
+    cur = sqlite3.connect(annotation_db).cursor()
+    primers = []
+    for _ in range(500):
+        start = rng.randint(1, 20000)
+        primers.append(
+            {"genomic_start": start, "genomic_end": start + rng.randint(17, 24), "genomic_strand": rng.choice("+-")}
+        )
+
+    for options in [
+        ("none", [], True, None),
+        ("spanning", ["EcoRI"], True, None),
+        ("none", ["EcoRI", "BamHI"], False, None),
+        ("flanking", [], True, (100, 2000)),
+    ]:
+        mask = designer.local_db_filter_many("chr1", primers, *options)
+        expected = [_reference_filter(cur, "chr1", p, *options) for p in primers]
+        assert mask.tolist() == expected
+        assert designer.local_db_filter("chr1", primers[0], *options) == expected[0]
+    designer.close()
+
+
+def test_snapshot_tracks_match_sqlite(tmp_path, annotation_db, genome_factory) -> None:
+    rng = random.Random(11)
+    _fill(annotation_db, rng)
+    prefix = str(tmp_path / "snapshot" / "annotations")
+    build_annotation_snapshot(annotation_db, prefix)
+
+    sqlite_index = AnnotationIndex(annotation_db)
+    snapshot_index = AnnotationIndex(annotation_db, snapshot=prefix)
+    for chrom in ("chr1", "chr2", "chrX"):
+        pairs = [
+            (sqlite_index.snps(chrom).positions, snapshot_index.snps(chrom).positions),
+            *[
+                (getattr(a, attr), getattr(b, attr))
+                for a, b in [
+                    (sqlite_index.exons(chrom), snapshot_index.exons(chrom)),
+                    (sqlite_index.repeats(chrom), snapshot_index.repeats(chrom)),
+                    (sqlite_index.restriction_sites(chrom, "EcoRI"), snapshot_index.restriction_sites(chrom, "EcoRI")),
+                    (sqlite_index.restriction_sites(chrom, "NotI"), snapshot_index.restriction_sites(chrom, "NotI")),
+                ]
+                for attr in ("starts", "ends", "max_end")
+            ],
+        ]
+        for expected, actual in pairs:
+            assert np.array_equal(expected, actual)
+    assert snapshot_index.queries == 0
+    assert not snapshot_index.exons("chr1").starts.flags.writeable  # mmap 뷰 (복사 없음)
+
+    designer = PrimerDesigner(genome_factory({"chr1": random_seq(100, rng)}), annotation_db, annotation_snapshot=prefix)
+    primers = [{"genomic_start": s, "genomic_end": s + 20, "genomic_strand": "+"} for s in range(1, 20000, 37)]
+    expected = PrimerDesigner(genome_factory({"chr1": random_seq(100, rng)}, "other.fa"), annotation_db)
+    options = ("spanning", ["EcoRI", "BamHI"], False, None)
+    assert designer.local_db_filter_many("chr1", primers, *options).tolist() == (
+        expected.local_db_filter_many("chr1", primers, *options).tolist()
+    )
+    designer.close()
+    expected.close()
+
+    # 스냅샷을 만든 뒤 DB가 바뀌면 사용하지 않고 오류
+    with sqlite3.connect(annotation_db) as conn:
+        conn.execute("INSERT INTO snp (chrom, pos) VALUES ('chr1', 5)")
+    with pytest.raises(ValueError):
+        AnnotationIndex(annotation_db, snapshot=prefix).snps("chr1")
+
+
+def test_db_fingerprint_reconnects_only_when_db_changes(monkeypatch, annotation_db) -> None:
+    with sqlite3.connect(annotation_db) as conn:
+        conn.execute("CREATE TABLE build_manifest (table_name TEXT PRIMARY KEY, checksum TEXT, row_count INTEGER)")
+        conn.execute("INSERT INTO build_manifest VALUES ('snp', 'a', 1)")
+    index = AnnotationIndex(annotation_db)
+    connect = index._connect
+    connections = []
+
+    def counting_connect():
+        connections.append(1)
+        return connect()
+
+    monkeypatch.setattr(index, "_connect", counting_connect)
+    first = index.db_fingerprint()
+    # 파일이 그대로면 요청마다 SQLite를 열지 않음
+    assert all(index.db_fingerprint() == first for _ in range(20))
+    assert len(connections) == 1
+
+    time.sleep(0.02)  # 수정 시각 해상도가 거친 파일 시스템에서도 커밋 후 시각이 달라지도록
+    with sqlite3.connect(annotation_db) as conn:
+        conn.execute("UPDATE build_manifest SET checksum = 'b', row_count = 22")
+    changed = index.db_fingerprint()
+    assert changed != first and changed["manifest"] == [["snp", "b", 22]]
+    assert len(connections) == 2
+
+    # 파일 상태가 같아도 FINGERPRINT_TTL이 지나면 다시 확인
+    monkeypatch.setattr(AnnotationIndex, "FINGERPRINT_TTL", 0.0)
+    assert index.db_fingerprint() == changed
+    assert len(connections) == 3
@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import sys
+
+import pytest
+
+from app.algorithms.annotation_index import AnnotationIndex
+from app.schemas.request import PrimerDesignRequest
+from app.services.result_cache import DesignResultCache
+from scripts import build_db
+from tests.conftest import design_body
+
+SOURCES = {
+    "gencode.v49.annotation.gff3.gz": "##gff-version 3\nchr1\t.\texon\t100\t200\t.\t+\t.\tParent=transcript:T1\n",
+    "clinvar.vcf.gz": "##fileformat=VCFv4.2\nchr1\t150\t1\tA\tG\n",
+    "rmsk.txt.gz": "0\t0\t0\t0\t0\tchr1\t299\t350\n",
+    "GRCh38.primary_assembly.genome.fa.gz": ">chr1\nACGTGAATTCACGT\nGGATCCACGT\n",
+}
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """build_db.SOURCES 파일명으로 만든 아주 작은 원천 데이터"""
+    path = tmp_path / "raw"
+    path.mkdir()
+    for filename, text in SOURCES.items():
+        _write(path / filename, text)
+    return path
+
+
+def _write(path, text: str) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _build(monkeypatch, db, raw_dir, *extra, snapshot=None) -> None:
+    argv = ["build_db.py", "--db", str(db), "--raw-dir", str(raw_dir), "--workers", "2", "--keep-work"]
+    argv += ["--snapshot", str(snapshot)] if snapshot else ["--no-snapshot"]
+    monkeypatch.setattr(sys, "argv", argv + list(extra))
+    build_db.main()
+
+
+def _rows(db) -> dict:
+    with sqlite3.connect(db) as conn:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall() for table in build_db.SOURCES}
+
+
+def _staged(work_dir) -> dict:
+    """테이블별 (스테이징 DB 수정 시각, 체크포인트 내용)"""
+    staged = {}
+    for table in build_db.SOURCES:
+        db_path, checkpoint_path = build_db.staging_paths(str(work_dir), table)
+        with open(checkpoint_path, encoding="utf-8") as f:
+            staged[table] = (os.stat(db_path).st_mtime_ns, f.read())
+    return staged
+
+
+def test_failed_source_keeps_db_and_resumes(monkeypatch, tmp_path, raw_dir) -> None:
+    db = tmp_path / "annotations.db"
+    _build(monkeypatch, db, raw_dir)
+    assert _rows(db)["snp"] == [(1, "chr1", 150)]
+    digest = hashlib.sha256(db.read_bytes()).hexdigest()
+
+    # repeats는 정상 변경, snp는 파싱 실패 → 기존 DB는 그대로
+    _write(raw_dir / "rmsk.txt.gz", "0\t0\t0\t0\t0\tchr1\t399\t450\n")
+    _write(raw_dir / "clinvar.vcf.gz", "chr1\tnot-a-position\n")
+    with pytest.raises(SystemExit):
+        _build(monkeypatch, db, raw_dir)
+    assert hashlib.sha256(db.read_bytes()).hexdigest() == digest
+    staged = _staged(str(db) + ".work")
+
+    # 다시 실행하면 실패한 snp만 적재하고 나머지는 체크포인트 재사용
+    _write(raw_dir / "clinvar.vcf.gz", "chr1\t150\t1\tA\tG\nchr2\t7\t2\tC\tT\n")
+    _build(monkeypatch, db, raw_dir)
+    restaged = _staged(str(db) + ".work")
+    assert [table for table in build_db.SOURCES if restaged[table] != staged[table]] == ["snp"]
+
+    rows = _rows(db)
+    assert rows["snp"] == [(1, "chr1", 150), (2, "chr2", 7)]
+    assert rows["repeats"] == [(1, "chr1", 400, 450)]
+    assert rows["restriction_site"] == [(1, "chr1", "EcoRI", 5, 10), (2, "chr1", "BamHI", 15, 20)]
+
+
+def test_refresh_reloads_only_changed_source(monkeypatch, tmp_path, raw_dir, capsys) -> None:
+    db, snapshot = tmp_path / "annotations.db", tmp_path / "snapshot" / "annotations"
+    _build(monkeypatch, db, raw_dir, snapshot=snapshot)
+    with sqlite3.connect(db) as conn:
+        manifest = {row[0]: row for row in conn.execute("SELECT * FROM build_manifest")}
+
+    # 실행 중인 API처럼 트랙을 읽어 둔 인덱스와 결과 캐시
+    index = AnnotationIndex(str(db), snapshot=str(snapshot))
+    assert index.open_snapshot() is not None
+    assert index.snps("chr1").count(1, 1000) == 1
+    cache = DesignResultCache(data_identity=index.db_fingerprint)
+    request = PrimerDesignRequest.model_validate(design_body("ACGT" * 50))
+    key = cache.key(request)
+
+    _write(raw_dir / "clinvar.vcf.gz", "chr1\t150\t1\tA\tG\nchr1\t300\t2\tC\tT\n")
+    capsys.readouterr()
+    _build(monkeypatch, db, raw_dir, "--refresh", snapshot=snapshot)
+    assert "갱신 대상: snp\n" in capsys.readouterr().out
+    with sqlite3.connect(db) as conn:
+        refreshed = {row[0]: row for row in conn.execute("SELECT * FROM build_manifest")}
+    assert [table for table in manifest if refreshed[table] != manifest[table]] == ["snp"]
+
+    # 바뀐 지문으로 이전 트랙/스냅샷을 버리고 새 내용을 읽으며, 캐시 키도 바뀜
+    assert cache.key(request) != key
+    assert index.snps("chr1").count(1, 1000) == 2
+    assert index.open_snapshot() is not None
+
+    # 갱신한 DB == 같은 원천으로 새로 빌드한 DB
+    fresh = tmp_path / "fresh" / "annotations.db"
+    fresh.parent.mkdir()
+    _build(monkeypatch, fresh, raw_dir)
+    assert _rows(db) == _rows(fresh)
+
+
+def test_swap_commits_at_full_synchronous(monkeypatch, tmp_path, raw_dir) -> None:
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    db = tmp_path / "annotations.db"
+    _build(monkeypatch, db, raw_dir)
+    _write(raw_dir / "rmsk.txt.gz", "0\t0\t0\t0\t0\tchr1\t399\t450\n")
+    monkeypatch.setattr(build_db.sqlite3, "connect", traced_connect)
+    _build(monkeypatch, db, raw_dir, "--refresh")
+
+    # 그림자 테이블 채우기만 동기화를 생략하고, 테이블 교체 트랜잭션은 FULL로 커밋
+    swap = statements.index("BEGIN IMMEDIATE")
+    assert "PRAGMA synchronous = OFF" in statements[:swap]
+    assert [sql for sql in statements[:swap] if sql.startswith("PRAGMA synchronous")][-1] == "PRAGMA synchronous = FULL"
+    assert _rows(db)["repeats"] == [(1, "chr1", 400, 450)]
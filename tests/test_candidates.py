@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from app.algorithms.PrimerDesigner import (
+    NN_PARAMS,
+    calc_tm_nn,
+    generate_candidates_batched,
+    reverse_complement,
+)
+from tests.conftest import random_seq
+
+
+def _generate_candidates_reference(
+    template, k_min=18, k_max=25, tm_range=(57, 63), gc_range=(0.4, 0.6), max_poly_x=4, gc_clamp=True
+):
+    """윈도우별 스칼라 계산 (배치 엔진 도입 이전 구현)"""
+    candidates = []
+    for k in range(k_min, k_max + 1):
+        for i in range(len(template) - k + 1):
+            seq = template[i : i + k]
+            for strand, s in [("+", seq), ("-", reverse_complement(seq))]:
+                tm = calc_tm_nn(s)
+                if not (tm_range[0] <= tm <= tm_range[1]):
+                    continue
+                if any(base * max_poly_x in s for base in "ATCG"):
+                    continue
+                gc_content = (s.count("G") + s.count("C")) / len(s)
+                if not (gc_range[0] <= gc_content <= gc_range[1]):
+                    continue
+                dh3 = sum(NN_PARAMS.get(s[-5:][j : j + 2], (0, 0))[0] for j in range(4))
+                ds3 = sum(NN_PARAMS.get(s[-5:][j : j + 2], (0, 0))[1] for j in range(4))
+                dg3 = dh3 - (310.15 * (ds3 / 1000.0))
+                if dg3 <= -10.0:
+                    continue
+                if gc_clamp and s[-1] not in "GC":
+                    continue
+                if s[-5:].count("G") + s[-5:].count("C") > 4:
+                    continue
+                candidates.append(
+                    {"seq": s, "start": i + 1, "end": i + k, "strand": strand, "tm": tm, "dg3": dg3}
+                )
+    return candidates
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"gc_clamp": False, "max_poly_x": 3},
+        {"k_min": 4, "k_max": 8, "tm_range": (-300, 100), "gc_range": (0.0, 1.0), "max_poly_x": 6},
+        {"tm_range": (50, 70), "gc_range": (0.3, 0.7), "max_poly_x": 30},
+    ],
+)
+def test_batched_engine_matches_scalar_reference(kwargs) -> None:
+    rng = random.Random(5)
+    template = random_seq(1500, rng) + "NNNN" + random_seq(300, rng).lower() + "AAAAAGGGG" + random_seq(600, rng)
+
+    expected = _generate_candidates_reference(template, **kwargs)
+    actual = generate_candidates_batched(template, **kwargs)
+
+    assert expected
+    assert actual == expected
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import random
+
+import pysam
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.algorithms.genome_index import build_genome_index
+from app.algorithms.PrimerDesigner import (
+    DesignCancelled,
+    PrimerDesigner,
+    reverse_complement,
+)
+from app.api.deps import DesignerPool, DesignExecutor
+from app.main import app
+from app.schemas.request import (
+    MAX_BATCH_REQUESTS,
+    PrimerDesignBatchRequest,
+    PrimerDesignRequest,
+)
+from tests.conftest import design_body, random_seq
+
+
+def test_design_reuses_pooled_designer(design_env) -> None:
+    with TestClient(app) as client:
+        first = client.post("/design", json=design_body(design_env))
+        second = client.post("/design", json=design_body(design_env))
+        pool = app.state.designer_pool
+
+        assert first.status_code == 200
+        assert first.json()["candidates"]
+        assert first.json()["candidates"] == second.json()["candidates"]
+        assert first.json()["genome"]["placements"][0]["genomic_start"] == 2001
+        assert pool._created == 1
+
+
+def test_pool_checkout_times_out(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGNER_POOL_SIZE", "1")
+    monkeypatch.setenv("DESIGNER_ACQUIRE_TIMEOUT", "0.05")
+    pool = DesignerPool.from_env()
+    designer = pool.acquire()
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            pool.acquire()  # 유일한 인스턴스가 사용 중 → 무한 대기 대신 503
+        assert exc_info.value.status_code == 503
+    finally:
+        pool.release(designer)
+        pool.close()
+
+
+def test_pool_replaces_broken_scan_pool(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("SPECIFICITY_SCAN_WORKERS", "1")
+    pool = DesignerPool.from_env()
+    designer = pool.acquire()
+    broken = designer.scan_executor
+    try:
+        # 스캔 중 풀이 깨진 것처럼 표시 → 반납 시 새 풀로 교체
+        designer.broken_scan_executor, designer.scan_executor = broken, None
+        pool.release(designer)
+        assert pool._scan_processes is not None and pool._scan_processes is not broken
+        assert designer.scan_executor is pool._scan_processes
+        assert designer.broken_scan_executor is None
+    finally:
+        pool.close()
+
+
+def test_design_reports_missing_db(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DB_PATH", "/nonexistent/annotations.db")
+    with TestClient(app) as client:
+        response = client.post("/design", json=design_body(design_env))
+
+    assert response.status_code == 503
+
+
+def test_design_runs_in_process_pool(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGN_PROCESS_WORKERS", "1")
+    with TestClient(app) as client:
+        response = client.post("/design", json=design_body(design_env))
+        executor = app.state.design_executor
+
+    assert executor.workers == 1
+    assert response.status_code == 200
+    assert response.json()["genome"]["id"] == "chr1"
+
+
+def test_process_pool_honours_should_stop(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGN_PROCESS_WORKERS", "1")
+    pool = DesignerPool.from_env()
+    executor = DesignExecutor.from_env(pool)
+    request = PrimerDesignRequest.model_validate(design_body(design_env))
+
+    async def scenario() -> dict:
+        # 중단 콜백이 있어도 스레드 풀로 빠지지 않고 워커 프로세스에서 중단됨
+        with pytest.raises(DesignCancelled):
+            await executor.run(request, should_stop=lambda: True)
+        assert executor._processes is not None
+        return await executor.run(request, should_stop=lambda: False)
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        executor.close()
+        pool.close()
+    assert result["template_info"]["chrom"] == "chr1"
+    assert result["candidates"]
+    assert pool._created == 0
+    assert sorted(executor._free_stop_slots) == list(range(executor.max_pending))
+
+
+def test_design_rebuilds_broken_process_pool(monkeypatch, tmp_path, genome_factory, design_env) -> None:
+    # 다른 게놈으로 만든 인덱스 → 워커 initializer의 check_genome이 실패해 풀이 깨짐
+    other = genome_factory({"chrX": random_seq(500, random.Random(5))}, "other.fa")
+    prefix = str(tmp_path / "mismatched" / "genome")
+    with pysam.FastaFile(other) as fasta:
+        build_genome_index(fasta, prefix, k=12, step=3)
+    monkeypatch.setenv("GENOME_INDEX_PATH", prefix)
+    monkeypatch.setenv("DESIGN_PROCESS_WORKERS", "1")
+    monkeypatch.setenv("DESIGN_CACHE_SIZE", "0")
+    with TestClient(app) as client:
+        broken = client.post("/design", json=design_body(design_env))
+        assert broken.status_code == 503
+        assert app.state.design_executor._processes is None
+
+        for suffix in (".meta.json", ".keys.u64", ".pos.u32"):
+            os.remove(prefix + suffix)
+        assert client.post("/design", json=design_body(design_env)).status_code == 200
+
+
+def test_design_rejects_when_queue_is_full(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGN_MAX_PENDING", "1")
+    with TestClient(app) as client:
+        app.state.design_executor.pending = 1
+        response = client.post("/design", json=design_body(design_env))
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_design_reports_cache_hits(design_env) -> None:
+    with TestClient(app) as client:
+        first = client.post("/design", json=design_body(design_env))
+        second = client.post("/design", json=design_body(design_env))
+
+    assert first.json()["meta"]["cache"] == "miss"
+    assert second.json()["meta"]["cache"] == "hit"
+    assert first.json()["candidates"] == second.json()["candidates"]
+
+
+def test_design_cache_invalidated_by_db_rebuild(monkeypatch, design_env) -> None:
+    with TestClient(app) as client:
+        client.post("/design", json=design_body(design_env))
+        db_path = app.state.designer_pool.db_path
+        stat = os.stat(db_path)
+        os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        response = client.post("/design", json=design_body(design_env))
+
+    assert response.json()["meta"]["cache"] == "miss"
+
+
+def test_design_cache_disk_tier_survives_restart(monkeypatch, tmp_path, design_env) -> None:
+    monkeypatch.setenv("DESIGN_CACHE_PATH", str(tmp_path / "design_cache.db"))
+    with TestClient(app) as client:
+        first = client.post("/design", json=design_body(design_env))
+    with TestClient(app) as client:
+        second = client.post("/design", json=design_body(design_env))
+
+    assert second.json()["meta"]["cache"] == "hit"
+    assert first.json()["candidates"] == second.json()["candidates"]
+
+
+def test_design_returns_pairs_within_product_size(design_env) -> None:
+    with TestClient(app) as client:
+        response = client.post("/design", json=design_body(design_env))
+
+    pairs = response.json()["pairs"]
+    assert pairs
+    assert [p["penalty"] for p in pairs] == sorted(p["penalty"] for p in pairs)
+    for pair in pairs:
+        assert 100 <= pair["product_size_bp"] <= 300
+        assert pair["tm_diff_c"] <= 3
+        assert pair["forward"]["strand"] == "forward" and pair["reverse"]["strand"] == "reverse"
+
+
+def test_design_stream_emits_stages_then_result(monkeypatch, design_env) -> None:
+    # 두 요청 모두 실제 스캔을 거치도록 캐시 비활성화
+    monkeypatch.setenv("DESIGN_CACHE_SIZE", "0")
+    monkeypatch.setenv("SPECIFICITY_CACHE_SIZE", "0")
+    with TestClient(app) as client:
+        plain = client.post("/design", json=design_body(design_env)).json()
+        response = client.post("/design/stream", json=design_body(design_env))
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    names = [event["event"] for event in events]
+    assert names[:3] == ["candidates", "template", "filtered"]
+    assert "specificity" in names
+    assert names[-1] == "result"
+    assert events[1]["placements"][0]["genomic_start"] == 2001
+    assert events[-1]["data"]["candidates"] == plain["candidates"]
+    assert events[-1]["data"]["pairs"] == plain["pairs"]
+
+
+def test_design_stream_rejects_before_streaming_when_full(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGN_MAX_PENDING", "1")
+    with TestClient(app) as client:
+        app.state.design_executor.pending = 1
+        response = client.post("/design/stream", json=design_body(design_env))
+
+    assert response.status_code == 503
+
+
+def test_design_batch_matches_individual_requests(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGN_CACHE_SIZE", "0")
+    templates = [design_env, reverse_complement(design_env[100:500]), design_env[:300] + "ACGT" * 20, design_env]
+    with TestClient(app) as client:
+        batch = client.post("/design/batch", json={"requests": [design_body(t) for t in templates]})
+        singles = [client.post("/design", json=design_body(t)).json() for t in templates]
+
+    assert batch.status_code == 200
+    results = batch.json()["results"]
+    assert results[1]["genome"]["placements"][0]["strand"] == "-"
+    assert results[2]["genome"]["placements"] == []
+    for result, single in zip(results, singles):
+        assert result["genome"] == single["genome"]
+        assert result["candidates"] == single["candidates"]
+        assert result["pairs"] == single["pairs"]
+
+
+def test_batch_accepts_hundreds_of_requests(design_env) -> None:
+    body = design_body(design_env)
+    assert len(PrimerDesignBatchRequest.model_validate({"requests": [body] * 250}).requests) == 250
+    with pytest.raises(ValidationError):
+        PrimerDesignBatchRequest.model_validate({"requests": [body] * (MAX_BATCH_REQUESTS + 1)})
+
+
+def test_locate_templates_matches_single_lookup(tmp_path, genome_factory, annotation_db) -> None:
+    rng = random.Random(5)
+    chr1, chr2 = random_seq(7000, rng), random_seq(3000, rng)
+    # chr2에만 있는 서열의 역상보가 chr1 뒤쪽에도 있으면 염색체 순서가 좌표보다 우선
+    chr1 = chr1[:6000] + reverse_complement(chr2[100:160]) + chr1[6060:]
+    designer = PrimerDesigner(genome_factory({"chr1": chr1, "chr2": chr2}), annotation_db)
+    templates = [chr1[4990:5100], chr2[100:160], chr1[10:40], "ACGT" * 30, "", chr1[200:260].replace(chr1[230], "N")]
+
+    located = designer.locate_templates_in_genome(templates)
+    assert located == [designer.locate_template_in_genome(t) for t in templates]
+    assert located[0] is not None and located[0]["genomic_start"] == 4991
+    assert located[1] is not None and (located[1]["chrom"], located[1]["strand"]) == ("chr1", "-")
+    designer.close()
@@ -0,0 +1,55 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.conftest import design_body
+
+
+def _wait(client: TestClient, job_id: str, statuses=("succeeded", "failed", "cancelled")) -> dict:
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        job = client.get(f"/design/jobs/{job_id}").json()
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_and_deduplicates(design_env) -> None:
+    with TestClient(app) as client:
+        created = client.post("/design/jobs", json=design_body(design_env))
+        assert created.status_code == 202
+        job_id = created.json()["job_id"]
+
+        job = _wait(client, job_id)
+        plain = client.post("/design", json=design_body(design_env)).json()
+        again = client.post("/design/jobs", json=design_body(design_env)).json()
+
+    assert job["status"] == "succeeded"
+    assert job["expires_at"]
+    assert job["result"]["candidates"] == plain["candidates"]
+    assert job["result"]["pairs"] == plain["pairs"]
+    assert again["job_id"] == job_id and again["deduplicated"]
+
+    # 결과는 재시작 후에도 조회 가능
+    with TestClient(app) as client:
+        assert client.get(f"/design/jobs/{job_id}").json()["status"] == "succeeded"
+
+
+def test_job_cancel_and_unknown_id(monkeypatch, design_env) -> None:
+    monkeypatch.setenv("DESIGN_MAX_PENDING", "1")
+    with TestClient(app) as client:
+        # 실행기 대기열이 차 있으면 작업은 재시도하며 대기
+        app.state.design_executor.pending = 1
+        job_id = client.post("/design/jobs", json=design_body(design_env)).json()["job_id"]
+        cancelled = client.post(f"/design/jobs/{job_id}/cancel").json()
+        job = _wait(client, job_id)
+        app.state.design_executor.pending = 0
+
+        assert client.get("/design/jobs/unknown").status_code == 404
+        retried = client.post("/design/jobs", json=design_body(design_env)).json()
+
+    assert cancelled["status"] == "cancelled"
+    assert job["status"] == "cancelled"
+    assert retried["job_id"] != job_id and not retried["deduplicated"]
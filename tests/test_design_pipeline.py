@@ -0,0 +1,57 @@
+import random
+
+from app.algorithms.PrimerDesigner import PrimerDesigner, reverse_complement
+from app.algorithms.specificity_cache import SpecificityCache
+from app.schemas.request import PrimerDesignRequest
+from app.services import design_pipeline
+from tests.conftest import design_body, random_seq
+
+
+def _exhaustive(designer, request, candidates, template_info):
+    # 사전 필터를 통과한 후보 전체를 한 번에 특이성 검사
+    passed = design_pipeline.prefilter_candidates(designer, request, candidates, template_info)
+    passed = designer.filter_specific_primers(**design_pipeline.specificity_check(request, passed, template_info))
+    pairs = design_pipeline.pair_candidates(designer, request, passed)
+    return design_pipeline.rank_candidates(request, passed), pairs
+
+
+def _ranked(designer, request, candidates, template_info):
+    prefiltered = design_pipeline.prefilter_candidates(designer, request, candidates, template_info)
+    passed = design_pipeline.filter_specific_ranked(designer, request, prefiltered, template_info)
+    pairs = design_pipeline.pair_candidates(designer, request, passed)
+    return design_pipeline.rank_candidates(request, passed), pairs
+
+
+def test_ranked_specificity_matches_exhaustive(genome_factory, annotation_db) -> None:
+    rng = random.Random(3)
+    chrom = random_seq(20000, rng)
+    # 템플릿 안의 반복 구간 -> 같은 서열의 후보가 여러 위치에 생김
+    template = chrom[2000:2300] + chrom[2100:2140] + chrom[2340:2600]
+    genome = chrom[:2000] + template + chrom[2600:]
+    request = PrimerDesignRequest.model_validate(design_body(template))
+
+    plain_path = genome_factory({"chr1": genome}, "plain.fa")
+    plain = PrimerDesigner(plain_path, annotation_db)
+    candidates = design_pipeline.generate_candidates(plain, request)
+    template_info = plain.locate_template_in_genome(template)
+    assert template_info is not None
+    prefiltered = design_pipeline.prefilter_candidates(plain, request, candidates, template_info)
+    best = sorted(prefiltered, key=lambda c: design_pipeline.candidate_penalty(request, c))
+    # 상위 후보 일부를 다른 염색체에 복제해 탈락시킴 -> 여러 라운드가 필요
+    decoys = [best[i]["seq"] if i % 2 else reverse_complement(best[i]["seq"]) for i in range(0, 150, 2)]
+    genome_path = genome_factory({"chr1": genome, "chr2": "T".join(decoys)}, "decoy.fa")
+
+    for fixture_genome in (plain_path, genome_path):
+        exhaustive = PrimerDesigner(fixture_genome, annotation_db)
+        cache = SpecificityCache()
+        ranked = PrimerDesigner(fixture_genome, annotation_db, specificity_cache=cache)
+
+        expected = _exhaustive(exhaustive, request, [dict(c) for c in candidates], template_info)
+        assert _ranked(ranked, request, [dict(c) for c in candidates], template_info) == expected
+        assert len(expected[0]) == design_pipeline.TOP_CANDIDATES
+        assert len(expected[1]) == design_pipeline.TOP_PAIRS
+        # 검사한 서열만 캐시에 남음
+        assert len(cache) < len({c["seq"] for c in prefiltered})
+        exhaustive.close()
+        ranked.close()
+    plain.close()
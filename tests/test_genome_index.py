@@ -0,0 +1,129 @@
+import random
+
+import pysam
+import pytest
+
+from app.algorithms.genome_index import GenomeKmerIndex, build_genome_index
+from app.algorithms.PrimerDesigner import PrimerDesigner, reverse_complement
+from tests.conftest import random_seq
+
+
+def _build(genome_path: str, prefix: str, **kwargs) -> None:
+    with pysam.FastaFile(genome_path) as fasta:
+        build_genome_index(fasta, prefix, chunk_size=1000, **kwargs)
+
+
+def test_locate_template_reports_every_placement(tmp_path, genome_factory, annotation_db) -> None:
+    rng = random.Random(1)
+    template = random_seq(120, rng)
+    chr1 = random_seq(3000, rng)
+    chr2 = random_seq(2500, rng)
+    chr1 = chr1[:400] + template + chr1[520:2200] + reverse_complement(template) + chr1[2320:]
+    chr2 = chr2[:1950] + template + chr2[2070:]
+    genome_path = genome_factory({"chr1": chr1, "chr2": chr2})
+    prefix = str(tmp_path / "index" / "genome")
+    _build(genome_path, prefix, k=12, step=3)
+
+    designer = PrimerDesigner(genome_path, annotation_db, genome_index=prefix)
+    info = designer.locate_template_in_genome(template)
+    assert info is not None
+
+    placements = [(p["chrom"], p["genomic_start"], p["strand"]) for p in info["placements"]]
+    assert placements == [("chr1", 401, "+"), ("chr1", 2201, "-"), ("chr2", 1951, "+")]
+    assert (info["chrom"], info["genomic_start"], info["strand"]) == ("chr1", 401, "+")
+
+
+def test_index_matches_chunk_scan_first_hit(tmp_path, genome_factory, annotation_db) -> None:
+    rng = random.Random(2)
+    chrom = random_seq(4000, rng)
+    genome_path = genome_factory({"chr1": chrom})
+    prefix = str(tmp_path / "genome")
+    _build(genome_path, prefix)
+
+    with_index = PrimerDesigner(genome_path, annotation_db, genome_index=prefix)
+    without_index = PrimerDesigner(genome_path, annotation_db)
+    for start in (0, 999, 1000, 3500):
+        template = chrom[start : start + 60]
+        expected = without_index.locate_template_in_genome(template)
+        actual = with_index.locate_template_in_genome(template)
+        assert actual is not None and expected is not None
+        assert actual["genomic_start"] == expected["genomic_start"] == start + 1
+
+    assert with_index.locate_template_in_genome(random_seq(60, rng)) is None
+
+
+def test_search_finds_near_exact_hits(tmp_path, genome_factory) -> None:
+    rng = random.Random(3)
+    chrom = random_seq(2000, rng)
+    genome_path = genome_factory({"chr1": chrom})
+    prefix = str(tmp_path / "genome")
+    _build(genome_path, prefix, k=8, step=1)
+
+    index = GenomeKmerIndex(prefix)
+    query = chrom[700:724]
+    mutated = query[:5] + ("A" if query[5] != "A" else "C") + query[6:]
+    assert index.covers(len(mutated), mismatches=1)
+
+    with pysam.FastaFile(genome_path) as fasta:
+        assert index.search(mutated, fasta.fetch) == []
+        hits = index.search(mutated, fasta.fetch, max_mismatches=1)
+        assert ("chr1", 700, 1, query) in hits
+
+
+def test_frequent_seeds_are_skipped(tmp_path, genome_factory) -> None:
+    rng = random.Random(4)
+    repeat = "GATTACAG"
+    chrom = list(random_seq(3000, rng))
+    for start in (100, 600, 1108, 1900, 2500):
+        chrom[start : start + len(repeat)] = repeat
+    chrom = "".join(chrom)
+    genome_path = genome_factory({"chr1": chrom})
+    prefix = str(tmp_path / "genome")
+    _build(genome_path, prefix, k=8, step=1)
+
+    index = GenomeKmerIndex(prefix, max_seed_hits=3)
+    query = chrom[1100:1124]  # 고반복 시드 1개 + 고유 시드
+    with pysam.FastaFile(genome_path) as fasta:
+        # 정확 일치: 남은 시드로 투표 기준을 낮춰 그대로 찾음
+        assert index.repetitive([query]) == set()
+        assert [hit[:2] for hit in index.search(query, fasta.fetch)] == [("chr1", 1100)]
+        # 근사 일치/고반복 시드만 있는 서열은 누락 가능으로 표시
+        assert index.repetitive([query], max_mismatches=1) == {query}
+        assert index.repetitive([repeat]) == {repeat}
+        assert index.search(repeat, fasta.fetch) == []
+
+
+def test_rebuild_keeps_open_index_and_invalidates_on_failure(tmp_path, genome_factory) -> None:
+    rng = random.Random(6)
+    old_chrom, new_chrom = random_seq(2000, rng), random_seq(2000, rng)
+    prefix = str(tmp_path / "genome")
+    _build(genome_factory({"chr1": old_chrom}, "old.fa"), prefix, k=10, step=1)
+    index = GenomeKmerIndex(prefix)
+    probe = old_chrom[500:530]
+
+    def fetch_old(ref, start, end):
+        return old_chrom[start:end]
+
+    assert [hit[:2] for hit in index.search(probe, fetch_old)] == [("chr1", 500)]
+
+    # 교체 빌드 중에도 열려 있는 인덱스는 이전 배열을 그대로 읽음
+    _build(genome_factory({"chr1": new_chrom}, "new.fa"), prefix, k=10, step=1)
+    assert [hit[:2] for hit in index.search(probe, fetch_old)] == [("chr1", 500)]
+    rebuilt = GenomeKmerIndex(prefix)
+    assert [hit[:2] for hit in rebuilt.search(new_chrom[700:730], lambda ref, start, end: new_chrom[start:end])] == [
+        ("chr1", 700)
+    ]
+
+    # 중간에 실패한 빌드는 메타 파일이 없어 이전/새 배열과 짝지어지지 않음
+    class FailingFasta:
+        references = ["chr1"]
+
+        def get_reference_length(self, ref):
+            return 2000
+
+        def fetch(self, ref, start, end):
+            raise OSError("read failed")
+
+    with pytest.raises(OSError):
+        build_genome_index(FailingFasta(), prefix, k=10, step=1)
+    assert not GenomeKmerIndex.exists(prefix)
@@ -0,0 +1,135 @@
+import random
+
+import numpy as np
+import pysam
+import pytest
+
+from app.algorithms import PrimerDesigner as primer_designer
+from app.algorithms.genome_store import GenomeStore, build_genome_store
+from app.algorithms.PrimerDesigner import PrimerDesigner
+from tests.conftest import random_seq
+
+
+def _build(genome_path: str, prefix: str) -> None:
+    with pysam.FastaFile(genome_path) as fasta:
+        build_genome_store(fasta, prefix, chunk_size=700)
+
+
+def test_store_fetch_matches_fasta(tmp_path, genome_factory) -> None:
+    rng = random.Random(4)
+    chr1 = random_seq(2500, rng)
+    chr1 = chr1[:300] + "N" * 50 + chr1[350:900].lower() + chr1[900:]
+    genome_path = genome_factory({"chr1": chr1, "chrM": random_seq(170, rng), "chr2": random_seq(1400, rng)})
+    prefix = str(tmp_path / "store" / "genome")
+    _build(genome_path, prefix)
+
+    with pysam.FastaFile(genome_path) as fasta, GenomeStore(prefix) as store:
+        assert store.references == fasta.references
+        assert store.lengths == fasta.lengths
+        for _ in range(200):
+            ref = rng.choice(fasta.references)
+            start = rng.randint(0, fasta.get_reference_length(ref))
+            end = start + rng.randint(0, 800)  # 염색체 끝을 넘는 구간은 잘림
+            assert store.fetch(ref, start, end) == fasta.fetch(ref, start, end)
+        assert store.fetch("chrM") == fasta.fetch("chrM")
+
+        view = store.array("chr1", 300, 360)
+        assert not view.flags.writeable
+        assert bytes(store.view("chr1", 300, 360)) == view.tobytes() == fasta.fetch("chr1", 300, 360).encode()
+        assert np.shares_memory(view, store.array("chr1"))
+        with pytest.raises(KeyError):
+            store.fetch("chrX", 0, 10)
+
+
+def test_designer_uses_store_and_rejects_stale_store(tmp_path, genome_factory, annotation_db) -> None:
+    rng = random.Random(6)
+    chr1 = random_seq(4000, rng)
+    genome_path = genome_factory({"chr1": chr1, "chr2": random_seq(2000, rng)})
+    prefix = str(tmp_path / "genome")
+    _build(genome_path, prefix)
+
+    fasta_designer = PrimerDesigner(genome_path, annotation_db)
+    store_designer = PrimerDesigner(genome_path, annotation_db, genome_store=prefix)
+    assert isinstance(store_designer.genome, GenomeStore)
+    template = chr1[1500:1800]
+    assert store_designer.locate_template_in_genome(template) == fasta_designer.locate_template_in_genome(template)
+
+    primers = [
+        {"seq": template[i : i + 20], "chrom": "chr1", "genomic_start": 1501 + i, "genomic_end": 1520 + i}
+        for i in range(0, 280, 20)
+    ]
+    assert store_designer.filter_specific_primers([dict(p) for p in primers], "chr2", 1, 100) == []
+    assert store_designer.filter_specific_primers(
+        [dict(p) for p in primers], "chr1", 1501, 1800
+    ) == fasta_designer.filter_specific_primers([dict(p) for p in primers], "chr1", 1501, 1800)
+    store_designer.close()
+    fasta_designer.close()
+
+    other_path = genome_factory({"chr1": chr1[:3000]}, "other.fa")
+    with pytest.raises(ValueError):
+        PrimerDesigner(other_path, annotation_db, genome_store=prefix)
+
+
+def test_rebuild_keeps_open_store_and_invalidates_on_failure(tmp_path, genome_factory) -> None:
+    rng = random.Random(7)
+    old_chrom, new_chrom = random_seq(1500, rng), random_seq(1500, rng)
+    prefix = str(tmp_path / "genome")
+    _build(genome_factory({"chr1": old_chrom}, "old.fa"), prefix)
+
+    with GenomeStore(prefix) as store:
+        # 교체 빌드 중에도 열려 있는 저장소는 이전 파일을 그대로 읽음
+        _build(genome_factory({"chr1": new_chrom}, "new.fa"), prefix)
+        assert store.fetch("chr1") == old_chrom
+    with GenomeStore(prefix) as store:
+        assert store.fetch("chr1") == new_chrom
+
+    # 중간에 실패한 빌드는 메타 파일이 없어 exists()가 False
+    class FailingFasta:
+        references = ["chr1"]
+
+        def get_reference_length(self, ref):
+            return 1500
+
+        def fetch(self, ref, start, end):
+            raise OSError("read failed")
+
+    with pytest.raises(OSError):
+        build_genome_store(FailingFasta(), prefix)
+    assert not GenomeStore.exists(prefix)
+
+
+def test_chunk_scans_read_store_without_string_copies(monkeypatch, tmp_path, genome_factory, annotation_db) -> None:
+    rng = random.Random(8)
+    chr1 = random_seq(4000, rng)
+    chr1 = chr1[:3100] + "N" + chr1[3101:]
+    genome_path = genome_factory({"chr1": chr1, "chr2": random_seq(2000, rng)})
+    prefix = str(tmp_path / "genome")
+    _build(genome_path, prefix)
+
+    template = chr1[1500:1800]
+    # N이 섞인 프라이머는 str.find 경로로 검색
+    seqs = [template[i : i + 20] for i in range(0, 280, 40)] + [chr1[3090:3110]]
+    primers = [{"seq": seq, "chrom": "chr1", "genomic_start": 1501, "genomic_end": 1520} for seq in seqs]
+    fasta_designer = PrimerDesigner(genome_path, annotation_db)
+    expected_template = fasta_designer.locate_template_in_genome(template)
+    expected_specific = fasta_designer.filter_specific_primers([dict(p) for p in primers], "chr1", 1501, 1800)
+    fasta_designer.close()
+    monkeypatch.setattr(primer_designer, "_scan_worker_genome", None)
+    primer_designer.init_scan_worker(genome_path)
+    expected_hits = primer_designer.scan_chunk_task("chr1", 0, 4000, 4000, tuple(seqs))[0]
+
+    def no_fetch(*args, **kwargs):
+        raise AssertionError("청크 스캔이 GenomeStore 구간을 문자열로 복사함")
+
+    monkeypatch.setattr(GenomeStore, "fetch", no_fetch)
+    store_designer = PrimerDesigner(genome_path, annotation_db, genome_store=prefix)
+    assert store_designer.locate_template_in_genome(template) == expected_template
+    specific = store_designer.filter_specific_primers([dict(p) for p in primers], "chr1", 1501, 1800)
+    assert specific == expected_specific
+    assert store_designer.stats["fasta_bytes"] > 0
+    store_designer.close()
+
+    # 병렬 스캔 워커도 mmap 구간을 그대로 스캔
+    primer_designer.init_scan_worker(genome_path, prefix)
+    assert primer_designer.scan_chunk_task("chr1", 0, 4000, 4000, tuple(seqs))[0] == expected_hits
+    assert expected_hits
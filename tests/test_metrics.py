@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.conftest import design_body
+
+
+def _metric(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_design_reports_stage_timings_and_metrics(design_env) -> None:
+    with TestClient(app) as client:
+        before = client.get("/metrics").text
+        first = client.post("/design", json=design_body(design_env)).json()
+        second = client.post("/design", json=design_body(design_env)).json()
+        response = client.get("/metrics")
+
+    timings = first["meta"]["timings"]
+    assert list(timings["stages"]) == [
+        "candidates", "template", "mapping", "db_filter", "specificity", "pairing", "ranking"
+    ]
+    assert timings["stages"]["ranking"]["count"] == len(first["candidates"])
+    assert timings["stages"]["template"]["count"] == 1
+    assert set(timings["specificity_chroms_ms"]) == {"chr1", "chr2"}
+    assert timings["counters"]["fasta_bytes"] > 0
+    assert timings["counters"]["specificity_cache_misses"] > 0
+    # 캐시 적중 결과는 이번에 계산한 지표가 없음
+    assert second["meta"]["cache"] == "hit"
+    assert second["meta"]["timings"] is None
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE primer_design_stage_seconds_total counter" in text
+    for name, delta in (
+        ('primer_design_requests_total{cache="hit"}', 1),
+        ('primer_design_requests_total{cache="miss"}', 1),
+        ('primer_design_stage_runs_total{stage="specificity"}', 1),
+    ):
+        assert _metric(text, name) - _metric(before, name) == delta
+    assert _metric(text, "primer_design_fasta_bytes_total") > _metric(before, "primer_design_fasta_bytes_total")
+    assert 'primer_design_specificity_chrom_seconds_total{chrom="chr1"}' in text
+    assert "primer_design_result_cache_hit_ratio" in text
@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+
+from app.algorithms.PrimerDesigner import (
+    needleman_wunsch_mismatch,
+    needleman_wunsch_mismatch_many,
+)
+from tests.conftest import random_seq
+
+
+def _reference(seq1: str, seq2: str) -> int:
+    """기존 NumPy 행렬 구현"""
+    n, m = len(seq1), len(seq2)
+    score_matrix = np.zeros((n + 1, m + 1))
+    for i in range(n + 1):
+        score_matrix[i][0] = -i
+    for j in range(m + 1):
+        score_matrix[0][j] = -j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            match = 1 if seq1[i - 1] == seq2[j - 1] else -1
+            score_matrix[i][j] = max(
+                score_matrix[i - 1][j - 1] + match,
+                score_matrix[i - 1][j] - 1,
+                score_matrix[i][j - 1] - 1,
+            )
+    return max(len(seq1), len(seq2)) - int(score_matrix[n][m])
+
+
+def _mutate(seq: str, rng: random.Random) -> str:
+    chars = list(seq)
+    for _ in range(rng.randint(0, 4)):
+        op = rng.choice("sid")
+        pos = rng.randrange(len(chars) + 1)
+        if op == "s" and pos < len(chars):
+            chars[pos] = rng.choice("ACGTN")
+        elif op == "i":
+            chars.insert(pos, rng.choice("ACGT"))
+        elif op == "d" and pos < len(chars) and len(chars) > 1:
+            del chars[pos]
+    return "".join(chars)
+
+
+def test_mismatch_matches_reference() -> None:
+    rng = random.Random(3)
+    pairs = [("", ""), ("A", ""), ("ACGT", "acgt")]
+    for _ in range(2000):
+        seq1 = random_seq(rng.choice([10, 10, 10, 7, 12]), rng)
+        pairs.append((seq1, _mutate(seq1, rng)[-10:]))
+    pairs += [(random_seq(10, rng), random_seq(10, rng)) for _ in range(200)]
+
+    expected = [_reference(s1, s2) for s1, s2 in pairs]
+    assert [needleman_wunsch_mismatch(s1, s2) for s1, s2 in pairs] == expected
+    assert needleman_wunsch_mismatch_many([p[0] for p in pairs], [p[1] for p in pairs]).tolist() == expected
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from app.algorithms.multi_pattern import MultiPatternScanner
+from tests.conftest import random_seq
+
+
+def _find_all(text: str, patterns: list[str]) -> list[tuple[int, int]]:
+    hits = []
+    for pid, pattern in enumerate(patterns):
+        pos = text.find(pattern)
+        while pos != -1:
+            hits.append((pos, pid))
+            pos = text.find(pattern, pos + 1)
+    return sorted(hits)
+
+
+def test_scan_matches_str_find() -> None:
+    rng = random.Random(11)
+    text = random_seq(20000, rng)
+    patterns = [text[i : i + rng.randint(6, 12)] for i in rng.sample(range(19000), 30)]
+    patterns += ["GAATTC", "GGATCC", "AAGCTT", "GCGGCCGC", "ACGT"]
+    scanner = MultiPatternScanner(patterns)
+
+    assert list(scanner.scan(text)) == _find_all(text, scanner.patterns)
+    limited = [hit for hit in _find_all(text, scanner.patterns) if hit[0] < 5000]
+    assert list(scanner.scan(text, limit=5000)) == limited
+
+
+def test_scan_case_handling() -> None:
+    text = "ttGAATTCaagaattcNNGAATTC"
+    assert [pos for pos, _ in MultiPatternScanner(["GAATTC"]).scan(text)] == [2, 18]
+    assert [pos for pos, _ in MultiPatternScanner(["GAATTC"], ignore_case=True).scan(text)] == [2, 10, 18]
+
+
+def test_rejects_degenerate_patterns() -> None:
+    with pytest.raises(ValueError):
+        MultiPatternScanner(["GANTC"])
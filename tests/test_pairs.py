@@ -0,0 +1,52 @@
+import random
+
+from app.algorithms.PrimerDesigner import PrimerDesigner
+
+
+def _reference_pairs(primers, product_range, max_tm_diff, opt_tm):
+    """기존 fwd x rev 전수 비교 구현"""
+    pairs = []
+    for f in (p for p in primers if p["strand"] == "+"):
+        for r in (p for p in primers if p["strand"] == "-"):
+            size = r["end"] - f["start"] + 1
+            if not (product_range[0] <= size <= product_range[1]):
+                continue
+            tm_diff = abs(f["tm"] - r["tm"])
+            if tm_diff > max_tm_diff:
+                continue
+            penalty = (
+                abs(f["tm"] - opt_tm) + abs(r["tm"] - opt_tm) + abs(f["dg3"] + 8.0) + abs(r["dg3"] + 8.0) + tm_diff * 2
+            )
+            pairs.append((f, r, size, penalty))
+    return sorted(pairs, key=lambda x: x[3])
+
+
+def _primers(rng: random.Random, count: int) -> list[dict]:
+    primers = []
+    for _ in range(count):
+        start = rng.randint(1, 2000)
+        primers.append(
+            {
+                "start": start,
+                "end": start + rng.randint(17, 24),
+                "strand": rng.choice("+-"),
+                # 동점 페어 순서까지 비교하도록 값 범위를 좁게
+                "tm": rng.choice([58.0, 59.5, 60.0, 61.0]),
+                "dg3": rng.choice([-9.0, -8.0, -7.5]),
+            }
+        )
+    return primers
+
+
+def test_pair_primers_matches_exhaustive_pairing() -> None:
+    rng = random.Random(5)
+    primers = _primers(rng, 400)
+    designer = PrimerDesigner.__new__(PrimerDesigner)
+    expected = [(id(f), id(r), size, pen) for f, r, size, pen in _reference_pairs(primers, (100, 300), 1.5, 60.0)]
+
+    def flat(pairs):
+        return [(id(p["fwd"]), id(p["rev"]), p["product_size"], p["penalty"]) for p in pairs]
+
+    assert flat(designer.pair_primers(primers, (100, 300), 1.5, 60.0)) == expected
+    assert flat(designer.pair_primers(primers, (100, 300), 1.5, 60.0, top_k=25)) == expected[:25]
+    assert designer.pair_primers(primers, (100, 300), 1.5, 60.0, top_k=0) == []
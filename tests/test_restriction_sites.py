@@ -0,0 +1,91 @@
+import io
+import random
+import re
+
+import pytest
+
+from app.algorithms.restriction_sites import (
+    DEFAULT_ENZYMES,
+    IUPAC_BASES,
+    RestrictionSiteScanner,
+    load_enzyme_library,
+    normalize_site,
+    reverse_complement_site,
+)
+from tests.conftest import random_seq
+
+LIBRARY = {
+    **DEFAULT_ENZYMES,
+    "MboI": "GATC",
+    "HinfI": "GANTC",
+    "AccI": "GTMKAC",
+    "BglI": "GCCNNNNNGGC",
+    "BsaI": "GGTCTC",  # 비회문 → 역상보(GAGACC)도 검색
+    "DpnII": "GATC",  # 같은 인식 서열의 다른 효소
+}
+
+
+def _naive_rows(records: dict, enzymes: dict) -> list[tuple[str, str, int, int]]:
+    rows = []
+    for chrom, seq in records.items():
+        seq = seq.upper()
+        hits = set()
+        for enzyme_id, site in enumerate(enzymes.values()):
+            for motif in {site, reverse_complement_site(site)}:
+                regex = "".join(f"[{IUPAC_BASES[base]}]" for base in motif)
+                hits.update((m.start(), enzyme_id) for m in re.finditer(f"(?=({regex}))", seq))
+        names, sites = list(enzymes), list(enzymes.values())
+        rows += [(chrom, names[e], pos + 1, pos + len(sites[e])) for pos, e in sorted(hits)]
+    return rows
+
+
+def _fasta(records: dict, width: int) -> bytes:
+    lines = []
+    for chrom, seq in records.items():
+        lines.append(f">{chrom} test")
+        lines += [seq[i : i + width] for i in range(0, len(seq), width)]
+    return ("\r\n".join(lines) + "\n").encode()
+
+
+def _records(rng: random.Random) -> dict:
+    records = {}
+    for chrom, length in [("chr1", 6000), ("chr2", 3), ("chrM", 2500)]:
+        seq = list(random_seq(length, rng))
+        for _ in range(length // 300):  # 소프트마스킹(소문자) / N 구간
+            start = rng.randrange(length)
+            seq[start : start + 40] = [c.lower() for c in seq[start : start + 40]]
+            start = rng.randrange(length)
+            seq[start : start + 5] = "N" * len(seq[start : start + 5])
+        records[chrom] = "".join(seq)
+    return records
+
+
+@pytest.mark.parametrize("block_size", [7, 61, 1000, 1 << 20])
+def test_scan_fasta_matches_naive_regex(block_size: int) -> None:
+    records = _records(random.Random(3))
+    scanner = RestrictionSiteScanner(LIBRARY)
+    for width in (60, 17):
+        rows = list(scanner.scan_fasta(io.BytesIO(_fasta(records, width)), block_size=block_size))
+        assert rows == _naive_rows(records, LIBRARY)
+
+
+def test_scan_iupac_and_reverse_complement() -> None:
+    scanner = RestrictionSiteScanner({"HinfI": "GANTC", "BsaI": "GGTCTC"})
+    positions, enzymes = scanner.scan(b"GAATCggagaccGANTCGTCTC")
+    # GANTC는 N 위치에 A/C/G/T만 허용 (게놈의 N은 불일치), BsaI는 역상보 GAGACC로도 검출
+    assert list(zip(positions.tolist(), enzymes.tolist())) == [(0, 0), (6, 1)]
+    assert scanner.scan(b"GAATCAAA", limit=1)[0].tolist() == [0]
+    assert scanner.scan(b"AGAATCAA", limit=1)[0].tolist() == []
+
+
+def test_enzyme_library_file(tmp_path) -> None:
+    path = tmp_path / "enzymes.txt"
+    path.write_text("# 이름 인식서열\nEcoRI G^AATTC\n\nBsaI ggtctc(1/5)  # Golden Gate\n", encoding="utf-8")
+    assert load_enzyme_library(str(path)) == {"EcoRI": "GAATTC", "BsaI": "GGTCTC"}
+    assert reverse_complement_site("GTMKAC") == "GTMKAC"
+
+    with pytest.raises(ValueError):
+        normalize_site("GAXTC")
+    path.write_text("EcoRI\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_enzyme_library(str(path))
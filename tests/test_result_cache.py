@@ -0,0 +1,38 @@
+import time
+
+from app.schemas.request import PrimerDesignRequest
+from app.services.result_cache import DesignResultCache
+from tests.conftest import design_body
+
+
+def _request(**position) -> PrimerDesignRequest:
+    body = design_body("ACGT" * 50)
+    body["position"].update(position)
+    return PrimerDesignRequest.model_validate(body)
+
+
+def test_key_ignores_enzyme_order_and_organism() -> None:
+    cache = DesignResultCache()
+    a = _request(restrictionEnzymes=["EcoRI", "BamHI"])
+    b = _request(restrictionEnzymes=["BamHI", "EcoRI", "EcoRI"])
+    b.basic.targetOrganism = "Mus musculus"
+
+    assert cache.key(a) == cache.key(b)
+    assert cache.key(a) != cache.key(_request(restrictionEnzymes=["EcoRI"]))
+
+
+def test_lru_size_and_ttl_eviction(monkeypatch) -> None:
+    cache = DesignResultCache(max_entries=2, ttl_seconds=10)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"candidates": [key]})
+
+    assert cache.get("a") is None
+    assert cache.get("c") == {"candidates": ["c"]}
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    assert cache.get("c") is None
+
+    small = DesignResultCache(max_bytes=40)
+    small.put("big", {"candidates": ["x" * 100]})
+    assert small.get("big") is None
@@ -0,0 +1,277 @@
+import multiprocessing
+import random
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pysam
+import pytest
+
+from app.algorithms import PrimerDesigner as primer_designer
+from app.algorithms.genome_index import build_genome_index
+from app.algorithms.PrimerDesigner import (
+    DesignCancelled,
+    PrimerDesigner,
+    init_scan_worker,
+    reverse_complement,
+)
+from app.algorithms.specificity_cache import SpecificityCache
+from tests.conftest import random_seq
+
+
+@pytest.fixture
+def specificity_genome(tmp_path, genome_factory):
+    """타겟 구간(chr1:1001-1300) + 일부 프라이머의 오프타겟 복제본을 가진 게놈"""
+    rng = random.Random(7)
+    chr1 = list(random_seq(6000, rng))
+    chr2 = list(random_seq(4000, rng))
+    target = "".join(chr1[1000:1300])
+
+    primers = [target[i : i + 20] for i in range(0, 280, 20)]
+    # 0번: 다른 염색체에 정확 복제 -> 탈락, 1번: 역상보 복제
+    chr2[500:520] = primers[0]
+    chr2[2500:2520] = reverse_complement(primers[1])
+    # 2번: 같은 염색체 타겟 구간 밖 복제 -> 탈락, 3번: 3' 말단 미스매치가 충분한 근사 복제 -> 통과
+    chr1[4000:4020] = primers[2]
+    chr1[5000:5020] = primers[3][:12] + reverse_complement(primers[3][12:])
+    # 4번: 5' 쪽 1곳만 다른 근사 복제 (3' 말단 10nt 동일)
+    chr2[3000:3020] = ("A" if primers[4][2] != "A" else "C").join((primers[4][:2], primers[4][3:]))
+
+    genome_path = genome_factory({"chr1": "".join(chr1), "chr2": "".join(chr2)})
+    prefix = str(tmp_path / "genome")
+    with pysam.FastaFile(genome_path) as fasta:
+        build_genome_index(fasta, prefix, k=10, step=1, chunk_size=1500)
+
+    candidates = [
+        {"seq": seq, "chrom": "chr1", "genomic_start": 1001 + i * 20, "genomic_end": 1020 + i * 20}
+        for i, seq in enumerate(primers)
+    ]
+    return genome_path, prefix, candidates
+
+
+def _specific(designer: PrimerDesigner, candidates, **kwargs):
+    passed = designer.filter_specific_primers(
+        [dict(c) for c in candidates], target_chrom="chr1", target_start=1001, target_end=1300, **kwargs
+    )
+    return sorted(p["seq"] for p in passed)
+
+
+def test_indexed_scan_matches_chunk_scan(specificity_genome, annotation_db) -> None:
+    genome_path, prefix, candidates = specificity_genome
+    chunked = PrimerDesigner(genome_path, annotation_db)
+    indexed = PrimerDesigner(genome_path, annotation_db, genome_index=prefix)
+
+    expected = _specific(chunked, candidates)
+    assert candidates[0]["seq"] not in expected
+    assert candidates[2]["seq"] not in expected
+    assert _specific(indexed, candidates) == expected
+
+    for max_hits in (0, 1):
+        assert _specific(indexed, candidates, max_hits=max_hits, mismatch_cutoff=0) == _specific(
+            chunked, candidates, max_hits=max_hits, mismatch_cutoff=0
+        )
+
+
+def test_near_exact_hits_use_end_mismatch_rule(specificity_genome, annotation_db) -> None:
+    genome_path, prefix, candidates = specificity_genome
+    indexed = PrimerDesigner(genome_path, annotation_db, genome_index=prefix)
+    near, distinct = candidates[4], candidates[3]
+
+    assert _specific(indexed, [near, distinct]) == sorted([near["seq"], distinct["seq"]])
+    assert _specific(indexed, [near, distinct], seed_mismatches=1) == [distinct["seq"]]
+
+    # 근사 일치를 보장할 수 없으면(k=10 인덱스로 20nt 2-미스매치, 또는 인덱스 없음) 정확 일치로 대체하지 않음
+    with pytest.raises(ValueError):
+        _specific(indexed, [near, distinct], seed_mismatches=2)
+    with pytest.raises(ValueError):
+        _specific(PrimerDesigner(genome_path, annotation_db), [near, distinct], seed_mismatches=1)
+
+
+def test_cached_hits_reused_across_target_windows(specificity_genome, annotation_db, monkeypatch) -> None:
+    genome_path, _, candidates = specificity_genome
+    cache = SpecificityCache()
+    designer = PrimerDesigner(genome_path, annotation_db, specificity_cache=cache)
+    expected = _specific(designer, candidates)
+    assert len(cache) == len(candidates)
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("cached primers must not be rescanned")
+
+    monkeypatch.setattr(designer, "_scan_specificity_chunked", no_scan)
+    assert _specific(designer, candidates) == expected
+
+    # 타겟 구간이 달라지면 원래 타겟 위치 히트가 오프타겟이 되어 전부 탈락 (제외 규칙은 조회 후 적용)
+    moved = designer.filter_specific_primers(
+        [dict(c) for c in candidates if c["seq"] in expected], target_chrom="chr2", target_start=1, target_end=100
+    )
+    assert moved == []
+
+
+def test_should_stop_cancels_scan_without_caching(specificity_genome, annotation_db) -> None:
+    genome_path, _, candidates = specificity_genome
+    designer = PrimerDesigner(genome_path, annotation_db, specificity_cache=SpecificityCache())
+    events = []
+
+    with pytest.raises(DesignCancelled):
+        designer.filter_specific_primers(
+            [dict(c) for c in candidates], "chr1", 1001, 1300,
+            progress=lambda stage, payload: events.append(stage),
+            should_stop=lambda: len(events) >= 1,
+        )
+    assert events == ["specificity"]
+    assert len(designer.specificity_cache) == 0
+
+
+def test_parallel_scan_matches_serial(specificity_genome, annotation_db, monkeypatch) -> None:
+    genome_path, _, candidates = specificity_genome
+    monkeypatch.setattr(primer_designer, "CHUNK_SIZE", 1000)  # 여러 청크로 나뉘도록
+    serial = PrimerDesigner(genome_path, annotation_db)
+    expected = _specific(serial, candidates)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(2, mp_context=context, initializer=init_scan_worker, initargs=(genome_path,)) as pool:
+        parallel = PrimerDesigner(
+            genome_path, annotation_db, specificity_cache=SpecificityCache(0), scan_executor=pool, scan_workers=2
+        )
+        assert _specific(parallel, candidates) == expected
+        for max_hits in (0, 1):
+            assert _specific(parallel, candidates, max_hits=max_hits, mismatch_cutoff=0) == _specific(
+                serial, candidates, max_hits=max_hits, mismatch_cutoff=0
+            )
+
+        events = []
+        with pytest.raises(DesignCancelled):
+            parallel.filter_specific_primers(
+                [dict(c) for c in candidates], "chr1", 1001, 1300,
+                progress=lambda stage, payload: events.append(payload),
+                should_stop=lambda: len(events) >= 2,
+            )
+        assert events[0]["chunks_total"] > 2
+
+
+class _BreakingExecutor(ThreadPoolExecutor):
+    """`healthy`개 작업 뒤로는 워커가 죽은 프로세스 풀처럼 BrokenProcessPool로 실패하는 실행기"""
+
+    def __init__(self, healthy: int):
+        super().__init__(2)
+        self.healthy = healthy
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self.healthy <= 0:
+            future: Future = Future()
+            future.set_exception(BrokenProcessPool())
+            return future
+        self.healthy -= 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_parallel_scan_survives_worker_failures(specificity_genome, annotation_db, monkeypatch) -> None:
+    genome_path, _, candidates = specificity_genome
+    monkeypatch.setattr(primer_designer, "CHUNK_SIZE", 1000)
+    # 스레드 실행기는 이 프로세스의 스캔 워커 상태를 그대로 사용
+    monkeypatch.setattr(primer_designer, "_scan_worker_genome", None)
+    init_scan_worker(genome_path)
+    expected = _specific(PrimerDesigner(genome_path, annotation_db), candidates)
+
+    # 풀이 깨지면 풀을 내려놓고 남은 청크를 순차 스캔해 같은 결과
+    for healthy in (0, 3, 100):
+        with _BreakingExecutor(healthy) as pool:
+            designer = PrimerDesigner(
+                genome_path, annotation_db, specificity_cache=SpecificityCache(0), scan_executor=pool, scan_workers=2
+            )
+            assert _specific(designer, candidates) == expected
+            assert (designer.broken_scan_executor is pool) == (healthy < 100)
+            assert (designer.scan_executor is None) == (healthy < 100)
+            designer.close()
+
+    # 워커에서 읽지 못한 청크는 순차 스캔처럼 건너뜀 (chr2:501-520 복제본이 있는 청크)
+    scan_chunk_task = primer_designer.scan_chunk_task
+
+    def failing_task(ref, start_idx, *args):
+        if ref == "chr2" and start_idx <= 500:
+            raise OSError("fetch failed")
+        return scan_chunk_task(ref, start_idx, *args)
+
+    monkeypatch.setattr(primer_designer, "scan_chunk_task", failing_task)
+    with ThreadPoolExecutor(2) as pool:
+        designer = PrimerDesigner(
+            genome_path, annotation_db, specificity_cache=SpecificityCache(0), scan_executor=pool, scan_workers=2
+        )
+        assert _specific(designer, candidates) == sorted(expected + [candidates[0]["seq"]])
+        assert designer.broken_scan_executor is None
+        designer.close()
+
+
+def test_reverse_complement_primers_share_indexed_hits(tmp_path, genome_factory, annotation_db) -> None:
+    rng = random.Random(13)
+    chr1 = random_seq(3000, rng)
+    a = chr1[1000:1020]
+    b = reverse_complement(a)
+    chr2 = list(random_seq(3000, rng))
+    chr2[700:720] = b  # B(= A의 역상보)의 완전 일치 오프타겟
+    genome_path = genome_factory({"chr1": chr1, "chr2": "".join(chr2)})
+    prefix = str(tmp_path / "genome")
+    with pysam.FastaFile(genome_path) as fasta:
+        build_genome_index(fasta, prefix, k=10, step=1, chunk_size=1500)
+
+    candidates = [
+        {"seq": seq, "chrom": "chr1", "genomic_start": 1001, "genomic_end": 1020} for seq in (a, b)
+    ]
+    options = {"max_hits": 0, "mismatch_cutoff": 0}
+    chunked = PrimerDesigner(genome_path, annotation_db, specificity_cache=SpecificityCache(0))
+    indexed = PrimerDesigner(genome_path, annotation_db, genome_index=prefix, specificity_cache=SpecificityCache(0))
+    assert _specific(chunked, candidates, **options) == []
+    assert _specific(indexed, candidates, **options) == []
+    check = {"target_chrom": "chr1", "target_start": 1001, "target_end": 1300, **options}
+    assert indexed.filter_specific_primers_many([{"primers": [dict(c) for c in candidates], **check}]) == [[]]
+
+
+def test_cached_hits_keep_reverse_complement_primer_rejected(
+    tmp_path, genome_factory, annotation_db, monkeypatch
+) -> None:
+    rng = random.Random(13)
+    chr1 = random_seq(3000, rng)
+    a = chr1[1000:1020]
+    b = reverse_complement(a)
+    chr2 = list(random_seq(3000, rng))
+    chr2[700:720] = b
+    genome_path = genome_factory({"chr1": chr1, "chr2": "".join(chr2)})
+    prefix = str(tmp_path / "genome")
+    with pysam.FastaFile(genome_path) as fasta:
+        build_genome_index(fasta, prefix, k=10, step=1, chunk_size=1500)
+
+    cache = SpecificityCache()
+    designer = PrimerDesigner(genome_path, annotation_db, genome_index=prefix, specificity_cache=cache)
+    candidates = [
+        {"seq": seq, "chrom": "chr1", "genomic_start": 1001, "genomic_end": 1020} for seq in (a, b)
+    ]
+    options = {"max_hits": 0, "mismatch_cutoff": 0}
+    assert _specific(designer, candidates, **options) == []
+
+    # 캐시에 남은 B의 히트 목록에 chr2 완전 일치가 있어야, B 단독 요청도 다시 스캔하지 않고 탈락
+    entry = cache.get(0, b)
+    assert entry is not None and ("chr2", 701, 720, 0) in entry[0]
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("cached primers must not be rescanned")
+
+    monkeypatch.setattr(designer, "_scan_specificity_indexed", no_scan)
+    assert _specific(designer, candidates[1:], **options) == []
+
+
+@pytest.mark.parametrize("ref_len", [1000, 1985, 1990])
+def test_chunk_tail_is_counted_once(ref_len, tmp_path, genome_factory, annotation_db, monkeypatch) -> None:
+    monkeypatch.setattr(primer_designer, "CHUNK_SIZE", 1000)
+    ranges = primer_designer._ChunkScanPlan.chunk_ranges(ref_len, 20)
+    # 청크마다 [start, start + limit) 시작점을 집계 → 염색체 전체를 정확히 한 번씩 덮음
+    covered = [pos for start, _, limit in ranges for pos in range(start, start + limit)]
+    assert covered == list(range(ref_len))
+
+    rng = random.Random(17)
+    chr1 = random_seq(2000, rng)
+    primer = chr1[500:520]
+    chr2 = random_seq(ref_len - 20, rng) + primer  # 오프타겟 1건이 마지막 청크 오버랩 구간에 위치
+    genome_path = genome_factory({"chr1": chr1, "chr2": chr2})
+    candidate = {"seq": primer, "chrom": "chr1", "genomic_start": 501, "genomic_end": 520}
+    designer = PrimerDesigner(genome_path, annotation_db, specificity_cache=SpecificityCache(0))
+    passed = designer.filter_specific_primers([candidate], "chr1", 1, 2000, max_hits=1, mismatch_cutoff=0)
+    assert [p["seq"] for p in passed] == [primer]